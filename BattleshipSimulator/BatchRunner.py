@@ -0,0 +1,196 @@
+import BattleshipSimulator.Models.Profiler as Profiler
+import concurrent.futures
+import multiprocessing
+import datetime
+import time
+import csv
+import os
+
+SUMMARY_FIELDS = ["scenario", "worker", "status", "sim_time", "wall_time", "ticks", "ticks_per_sec", "results_file", "error"]
+
+# The slot of the current worker process, assigned once by the pool initializer
+_worker_slot = 0
+
+def _init_worker(slot_queue):
+    """ Claim a unique worker slot for this process
+
+    The slot is used to derive the per-worker results directory, ZMQ port and MQTT client IDs,
+    so that simulators running side by side never collide on the same endpoint.
+
+    Parameters
+    ----------
+    slot_queue : multiprocessing.Queue
+        A queue pre-filled with one integer slot per worker
+    """
+    global _worker_slot
+    _worker_slot = slot_queue.get()
+
+def empty_summary(scenario_cfg, worker):
+    """ The summary row of a scenario that has not run yet """
+    return {
+        "scenario": scenario_cfg,
+        "worker": worker,
+        "status": "Unknown",
+        "sim_time": 0,
+        "wall_time": 0,
+        "ticks": 0,
+        "ticks_per_sec": 0,
+        "results_file": "",
+        "error": ""
+    }
+
+def error_summary(scenario_cfg, err):
+    """ The summary row of a scenario whose worker failed before it could report (the worker is unknown) """
+    summary = empty_summary(scenario_cfg, "")
+    summary["status"] = "Error"
+    summary["error"] = repr(err)
+    return summary
+
+def run_scenario(scenario_cfg, batch_dir, base_zmq_port=5556, timedelta=.5, transport=None, profile=False):
+    """ Run one scenario headless until it terminates
+
+    Parameters
+    ----------
+    scenario_cfg : str
+        The path to the scenario YAML file
+    batch_dir : str
+        The directory that holds the results of the whole batch
+    base_zmq_port : int
+        The ZMQ port of worker 0; worker N publishes on base_zmq_port + 2N (and the port above it for telemetry)
+    timedelta : float
+        The simulated time that passes on each tick (in seconds)
+    transport : str, optional
+        The transport that overrides the scenario's io settings
+    profile : bool
+        Time each part of the tick; the span statistics are returned under the "profile" key
+
+    Returns
+    -------
+    dict
+        The summary row for this scenario
+    """
+    # Imported here so that only the worker processes pay for loading the simulator
+    import BattleshipSimulator.BattleshipController as BattleCtrl
+    import BattleshipSimulator.Models.Environment as Environment
+
+    summary = empty_summary(scenario_cfg, _worker_slot)
+    # Each scenario gets its own profiler, so that its timings can be merged into the batch's
+    profiler = Profiler.enable() if profile else None
+    start_time = time.perf_counter()
+    simulator = None
+    try:
+        simulator = Environment.Simulator(
+            scenario_cfg,
+            results_dir = os.path.join(batch_dir, f"worker-{_worker_slot}"),
+            zmq_port = base_zmq_port + 2 * _worker_slot,
+            client_id_suffix = f"_{os.getpid()}",
+            transport = transport
+        )
+        controller = BattleCtrl.BattleshipController(simulator)
+        simulator.start()
+        ticks = 0
+        while simulator.simulation_running:
+            controller.update(timedelta)
+            ticks += 1
+        summary["status"] = simulator.simulation_status
+        summary["sim_time"] = simulator.total_time
+        summary["ticks"] = ticks
+        summary["results_file"] = simulator.logger.filename
+    except Exception as err:
+        summary["status"] = "Error"
+        summary["error"] = repr(err)
+        # Release the worker's ZMQ ports so the next scenario on this worker can bind them
+        # (a simulator that failed while it was being created has already released them)
+        if simulator is not None:
+            simulator.release()
+    summary["wall_time"] = time.perf_counter() - start_time
+    if summary["wall_time"] > 0:
+        summary["ticks_per_sec"] = summary["ticks"] / summary["wall_time"]
+    if profiler is not None:
+        summary["profile"] = profiler.stats
+        Profiler.disable()
+    return summary
+
+def run_batch(scenario_files, workers=None, results_dir="results", base_zmq_port=5556, timedelta=.5, transport=None, profile=False):
+    """ Fan a list of scenarios out across a pool of worker processes
+
+    Each worker writes its results into its own sub-directory and publishes on its own ZMQ port.
+    Once every scenario has finished, a consolidated summary is written to the batch directory.
+
+    Parameters
+    ----------
+    scenario_files : list
+        The paths to the scenario YAML files
+    workers : int, optional
+        The number of worker processes (defaults to the number of CPUs)
+    results_dir : str
+        The directory that the batch directory is created in
+    base_zmq_port : int
+        The ZMQ port of worker 0
+    timedelta : float
+        The simulated time that passes on each tick (in seconds)
+    transport : str, optional
+        The transport that overrides the scenario's io settings
+    profile : bool
+        Time each part of the tick in every worker, and print the merged timings once the batch has finished
+
+    Returns
+    -------
+    list
+        The summary rows, in the same order as scenario_files
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(scenario_files)))
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")
+    batch_dir = os.path.join(results_dir, f"batch_{timestamp}")
+    os.makedirs(batch_dir, exist_ok = True)
+
+    print(f"Running {len(scenario_files)} scenarios on {workers} workers")
+    batch_start_time = time.perf_counter()
+    summaries = [None] * len(scenario_files)
+    profiler = Profiler.TickProfiler() if profile else None
+    with multiprocessing.Manager() as manager:
+        slot_queue = manager.Queue()
+        for slot in range(workers):
+            slot_queue.put(slot)
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers, initializer = _init_worker, initargs = (slot_queue,)) as executor:
+            futures = {executor.submit(run_scenario, scenario_cfg, batch_dir, base_zmq_port, timedelta, transport, profile): i for i, scenario_cfg in enumerate(scenario_files)}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    summary = future.result()
+                except Exception as err:
+                    # The worker itself failed (e.g. it was killed), so the scenario never reported back
+                    summary = error_summary(scenario_files[futures[future]], err)
+                profile_stats = summary.pop("profile", None)
+                if profiler is not None and profile_stats is not None:
+                    profiler.merge(profile_stats)
+                summaries[futures[future]] = summary
+                print(f"  {('+' if summary['status'] == 'Success' else '-')} {summary['scenario']}: {summary['status']} after {summary['sim_time']} simulated seconds ({round(summary['ticks_per_sec'], 1)} ticks/sec)")
+
+    summary_file = write_summary(summaries, os.path.join(batch_dir, "summary.csv"))
+    print(f"Finished {len(scenario_files)} scenarios in {round(time.perf_counter() - batch_start_time, 2)} seconds; summary written to {summary_file}")
+    if profiler is not None:
+        # The workers ran side by side, so the totals (and their share of the wall time) add up across workers
+        print(profiler.report())
+    return summaries
+
+def write_summary(summaries, filename):
+    """ Write the per-scenario summary rows to a CSV file
+
+    Parameters
+    ----------
+    summaries : list
+        The summary rows returned by run_scenario
+    filename : str
+        The path of the CSV file
+
+    Returns
+    -------
+    str
+        The path of the CSV file
+    """
+    with open(filename, "w", newline = "") as file:
+        writer = csv.DictWriter(file, fieldnames = SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(summaries)
+    return filename
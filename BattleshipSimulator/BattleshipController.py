@@ -1,4 +1,6 @@
 from BattleshipSimulator.Models.GetterSetter import GetterSetter
+from BattleshipSimulator.Scheduler import SimulationScheduler
+import threading
 
 class BattleshipController(GetterSetter):
     """
@@ -22,18 +24,89 @@ class BattleshipController(GetterSetter):
         super().__init__()
         self.simulation = simulation
         self.add_child("Simulation", self.simulation)
+        # Held while the simulation steps, so that other threads see it between steps (kept across restarts)
+        if not hasattr(self, "lock"):
+            self.lock = threading.RLock()
     
     def restart(self):
-        self.simulation.restart()
-        self.__init__(self.simulation)
-        self.simulation.start()
+        with self.lock:
+            self.simulation.restart()
+            self.__init__(self.simulation)
+            self.simulation.start()
     
     def update(self, timedelta):
-        if self.simulation.simulation_running:
-            self.simulation.update(timedelta)
+        with self.lock:
+            if self.simulation.simulation_running:
+                self.simulation.update(timedelta)
+
+    def scheduler(self, timedelta=.5, rate=None):
+        """
+        Create a scheduler that steps this controller's simulation.
+
+        Parameters:
+        -----------
+        timedelta : float
+            The simulated time that passes on each step (in seconds).
+        rate : float, optional
+            Simulated seconds per wall-clock second: 1 is real time, N is N times real time and None is as fast as possible.
+
+        Returns:
+        --------
+        SimulationScheduler
+            The scheduler; call `run` to step on this thread or `start` to step on a background thread.
+        """
+        return SimulationScheduler(self, timedelta, rate)
+
+    # The model attributes that a view draws, copied into every snapshot
+    VIEW_ATTRIBUTES = [
+        "x", "y", "heading", "current_speed", "chosen_heading", "actions", "under_attack_status", "predicted_attack",
+        "waypoint_heading", "chosen_direction", "option_port", "option_starboard", "user_override_heading", "ca_override_heading",
+        "RadarSonar:collision_warning", "RadarSonar:collision_event", "RadarSonar:radar_geometry",
+        "RadarSonar:radar_objects", "RadarSonar:warning_objects", "RadarSonar:collision_objects",
+        "Navigation:waypoints", "Navigation:completed_waypoints", "Navigation:ALLOWED_DISTANCE_ERROR", "Navigation:actual_path",
+        "Weapons:targets", "Weapons:to_attack_target_index", "CollisionAvoidance:relevant_objects"
+    ]
+
+    def snapshot(self):
+        """
+        Copy the state that a view needs to draw a frame, taken between two simulation steps.
+
+        The lock is only held while copying, so a view can draw from the snapshot while the simulation keeps stepping.
+
+        Returns:
+        --------
+        dict
+            The simulation's time, time step, status and log length, and for every model its position and
+            collision state along with each of VIEW_ATTRIBUTES (lists are copied).
+        """
+        with self.lock:
+            return {
+                "total_time": self.simulation.total_time,
+                "timedelta": self.simulation.timedelta,
+                "simulation_running": self.simulation.simulation_running,
+                "simulation_status": self.simulation.simulation_status,
+                "log_length": self.simulation.logger.length,
+                "models": {
+                    model_id: self.model_snapshot(model) for model_id, model in self.simulation.world.models.items()
+                }
+            }
+
+    def model_snapshot(self, model):
+        state = {}
+        for attribute in self.VIEW_ATTRIBUTES:
+            try:
+                value = model.get_attribute(attribute)
+            except (AttributeError, KeyError):
+                # Not every model carries every system
+                value = None
+            state[attribute] = list(value) if isinstance(value, list) else value
+        state["collision_warning"] = state["RadarSonar:collision_warning"]
+        state["collision_event"] = state["RadarSonar:collision_event"]
+        return state
 
     def logger_get(self, index):
-        return self.simulation.logger.get(index)
+        with self.lock:
+            return self.simulation.logger.get(index)
 
     def handle_action(self, action):
         """
@@ -5,4 +5,14 @@ SONAR_JAMMING = 3           # CPU usage and packet count increase
 COMMUNICATION_JAMMING = 4   # packet count and network bytes rate drop
 MINE = 5                    # Some or all systems shut down
 POWER_ATTACK = 6            # power attack
-RUDDER_ATTACK = 7           # rudder attack
\ No newline at end of file
+RUDDER_ATTACK = 7           # rudder attack
+# The name of each mode in output file names, e.g. output_GPS_SPOOFING.csv
+ATTACK_NAMES = {
+    NORMAL: "normal",
+    GPS_SPOOFING: "GPS_SPOOFING",
+    SONAR_JAMMING: "SONAR_JAMMING",
+    COMMUNICATION_JAMMING: "COMMUNICATION_JAMMING",
+    MINE: "MINE",
+    POWER_ATTACK: "POWER_ATTACK",
+    RUDDER_ATTACK: "RUDDER_ATTACK",
+}
@@ -1,6 +1,8 @@
 import BattleshipSimulator.Models.SimulatorUtilities as SimulatorUtilities
 import BattleshipSimulator.Supervisor.Navigators as SimulatorNavigators
 from BattleshipSimulator.Models.GetterSetter import GetterSetter
+from BattleshipSimulator.Models.StateHistory import StateHistory
+import BattleshipSimulator.Models.Profiler as Profiler
 from BattleshipSimulator.python_vehicle_simulator.vehicles import frigate
 import numpy as np
 
@@ -23,6 +25,8 @@ class BattleshipModel(GetterSetter):
     def __init__(self, **kwargs):
         super().__init__()
         self.subsystems = {}
+        # The profiler span of each subsystem's update, named once instead of on every tick
+        self.update_spans = {}
         
         if "supervisor" in kwargs:
             supervisor_args = [] if "supervisor_args" not in kwargs else kwargs["supervisor_args"]
@@ -97,12 +101,19 @@ class BattleshipModel(GetterSetter):
         
         self.vehicle = frigate('headingAutopilot', self.current_speed, self.heading)
         self.vehicle.L = abs(min_y) + abs(max_y)
-        self.simData = np.empty( [0, 12 + 2 * self.vehicle.dimU], float)
+        self.state_history = StateHistory(12 + 2 * self.vehicle.dimU)
         self.oldEta = np.array([self.x, self.y, 0, 0, 0, 0], float)
-        self.oldU = self.vehicle.u_actual
-        self.oldNu = self.vehicle.nu
+        # The states are advanced in place, so the vehicle's initial values are copied
+        self.oldU = self.vehicle.u_actual.copy()
+        self.oldNu = self.vehicle.nu.copy()
+        self.pending_heading = None
 
-    def update(self, timedelta):
+    @property
+    def simData(self):
+        # The vehicle state history (eta, nu, u_control, u_actual), one row per step
+        return self.state_history.view()
+
+    def update(self, timedelta, defer_dynamics=False):
         """
         Update the X and Y coordinates of the battleship at regular intervals.
 
@@ -110,16 +121,21 @@ class BattleshipModel(GetterSetter):
         -----------
         timedelta : float
             The time duration between coordinate updates (in seconds).
+        defer_dynamics : bool
+            Only choose the heading, leaving it in `pending_heading` for the world to step the
+            dynamics of every ship at once and then call `finish_step`.
         """
 
+        self.pending_heading = None
         self.ca_override = False
         self.ca_override_heading = None
         self.ca_override_speed = None
 
         self.user_override = False
 
-        for system in self.subsystems.values():
-            system.update(timedelta)
+        for system_name, system in self.subsystems.items():
+            with Profiler.span(self.update_spans[system_name]):
+                system.update(timedelta)
 
         self.under_attack_status = self.hardware.global_status  # CIP update under attack status
         self.predicted_attack = self.hardware.predicted_attack  # CIP update predict attack status
@@ -165,7 +181,8 @@ class BattleshipModel(GetterSetter):
             # If the headings are the same, then logic to do the collision avoidance
 
             # Use the ML to determine if the data has been manipulated
-            supervisor_data = {} if self.supervisor is None else self.supervisor.override()
+            with Profiler.span("Supervisor.override"):
+                supervisor_data = {} if self.supervisor is None else self.supervisor.override()
             self.supervisor_override_speed = supervisor_data["speed"] if "speed" in supervisor_data else None
             self.supervisor_override_heading = supervisor_data["heading"] if "heading" in supervisor_data else None
 
@@ -186,7 +203,8 @@ class BattleshipModel(GetterSetter):
             if "heading" not in supervisor_data or SimulatorUtilities.is_within_threshold(supervisor_data["heading"], self.waypoint_heading, 2):
 
                 if self.collision_avoidance is not None:
-                    ca_override_data = self.collision_avoidance.override()
+                    with Profiler.span("CollisionAvoidance.override"):
+                        ca_override_data = self.collision_avoidance.override()
                     
                     if len(ca_override_data) > 0:
                         self.ca_override = True
@@ -204,24 +222,39 @@ class BattleshipModel(GetterSetter):
                 if abs(abs(self.chosen_heading) - abs(self.heading)) > 1:
                     self.update_action_code(turning = True)
                 
-                # Generate the next set of data using the python vehicle simulator
-                thisSimData, self.oldEta, self.oldNu, self.oldU = SimulatorUtilities.getNextPosition(self.current_speed, self.chosen_heading, self.oldEta, self.vehicle, timedelta, self.oldNu, self.oldU, self.hardware)
-                self.simData = np.vstack([self.simData, thisSimData])
-
-                self.last_x, self.last_y, self.last_heading = self.x, self.y, self.heading
-                self.x = float(thisSimData[0][0])
-                self.y = float(thisSimData[0][1])
-                self.heading = SimulatorUtilities.calculate_angle_degrees(self.last_x, self.last_y, self.x, self.y)
+                if defer_dynamics:
+                    self.pending_heading = self.chosen_heading
+                    return None
 
-                if (self.last_x, self.last_y) != (self.x, self.y):
-                    self.update_action_code(moving = True)
-                self.actions = self.translate_action_code(self.action_code)
-                        
-                # If the ship goes outside of the guardrails, treat it like a collision
-                self.out_of_bounds = self.x <= self.guardrails[0] or self.x >= self.guardrails[2] or self.y <= self.guardrails[1] or self.y >= self.guardrails[3]
+                # Generate the next set of data using the python vehicle simulator
+                # The states are written straight into the next row of the history
+                with Profiler.span("getNextPosition"):
+                    thisSimData, self.oldEta, self.oldNu, self.oldU = SimulatorUtilities.getNextPosition(self.current_speed, self.chosen_heading, self.oldEta, self.vehicle, timedelta, self.oldNu, self.oldU, self.hardware, row = self.state_history.new_row())
+                self.finish_step(thisSimData)
             
             else:
                 self.current_speed = 0
+
+    def finish_step(self, thisSimData):
+        """
+        Move the battleship to the position of a new row of simulation data.
+
+        Parameters:
+        -----------
+        thisSimData : numpy.ndarray
+            The row of simulation data: [eta, nu, u_control, u_actual].
+        """
+        self.last_x, self.last_y, self.last_heading = self.x, self.y, self.heading
+        self.x = float(thisSimData[0])
+        self.y = float(thisSimData[1])
+        self.heading = SimulatorUtilities.calculate_angle_degrees(self.last_x, self.last_y, self.x, self.y)
+
+        if (self.last_x, self.last_y) != (self.x, self.y):
+            self.update_action_code(moving = True)
+        self.actions = self.translate_action_code(self.action_code)
+                
+        # If the ship goes outside of the guardrails, treat it like a collision
+        self.out_of_bounds = self.x <= self.guardrails[0] or self.x >= self.guardrails[2] or self.y <= self.guardrails[1] or self.y >= self.guardrails[3]
     
     def set_action_code(self, i):
         # The action code is a binary number that represents the states that the ship can be in
@@ -259,6 +292,25 @@ class BattleshipModel(GetterSetter):
                 logging_package[f"{child_name}.{k}"] = v
         return logging_package
 
+    def logging_fields(self, prefix=""):
+        """
+        List where each logged value lives, in the same order as `logging_package`.
+
+        Parameters:
+        -----------
+        prefix : str
+            Prepended to every column name.
+
+        Returns:
+        --------
+        list
+            (column name, owning object, attribute name) tuples.
+        """
+        fields = [(prefix + k, self, k) for k in self.logging_variables]
+        for child_name, child in self.children.items():
+            fields += [(f"{prefix}{child_name}.{k}", child, k) for k in child.logging_variables]
+        return fields
+
     def attach_system(self, system_name, system):
         """
         Attach a system to the battleship and register its commands.
@@ -273,6 +325,7 @@ class BattleshipModel(GetterSetter):
 
         self.add_child(system_name, system)
         self.subsystems[system_name] = system
+        self.update_spans[system_name] = f"{system_name}.update"
         for command in system.commands():
             if command in self.command_registry:
                 raise KeyError(f"Could not attach '{system.__class__.__name__}'; command '{command}' already handled by '{self.command_registry[command].__class__.__name__}'")
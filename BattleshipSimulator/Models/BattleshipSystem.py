@@ -1,9 +1,10 @@
 import BattleshipSimulator.Models.SimulatorUtilities as SimulatorUtilities
 import BattleshipSimulator.Models.BattleshipConstant as BattleshipConstant
+import BattleshipSimulator.Models.SpatialIndex as SpatialIndex
 from BattleshipSimulator.Models.GetterSetter import GetterSetter
 from shapely.geometry import Point, Polygon
 import random
-import csv
+import math
 
 class BattleshipSystem(GetterSetter):
     """
@@ -267,6 +268,12 @@ class RadarSonar(BattleshipSystem):
         self.radar_geometry = self.get_radar_geometry(self.model.x, self.model.y, self.radar_range)
         self.collision_warning = False
         self.collision_event = False
+        # Other ships find this one through the world's spatial index
+        self.spatial_index = None if self.model.world is None else self.model.world.spatial_index
+        # The polygons of the chart obstacles are built once and shared by every ship
+        self.geometry_cache = None if self.model.world is None else self.model.world.geometry_cache
+        if self.spatial_index is not None:
+            self.spatial_index.update_model(self.model, self.transformed_geometry)
     
     def update(self, timedelta):
         # Identify collisions with the known world
@@ -277,41 +284,54 @@ class RadarSonar(BattleshipSystem):
         current_msa_geometry = SimulatorUtilities.transform_coordinates(self.minimum_safe_area_geometry, self.model.x, self.model.y, self.model.heading)
         self.transformed_geometry = SimulatorUtilities.transform_coordinates(self.model.geometry, self.model.x, self.model.y, self.model.heading)
         self.radar_geometry = self.get_radar_geometry(self.model.x, self.model.y, self.radar_range)
-        object_names = [k for k,m in self.get_attribute("World:models").items() if m is not self.model]
+        world_models = self.get_attribute("World:models")
+        object_names = [k for k,m in world_models.items() if m is not self.model]
         self.objects = [self.get_attribute(f"World:{n}:RadarSonar:transformed_geometry") for n in object_names]
+        if self.spatial_index is None:
+            candidate_objects = self.chart + self.objects
+        else:
+            self.spatial_index.update_model(self.model, self.transformed_geometry)
+            # Nothing outside both the radar range and the minimum safe area can be detected, warned about or collided with
+            search_regions = [SpatialIndex.coordinate_bounds(self.radar_geometry), SpatialIndex.coordinate_bounds(current_msa_geometry)]
+            nearby_models = set(self.spatial_index.query_models([world_models[n] for n in object_names], search_regions))
+            candidate_objects = self.spatial_index.query_obstacles(search_regions) + [o for n, o in zip(object_names, self.objects) if world_models[n] in nearby_models]
         self.radar_objects = []
         self.radar_object_distances = []
         self.warning_objects = []
         self.warning_object_distances = []
         self.collision_objects = []
-        for world_object in self.chart + self.objects:
-            in_radar_range, intersecting_shapes = SimulatorUtilities.polygons_intersect(self.radar_geometry, world_object)
+        # Build the ship's own shapes once, rather than once per object
+        radar_polygon = Polygon(self.radar_geometry)
+        msa_polygon = Polygon(current_msa_geometry)
+        hull_polygon = Polygon(self.transformed_geometry)
+        for world_object in candidate_objects:
+            if self.is_within_radar_range(world_object):
+                # The intersection of a shape that lies entirely in range is the shape itself
+                in_radar_range, intersecting_shapes = True, [self.geometry_cache.ring(world_object)]
+            else:
+                in_radar_range, intersecting_shapes = SimulatorUtilities.polygons_intersect(radar_polygon, world_object, self.geometry_cache)
             if in_radar_range:
                 for intersecting_shape in intersecting_shapes:
                     self.radar_objects.append(intersecting_shape)
                     # Get the distances
                     self.radar_object_distances.append([SimulatorUtilities.distance(c, (self.model.x, self.model.y)) for c in intersecting_shape])
 
-            in_msa_range, intersecting_shapes = SimulatorUtilities.polygons_intersect(current_msa_geometry, world_object)
+            in_msa_range, intersecting_shapes = SimulatorUtilities.polygons_intersect(msa_polygon, world_object, self.geometry_cache)
             if in_msa_range:
                 self.collision_warning = True
                 for intersecting_shape in intersecting_shapes:
                     self.warning_objects.append(intersecting_shape)
                     # Get the distances
                     self.warning_object_distances.append([SimulatorUtilities.distance(c, (self.model.x, self.model.y)) for c in intersecting_shape])
-                if SimulatorUtilities.polygons_intersect(self.transformed_geometry, world_object)[0]:
+                if SimulatorUtilities.polygons_intersect(hull_polygon, world_object, self.geometry_cache)[0]:
                     self.collision_event = True
                     self.collision_objects.append(world_object)
 
         if self.model.hardware.global_status == BattleshipConstant.SONAR_JAMMING:
             self.fake_radar_objects = [[0 for i in range(0, random.randint(2, 5))] for i in range(0, random.randint(1, 6))]
-            with open("output\output_sonar_jamming_object.csv", "a", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow([self.fake_radar_objects, len(self.fake_radar_objects)])
+            self.model.hardware.outputs.writerow("output_sonar_jamming_object.csv", [self.fake_radar_objects, len(self.fake_radar_objects)])
         else:
-            with open("output\output_sonar.csv", "a", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow([self.radar_objects, len(self.radar_objects)])
+            self.model.hardware.outputs.writerow("output_sonar.csv", [self.radar_objects, len(self.radar_objects)])
     
     def commands(self):
         return ["TOGGLE"]
@@ -326,5 +346,22 @@ class RadarSonar(BattleshipSystem):
     def calculate_min_safe_distance_area(self):
         return SimulatorUtilities.buffer_shape(self.model.geometry, self.minimum_safe_distance)
 
+    def is_within_radar_range(self, world_object):
+        """
+        Check whether a cached chart obstacle lies entirely inside the radar range.
+
+        Such an obstacle is its own intersection with the radar, so its cached ring (see GeometryCache.ring)
+        is reported instead of computing the intersection. The ring has the same coordinate form as an
+        intersection and a stable identity, so the navigators can reuse its cached polygons; only the vertex
+        at which it starts may differ from the ring that Shapely would return.
+        """
+        cached_object = None if self.geometry_cache is None else self.geometry_cache.get(world_object)
+        if cached_object is None:
+            return False
+        # The radar polygon approximates the circle with 60 chords, so test against the radius of its inscribed circle
+        inscribed_range = self.radar_range * math.cos(math.pi / 60)
+        min_x, min_y, max_x, max_y = cached_object.bounds
+        return all(math.hypot(cx - self.model.x, cy - self.model.y) <= inscribed_range for cx in (min_x, max_x) for cy in (min_y, max_y))
+
     def get_radar_geometry(self, x, y, r):
         return list(Point(x, y).buffer(r, resolution = 15).exterior.coords)
\ No newline at end of file
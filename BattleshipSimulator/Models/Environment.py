@@ -2,18 +2,20 @@ import BattleshipSimulator.Models.BattleshipModel as BattleModel
 from BattleshipSimulator.Models.GetterSetter import GetterSetter
 import BattleshipSimulator.Models.BattleshipSystem as BattleSystem
 import BattleshipSimulator.Models.SimulatorUtilities as SimulatorUtilities
-from BattleshipSimulator.Models.Logger import CSVLogger
+from BattleshipSimulator.Models.Logger import CSVLogger, LoggingSchema, LogEncoder
+import BattleshipSimulator.Models.Transport as Transport
+import BattleshipSimulator.Models.SpatialIndex as SpatialIndex
+import BattleshipSimulator.Models.GeometryCache as GeometryCache
 import BattleshipSimulator.Models.BattleshipConstant as BattleshipConstant
+import BattleshipSimulator.Models.Profiler as Profiler
+import BattleshipSimulator.Models.OutputManager as OutputManager
+from BattleshipSimulator.python_vehicle_simulator.vehicles import frigateBatch
 import datetime
 import time
 import random
 import numpy as np
-import csv
 import pickle
-import pandas as pd
-from multiprocessing import shared_memory
 import json
-import paho.mqtt.client as mqtt
 import copy
 import os
 
@@ -27,7 +29,12 @@ class MessageSystem(GetterSetter):
         self.power_sys_log = []
 
 class Hardware(GetterSetter):
-    def __init__(self):
+
+    # The features of the trained ICS Monitor model, in the order it was trained on
+    FEATURE_ORDER = ["CPU Usage", "Memory Usage", "IO Usage", "Process Num", "Network Bytes Rate", "Packet Count", "GPS X Offset", "GPS Y Offset"]
+    MODEL_PATH = "AI-Models/ICS_TRAINING_V2/ICS_Monitor.pkl"
+
+    def __init__(self, transport=None, verdicts=None, outputs=None):
         super().__init__()
         self.hardware_data = {
             "CPU Usage": 0,
@@ -53,29 +60,34 @@ class Hardware(GetterSetter):
         self.power_log = [copy.deepcopy(self.power)]
         self.rudder_log = []
 
-        # Load the trained ICS Monitor model
-        self.model = None
-        self.power_data_client = None
-        self.rudder_data_client = None
-        self.weapon_data_client = None
-        self.image_data_client = None
-        with open("AI-Models/ICS_TRAINING_V2/ICS_Monitor.pkl", "rb") as file:
-            self.model = pickle.load(file)
+        # The trained ICS Monitor model is only loaded when it is used (loading it imports scikit-learn)
+        self.loaded_model = None
 
-        try:
-            self.shared_mem_aggregator = shared_memory.SharedMemory("aggregator", False, 10)
-        except:
-            self.shared_mem_aggregator = shared_memory.SharedMemory("aggregator", True, 10)
-        self.shared_mem_aggregator_buff = self.shared_mem_aggregator.buf
-        self.shared_mem_aggregator_buff[0] = 1
-
-        # Extract and validate feature names
-        self.feature_order = list(self.model.feature_names_in_)
+        # The channel that telemetry for the IDS scripts is published on, and where their aggregated verdict is read from
+        self.transport = Transport.NullTransport() if transport is None else transport
+        self.verdicts = Transport.SharedMemoryVerdictSource() if verdicts is None else verdicts
+        self.power_window = Transport.TelemetryWindow(self.transport, "submarine/power_input", ["Power"])
+        self.rudder_window = Transport.TelemetryWindow(self.transport, "submarine/rudder_input", ["heading", "rudder angle", "rudder power"])
+        # The side CSV outputs of the run (hardware, power, rudder and sonar readings)
+        self.outputs = OutputManager.NullOutputManager() if outputs is None else outputs
+
+        # Validate feature names
+        self.feature_order = list(self.FEATURE_ORDER)
         self.validate_features()
 
         # Initialize CSV files
         self.init_csv_files()
 
+    @property
+    def model(self):
+        """The trained ICS Monitor model, loaded on first use."""
+        if self.loaded_model is None:
+            with open(self.MODEL_PATH, "rb") as file:
+                self.loaded_model = pickle.load(file)
+            if list(self.loaded_model.feature_names_in_) != self.feature_order:
+                raise ValueError(f"The ICS Monitor model expects the features {list(self.loaded_model.feature_names_in_)}, not {self.feature_order}")
+        return self.loaded_model
+
     def validate_features(self):
         """Validate feature names in hardware_data against the model's expected features."""
         hardware_keys = set(self.hardware_data.keys())
@@ -89,16 +101,14 @@ class Hardware(GetterSetter):
         if extra_keys:
             print(f"Warning: Extra keys in hardware_data (not used in model): {extra_keys}")
 
+    def hardware_output(self, attack_code):
+        """Return the name of the CSV file that the hardware readings are written to while an attack code is predicted."""
+        return f"output_{BattleshipConstant.ATTACK_NAMES.get(attack_code, attack_code)}.csv"
+
     def init_csv_files(self):
-        headers = [
-            "CPU Usage", "IO Usage", "Memory Usage", "Process Num",
-            "Network Bytes Rate", "Packet Count", "GPS X Offset", "GPS Y Offset"
-        ]
-        attack_types = ["normal", "GPS_SPOOFING", "SONAR_JAMMING", "COMMUNICATION_JAMMING", "MINE"]
-        for attack in attack_types:
-            with open(f"output_{attack}.csv", "w", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow(headers)
+        # The hardware rows are written in the model's feature order, so the header follows it too
+        for attack_code in BattleshipConstant.ATTACK_NAMES:
+            self.outputs.set_header(self.hardware_output(attack_code), self.feature_order)
 
     def update(self, timeDelta):
         self.counter += 1
@@ -115,13 +125,9 @@ class Hardware(GetterSetter):
         # update into the message queue
         self.message.hardware_log.append(self.hardware_data.items())
 
-        # Reorder hardware_data to match feature order in the model
-        prediction_data = {key: self.hardware_data[key] for key in self.feature_order}
-        data = pd.DataFrame([prediction_data])  # DataFrame with correct feature order
-
         # Use the model to predict the attack type
-        #self.predicted_attack = self.model.predict(data)[0]
-        self.predicted_attack = self.shared_mem_aggregator_buff[0]
+        #self.predicted_attack = self.model.predict(pd.DataFrame([self.hardware_data], columns = self.feature_order))[0]
+        self.predicted_attack = self.verdicts.read()
         print(self.predicted_attack)
 
         # Alert the detected attack type
@@ -130,37 +136,17 @@ class Hardware(GetterSetter):
 
         # Write the data to the appropriate CSV file
         values_array = [self.hardware_data[key] for key in self.feature_order]
-        with open(f"output\output_{self.predicted_attack}.csv", "a", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow(values_array)
+        self.outputs.writerow(self.hardware_output(self.predicted_attack), values_array)
 
         if (self.global_status == BattleshipConstant.POWER_ATTACK):
-            with open("output\output_power_attack.csv", "a", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow(self.power)
+            self.outputs.writerow("output_power_attack.csv", self.power)
         else:
-            with open("output\output_power.csv", "a", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow(self.power)
+            self.outputs.writerow("output_power.csv", self.power)
 
         self.power_log.append(copy.deepcopy(self.power))
 
-        # client send power log to mqtt server
-        if (len(self.power_log) >= 10):
-            group_log = [self.power_log[-10:]]
-            for i, chunk in enumerate(group_log):
-                # Convert the chunk to JSON
-                chunk = pd.DataFrame(chunk, columns=["Power"])
-                chunk_json = chunk.to_json(orient="records")
-                payload = json.dumps({"ChunkID": i, "Data": chunk_json})
-                #print(payload)
-
-                # Publish the chunk
-                #self.power_data_client.publish("submarine/power_input", payload)
-                os.system(f"mosquitto_pub -h localhost -t \"submarine/power_input\" -m {payload}")
-
-                #print(payload)
-
+        # Publish the power readings to the power IDS, one message per window
+        self.power_window.append(self.power)
 
         # Simulate hardware metrics
         self.simulate_hardware_metrics()
@@ -210,43 +196,66 @@ class Hardware(GetterSetter):
 
 class Simulator(GetterSetter):
 
-    def __init__(self, config_file, prediction_window=None):  # Add `prediction_window` argument
+    def __init__(self, config_file, prediction_window=None, results_dir="results", zmq_port=5556, mqtt_host="localhost", mqtt_port=1883, client_id_suffix="", transport=None):  # Add `prediction_window` argument
         super().__init__()
         self.config_file = config_file
+        # Keep the endpoint settings so that a restart reuses the same results directory, ports, client IDs and transports
+        self.endpoint_kwargs = {
+            "results_dir": results_dir,
+            "zmq_port": zmq_port,
+            "mqtt_host": mqtt_host,
+            "mqtt_port": mqtt_port,
+            "client_id_suffix": client_id_suffix,
+            "transport": transport
+        }
         self.success_conditions = {}
         self.failure_conditions = {}
+        io_config = self.resolve_io_config(SimulatorUtilities.load_yaml(config_file).get("io", {}), transport)
         # Format the date and time in a filename-safe way
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")
-        self.logger = CSVLogger(f"results/{timestamp}_{SimulatorUtilities.get_filename_without_extension(config_file)}_results.csv")
-        
-        # set up mqtt server
-        BROKER = "localhost"
-        PORT = 1883
-        TOPIC = "submarine/power_input"
-        self.power_data_client = mqtt.Client(client_id="Power_Data_Passer", protocol=mqtt.MQTTv311, callback_api_version=mqtt.CallbackAPIVersion.VERSION1)
-        self.power_data_client.connect(BROKER, PORT, 60)
-        self.rudder_data_client = mqtt.Client(client_id="Rudder_Data_Passer", protocol=mqtt.MQTTv311, callback_api_version=mqtt.CallbackAPIVersion.VERSION1)
-        self.rudder_data_client.connect(BROKER, PORT, 60)
-        self.weapon_data_client = mqtt.Client(client_id="Weapons_Data_Passer", protocol=mqtt.MQTTv311, callback_api_version=mqtt.CallbackAPIVersion.VERSION1)
-        self.weapon_data_client.connect(BROKER, PORT, 60)
-        self.image_data_client = mqtt.Client(client_id="Image_Publisher", protocol=mqtt.MQTTv311, callback_api_version=mqtt.CallbackAPIVersion.VERSION1)
-        self.image_data_client.connect(BROKER, PORT)
+        run_name = f"{timestamp}_{SimulatorUtilities.get_filename_without_extension(config_file)}"
+        self.logger = CSVLogger(
+            os.path.join(results_dir, f"{run_name}_results.csv"),
+            publisher = self.create_transport(io_config["logger"], zmq_port, mqtt_host, mqtt_port, f"Logger_Publisher{client_id_suffix}", io_config["publish_queue_size"]),
+            encoder = LogEncoder(io_config["logger_mode"], io_config["keyframe_interval"], io_config["logger_encoding"], io_config["logger_topic_depth"]),
+            repeat_unchanged = not io_config["logger_sparse_csv"]
+        )
+        self.io_closed = False
+        # Until they are created, the channels are null objects, so a failed start can close whatever was opened
+        self.transport = Transport.NullTransport()
+        self.verdicts = Transport.NullVerdictSource()
+        self.outputs = OutputManager.NullOutputManager()
+        try:
+            self.setup_io(io_config, results_dir, run_name, zmq_port, mqtt_host, mqtt_port, client_id_suffix)
+            self.add_child("Logger", self.logger)
+            self.setup()
+        except Exception:
+            # The logger's socket is already bound; release it so that the next simulator on these ports can start
+            self.release()
+            raise
+
+    def setup_io(self, io_config, results_dir, run_name, zmq_port, mqtt_host, mqtt_port, client_id_suffix):
+        """Create the telemetry channel, the verdict source, the side outputs and the hardware that uses them."""
+        # set up the telemetry channel for the IDS scripts
+        # The broker drops an existing connection when a new one reuses its client ID, so parallel simulators need a unique suffix
+        # The telemetry ZMQ socket sits one port above the logger's so both can be enabled at once
+        self.transport = self.create_transport(io_config["telemetry"], zmq_port + 1, mqtt_host, mqtt_port, f"Telemetry_Publisher{client_id_suffix}", io_config["publish_queue_size"])
+        # Network transports publish from a background thread so the simulation never waits on a socket
+        if io_config["telemetry"] in ["mqtt", "zmq"]:
+            self.transport = Transport.BackgroundPublisher(self.transport, io_config["publish_queue_size"])
+        self.verdicts = Transport.create_verdict_source(io_config["verdicts"])
+        # The side CSV outputs of this run go to their own directory next to the results file
+        self.outputs = OutputManager.OutputManager(os.path.join(results_dir, f"{run_name}_outputs"), io_config["output_flush_rows"], io_config["output_flush_interval"])
 
         # Pass the prediction_window to Hardware
         self.message = MessageSystem()
-        self.hardware = Hardware()    # Pass prediction_window here
-        self.hardware.power_data_client = self.power_data_client
-        self.hardware.rudder_data_client = self.rudder_data_client
-        self.hardware.weapon_data_client = self.weapon_data_client
-        self.hardware.image_data_client = self.image_data_client
-
-        self.add_child("Logger", self.logger)
-        self.setup()
+        self.hardware = Hardware(self.transport, self.verdicts, self.outputs)    # Pass prediction_window here
     
     def setup(self):
         self.total_time = 0
         self.timedelta = 0
         self.logging_variables = ["total_time", "timedelta", "simulation_status"]
+        self.logging_schema = None
         #TODO: move scenario logic outside of the controller, where it belongs
         config_data = SimulatorUtilities.load_yaml(self.config_file)
         # Create the world where the models will exist
@@ -295,10 +304,17 @@ class Simulator(GetterSetter):
     
     def update(self, timedelta):
         if self.simulation_running and not self.simulation_paused:
-            self.total_time += timedelta
-            self.timedelta = timedelta
+            with Profiler.span("Simulator.update"):
+                self.step(timedelta)
+
+    def step(self, timedelta):
+        self.total_time += timedelta
+        self.timedelta = timedelta
+        with Profiler.span("World.update"):
             self.world.update(timedelta)
+        with Profiler.span("Hardware.update"):
             self.hardware.update(timedelta)     # CIP
+        with Profiler.span("Conditions"):
             # Check for success
             for condition_variable, condition_value in self.success_conditions.items():
                 if self.get_attribute(condition_variable) == condition_value:
@@ -312,12 +328,14 @@ class Simulator(GetterSetter):
                         break
             if self.simulation_running and self.total_time > (12 * 60 * 60):
                 self.terminate(2)
-            
-            self.logger.log(self.logging_package())
-            # Check if the simulator has stopped
-            if not self.simulation_running:
-                self.logger.close()
-                self.logger.rename_file(self.logger.filename[:-4] + f"_{self.simulation_status}.csv")
+        
+        with Profiler.span("CSVLogger.log"):
+            self.logger.log(self.logging_record(), self.logging_schema)
+        # Check if the simulator has stopped
+        if not self.simulation_running:
+            self.logger.close()
+            self.close_io()
+            self.logger.rename_file(self.logger.filename[:-4] + f"_{self.simulation_status}.csv")
     
     def start(self):
         self.start_time = time.time()
@@ -331,6 +349,7 @@ class Simulator(GetterSetter):
     
     def terminate(self, status_code):
         self.simulation_running = False
+        self.outputs.flush()
         match status_code:
             case 0:
                 self.simulation_status = "Success"
@@ -340,7 +359,9 @@ class Simulator(GetterSetter):
                 self.simulation_status = "Fail-Timeout"
     
     def restart(self):
-        self.__init__(self.config_file)
+        # Release the ports held by a simulation that is restarted before it terminates
+        self.release()
+        self.__init__(self.config_file, **self.endpoint_kwargs)
     
     def logging_package(self):
         logging_package = {k: getattr(self, k) for k in self.logging_variables}
@@ -349,6 +370,85 @@ class Simulator(GetterSetter):
             logging_package[f"World.{k}"] = v
         return logging_package
 
+    def logging_fields(self):
+        """List where each logged value lives, in the same order as `logging_package`."""
+        return [(k, self, k) for k in self.logging_variables] + self.world.logging_fields("World.")
+
+    def logging_record(self):
+        """
+        Collect this tick's logged values into the schema's flat record.
+
+        The schema is built on first use and rebuilt whenever an object tree has changed since.
+        """
+        if self.logging_schema is None or self.logging_schema.tree_version != self.subtree_version:
+            self.logging_schema = LoggingSchema(self.logging_fields(), self.subtree_version)
+        return self.logging_schema.collect()
+
+    def resolve_io_config(self, io_config, transport=None):
+        """
+        Work out which backend each I/O channel uses.
+
+        The scenario may set any of the "telemetry", "logger" and "verdicts" channels under its `io` key,
+        along with the "publish_queue_size" (the most messages that the background telemetry publisher or a "queue"
+        transport holds) and the LogEncoder
+        settings of the logger ("logger_mode", "keyframe_interval", "logger_encoding", "logger_topic_depth" and "logger_sparse_csv"),
+        and when the side CSV outputs are flushed ("output_flush_rows" and "output_flush_interval").
+        A transport given on the command line overrides both publishing channels; since the "null" and
+        "queue" transports never reach the IDS scripts, they also stop the verdicts being read from shared memory.
+
+        Parameters:
+        -----------
+        io_config : dict
+            The `io` section of the scenario.
+        transport : str or None
+            The transport that overrides the scenario, if any.
+
+        Returns:
+        --------
+        dict
+            The backend name of each channel and the publishing settings.
+        """
+        resolved = {
+            "telemetry": "mqtt", "logger": "zmq", "verdicts": "shared_memory", "publish_queue_size": 256,
+            "logger_mode": "full", "keyframe_interval": 50, "logger_encoding": "json", "logger_topic_depth": None, "logger_sparse_csv": False,
+            "output_flush_rows": 512, "output_flush_interval": 1.0
+        }
+        for channel, backend in io_config.items():
+            if channel not in resolved:
+                raise KeyError(f"Unknown io setting '{channel}'; expected one of {list(resolved)}")
+            resolved[channel] = backend
+        if transport is not None:
+            resolved["telemetry"] = transport
+            resolved["logger"] = transport
+            if transport in ["null", "queue"]:
+                resolved["verdicts"] = "null"
+        return resolved
+
+    def create_transport(self, backend, zmq_port, mqtt_host, mqtt_port, client_id, queue_size):
+        """Create the transport for one channel, passing it only the endpoint settings that it uses."""
+        match backend:
+            case "queue":
+                return Transport.create_transport(backend, maxsize = queue_size)
+            case "zmq":
+                return Transport.create_transport(backend, port = zmq_port)
+            case "mqtt":
+                return Transport.create_transport(backend, host = mqtt_host, port = mqtt_port, client_id = client_id)
+            case _:
+                return Transport.create_transport(backend)
+
+    def close_io(self):
+        """Close the telemetry channel, the verdict source and the side outputs (the logger closes its own publisher)."""
+        self.io_closed = True
+        self.transport.close()
+        self.verdicts.close()
+        self.outputs.close()
+
+    def release(self):
+        """Close the logger and every channel unless the simulation already did when it terminated; safe to call more than once."""
+        if not self.io_closed:
+            self.logger.close()
+            self.close_io()
+
     def recursive_key_update(self, configuration, update_dict):
         for key, value in update_dict.items():
             if type(value) is dict:
@@ -365,12 +465,66 @@ class World(GetterSetter):
         super().__init__()
         # Generate objects that are in the way - make this better in the future
         self.obstacles = [] if "obstacles" not in kwargs else kwargs["obstacles"]
+        # Lets the radar skip obstacles and ships that are nowhere near it
+        self.spatial_index = SpatialIndex.SpatialIndex(self.obstacles)
+        # The obstacles never change, so their Shapely polygons are built once
+        self.geometry_cache = GeometryCache.GeometryCache(self.obstacles)
+        # Step the dynamics of every ship with one vectorized call, once every ship has chosen its heading
+        self.batch_dynamics = False if "batch_dynamics" not in kwargs else kwargs["batch_dynamics"]
+        self.fleet = None
+        self.fleet_models = []
         self.logging_variables = []
         self.models = {}
     
     def update(self, timedelta):
+        if not self.batch_dynamics:
+            for model in self.models.values():
+                model.update(timedelta)
+            return
         for model in self.models.values():
-            model.update(timedelta)
+            model.update(timedelta, defer_dynamics = True)
+        with Profiler.span("World.step_fleet"):
+            self.step_fleet(timedelta)
+
+    def build_fleet(self):
+        """
+        Stack the states of every model into one frigateBatch, leaving each model's eta, nu and u_actual
+        as views of its rows so that the batch and the models never disagree.
+        """
+        if self.fleet is not None:
+            self.fleet.store()
+        self.fleet_models = list(self.models.values())
+        self.fleet = frigateBatch([model.vehicle for model in self.fleet_models], [model.oldEta for model in self.fleet_models])
+        for n, model in enumerate(self.fleet_models):
+            self.fleet.nu[n] = model.oldNu
+            self.fleet.u_actual[n] = model.oldU
+            model.oldEta, model.oldNu, model.oldU = self.fleet.eta[n], self.fleet.nu[n], self.fleet.u_actual[n]
+
+    def step_fleet(self, timedelta):
+        """
+        Step the dynamics of the models that chose a heading during this update.
+
+        Parameters:
+        -----------
+        timedelta : float
+            The time that passes (in seconds).
+        """
+        if self.fleet_models != list(self.models.values()):
+            self.build_fleet()
+        index = np.array([n for n, model in enumerate(self.fleet_models) if model.pending_heading is not None], int)
+        if len(index) == 0:
+            return
+        moving = [self.fleet_models[n] for n in index]
+        self.fleet.ref[index] = [model.pending_heading for model in moving]
+        delta_c = self.fleet.rudderCommand(timedelta, index)
+        rows = np.concatenate([self.fleet.eta[index], self.fleet.nu[index], delta_c[:, None], self.fleet.u_actual[index]], axis = 1)
+        # Each ship's hardware sees (and may tamper with) its own rudder command
+        for k, model in enumerate(moving):
+            model.state_history.append(rows[k])
+            delta_c[k] = SimulatorUtilities.applyRudderCommand(model.hardware, model.pending_heading, delta_c[k])
+        self.fleet.integrate(delta_c, timedelta, index)
+        for k, model in enumerate(moving):
+            model.finish_step(rows[k])
     
     def logging_package(self):
         logging_package = {k: getattr(self, k) for k in self.logging_variables}
@@ -380,6 +534,13 @@ class World(GetterSetter):
                 logging_package[f"{model_name}.{k}"] = v
         return logging_package
 
+    def logging_fields(self, prefix=""):
+        """List where each logged value lives, in the same order as `logging_package`."""
+        fields = [(prefix + k, self, k) for k in self.logging_variables]
+        for model_name, model in self.models.items():
+            fields += model.logging_fields(f"{prefix}{model_name}.")
+        return fields
+
     def attach_model(self, model_id, model):
         if model_id in self.models:
             raise KeyError(f"The world already has a model with an ID of '{model_id}' assigned")
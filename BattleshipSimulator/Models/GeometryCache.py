@@ -0,0 +1,109 @@
+import BattleshipSimulator.Models.SimulatorUtilities as SimulatorUtilities
+from shapely.geometry import Polygon
+from shapely.prepared import prep
+
+class CachedGeometry:
+    """
+    The Shapely objects derived from one static shape.
+
+    Attributes:
+    -----------
+    coords : list of tuple
+        The shape's coordinates, as given when it was registered.
+    polygon : shapely.geometry.Polygon
+        The polygon built from the coordinates.
+    prepared : shapely.prepared.PreparedGeometry
+        The prepared polygon, which answers repeated intersects/contains predicates quickly.
+    buffered : dict
+        The coordinates of the shape grown by each safety distance that has been asked for.
+    ring : list of tuple or None
+        The polygon's exterior as a closed list of (x, y) float tuples, once it has been asked for.
+    """
+
+    def __init__(self, coords):
+        self.coords = coords
+        self.polygon = Polygon(coords)
+        self.prepared = prep(self.polygon)
+        self.bounds = self.polygon.bounds
+        self.buffered = {}
+        self.ring = None
+
+class GeometryCache:
+    """
+    Caches the polygons, prepared polygons and buffered variants of shapes that never change (e.g. chart obstacles).
+
+    Shapes are looked up by identity, so the same coordinate list that was registered must be passed back in.
+    Any other shape is converted on the fly and not stored, which makes the cache safe to use with the
+    per-tick geometry of moving ships.
+    """
+
+    def __init__(self, shapes=()):
+        """
+        Parameters:
+        -----------
+        shapes : list
+            The static shapes to register, each a list of (x, y) tuples.
+        """
+        self.entries = {}
+        for shape in shapes:
+            self.register(shape)
+
+    def register(self, shape):
+        """
+        Add a static shape to the cache.
+
+        Parameters:
+        -----------
+        shape : list of tuple
+            The shape's coordinates. The list must not be modified afterwards.
+
+        Returns:
+        --------
+        CachedGeometry
+            The cached objects of the shape.
+        """
+        # The entry keeps a reference to the shape, so its id cannot be reused while it is cached
+        if id(shape) not in self.entries:
+            self.entries[id(shape)] = CachedGeometry(shape)
+        return self.entries[id(shape)]
+
+    def get(self, shape):
+        """Return the cached objects of a shape, or None if it was never registered."""
+        return self.entries.get(id(shape))
+
+    def polygon(self, shape):
+        """Return the polygon of a shape."""
+        entry = self.get(shape)
+        return Polygon(shape) if entry is None else entry.polygon
+
+    def prepared(self, shape):
+        """Return the prepared polygon of a registered shape, or a plain polygon (which has the same predicates) otherwise."""
+        entry = self.get(shape)
+        return Polygon(shape) if entry is None else entry.prepared
+
+    def ring(self, shape):
+        """
+        Return the exterior of a registered shape in the form that SimulatorUtilities.polygons_intersect returns
+        intersections in: a closed list of (x, y) float tuples.
+
+        The ring is built once and shares the shape's cache entry, so predicates on it are cached too.
+        """
+        entry = self.get(shape)
+        if entry.ring is None:
+            entry.ring = list(entry.polygon.exterior.coords)
+            self.entries[id(entry.ring)] = entry
+        return entry.ring
+
+    def buffered(self, shape, distance):
+        """
+        Return the coordinates of a shape grown by a safety distance, as SimulatorUtilities.buffer_shape does.
+
+        The buffered coordinates of a registered shape are registered in turn, so predicates on them are cached too.
+        """
+        entry = self.get(shape)
+        if entry is None:
+            return SimulatorUtilities.buffer_shape(shape, distance)
+        if distance not in entry.buffered:
+            entry.buffered[distance] = SimulatorUtilities.buffer_shape(shape, distance)
+            self.register(entry.buffered[distance])
+        return entry.buffered[distance]
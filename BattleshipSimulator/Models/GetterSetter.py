@@ -1,49 +1,99 @@
 class GetterSetter:
 
+    # Bumped whenever any object tree changes shape, which invalidates every compiled path
+    tree_version = 0
+    # Bumped on an object and all of its ancestors whenever a child is added below it
+    subtree_version = 0
+
     def  __init__(self):
         self.children = {}
         self.parent = None
-    
+        self.compiled_paths = {}
+        GetterSetter.tree_version += 1
+
     def add_child(self, child_name, child_object):
         if child_name in self.children:
             raise KeyError(f"This object already has a '{child_name}' child")
         self.children[child_name] = child_object
         child_object.parent = self
-    
+        GetterSetter.tree_version += 1
+        node = self
+        while node is not None:
+            node.subtree_version += 1
+            node = getattr(node, "parent", None)
+
     def get_children(self):
         return [k for k in self.children]
-    
+
     def get_child(self, child_name):
         return self.children[child_name]
 
-    def get_attribute(self, variable_name, traversed = False):
+    def resolve_path(self, variable_name, traversed = False):
+        """
+        Walk the tree to find the object that owns the last element of a colon-separated path.
+
+        Returns:
+        --------
+        tuple
+            (owning object, attribute name)
+        """
         if ":" not in variable_name:
-            return getattr(self, variable_name)
+            return self, variable_name
         else:
             child_name, child_variable_name = variable_name.split(":", maxsplit = 1)
             # If the child name is in this object, continue down the tree
             if child_name in self.children:
-                return self.children[child_name].get_attribute(child_variable_name, True)
+                return self.children[child_name].resolve_path(child_variable_name, True)
             # Else, if there is no calling parent, go up the tree to the parent and attempt to find a matching element
             # If there is a calling parent, then assume that there is a typo in the tree string
             elif self.parent is not None and not traversed:
-                return self.parent.get_attribute(variable_name)
+                return self.parent.resolve_path(variable_name)
             else:
                 #TODO: raise a better key error
                 _ = self.children[child_name]
 
+    def compile_path(self, variable_name):
+        """
+        Resolve a colon-separated path once and cache the result until the tree changes.
+
+        Returns:
+        --------
+        tuple
+            (owning object, attribute name)
+        """
+        # Objects that never called GetterSetter.__init__ (e.g. navigators) get their cache on first use
+        compiled_paths = self.__dict__.setdefault("compiled_paths", {})
+        compiled = compiled_paths.get(variable_name)
+        if compiled is None or compiled[0] != GetterSetter.tree_version:
+            compiled = (GetterSetter.tree_version, *self.resolve_path(variable_name))
+            compiled_paths[variable_name] = compiled
+        return compiled[1], compiled[2]
+
+    def get_attribute(self, variable_name, traversed = False):
+        if ":" not in variable_name:
+            return getattr(self, variable_name)
+        owner, attribute = self.resolve_path(variable_name, True) if traversed else self.compile_path(variable_name)
+        return getattr(owner, attribute)
+
+    def get_attributes(self, variable_names):
+        """
+        Read several attributes at once.
+
+        Parameters:
+        -----------
+        variable_names : list of str
+            The colon-separated paths to read.
+
+        Returns:
+        --------
+        list
+            The values, in the same order as the paths.
+        """
+        return [getattr(*self.compile_path(variable_name)) for variable_name in variable_names]
+
     def set_attribute(self, variable_name, value, traversed = False):
         if ":" not in variable_name:
             setattr(self, variable_name, value)
         else:
-            child_name, child_variable_name = variable_name.split(":", maxsplit = 1)
-            # If the child name is in this object, continue down the tree
-            if child_name in self.children:
-                self.children[child_name].set_attribute(child_variable_name, value, True)
-            # Else, if there is no calling parent, go up the tree to the parent and attempt to find a matching element
-            # If there is a calling parent, then assume that there is a typo in the tree string
-            elif self.parent is not None and not traversed:
-                self.parent.set_attribute(variable_name, value)
-            else:
-                #TODO: raise a better key error
-                _ = self.children[child_name]
\ No newline at end of file
+            owner, attribute = self.resolve_path(variable_name, True) if traversed else self.compile_path(variable_name)
+            setattr(owner, attribute, value)
@@ -1,32 +1,481 @@
 from BattleshipSimulator.Models.GetterSetter import GetterSetter
 import csv
 import os
-import zmq
 import json
-from icecream import ic
-ic.configureOutput(includeContext=True, contextAbsPath=True)
+import bisect
+import numpy as np
+import BattleshipSimulator.Models.Transport as Transport
+
+class JSONValue(str):
+    """A value that was JSON-encoded when it was logged (anything that is not a bool, int or float)."""
+    pass
+
+def encode_value(value):
+    # Freeze lists and other objects when they are logged, so later changes by the simulation cannot alter the log
+    if isinstance(value, (bool, int, float, np.bool_, np.integer, np.floating)):
+        return value
+    return JSONValue(json.dumps(value, default = lambda o: o.tolist() if hasattr(o, "tolist") else str(o)))
+
+def encode_json(value):
+    """Return the JSON text of a value encoded by `encode_value`."""
+    return value if isinstance(value, JSONValue) else json.dumps(value.item() if hasattr(value, "item") else value)
+
+def column_type(values):
+    """Pick the narrowest type that can store every value in a column chunk."""
+    if all(isinstance(v, (bool, np.bool_)) for v in values):
+        return "bool"
+    if any(isinstance(v, (JSONValue, bool, np.bool_)) for v in values):
+        return "json"
+    if all(isinstance(v, (int, np.integer)) and -2**63 <= v < 2**63 for v in values):
+        return "int64"
+    return "float64"
+
+class ColumnarLog:
+    """
+    An append-only, columnar store of logged rows.
+
+    Rows are buffered in memory until `chunk_size` of them have been logged; the chunk is then written to a
+    binary file as one typed NumPy array per column (bools, 64-bit ints and floats are stored as-is, anything
+    else as JSON text with an offsets array). An index next to the file records where every chunk and
+    column lives, one JSON line per chunk appended as the chunk is written, so resident memory stays bounded,
+    each write costs the same however long the log grows, and any row, or any whole column, can be read back.
+
+    Attributes:
+    -----------
+    filename : str
+        The binary file; the index is stored in `filename + ".jsonl"`.
+    length : int
+        The number of rows logged.
+    """
+
+    def __init__(self, filename, chunk_size=512, mode="w"):
+        """
+        Parameters:
+        -----------
+        filename : str
+            The binary file to write (or read).
+        chunk_size : int
+            The number of rows buffered in memory before they are written.
+        mode : str
+            "w" to start a new log, or "r" to open one written earlier.
+        """
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.chunks = []
+        self.length = 0
+        self.pending_columns = None
+        self.pending_values = {}
+        self.cached_chunk = (None, None)
+        if mode == "r":
+            with open(self.index_filename) as file:
+                self.chunks = [json.loads(line) for line in file]
+            self.length = sum(chunk["rows"] for chunk in self.chunks)
+            self.file = None
+            self.index_file = None
+        else:
+            self.file = open(self.filename, "wb")
+            self.index_file = open(self.index_filename, "w")
+
+    @property
+    def index_filename(self):
+        return self.filename + ".jsonl"
+
+    def __len__(self):
+        return self.length
+
+    def append(self, row, encoded=None):
+        """
+        Add a row.
+
+        Parameters:
+        -----------
+        row : dict
+            The logged values, keyed by column name.
+        encoded : list or None
+            The values already passed through `encode_value`, in column order (e.g. from a LoggingSchema).
+        """
+        if self.pending_columns is not None and list(row.keys()) != self.pending_columns:
+            # A chunk has a single set of columns, so a change in the logged variables starts a new one
+            self.flush()
+        if self.pending_columns is None:
+            self.pending_columns = list(row.keys())
+            self.pending_values = {column: [] for column in self.pending_columns}
+        if encoded is None:
+            encoded = [encode_value(value) for value in row.values()]
+        for column, value in zip(self.pending_columns, encoded):
+            self.pending_values[column].append(value)
+        self.length += 1
+        if len(self.pending_values[self.pending_columns[0]]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows to the file as a new chunk."""
+        if self.pending_columns is None or self.file is None:
+            return
+        rows = len(self.pending_values[self.pending_columns[0]])
+        chunk = {"start": self.length - rows, "rows": rows, "columns": {}}
+        for column in self.pending_columns:
+            values = self.pending_values[column]
+            dtype = column_type(values)
+            layout = {"type": dtype, "offset": self.file.tell()}
+            if dtype == "json":
+                encoded = [encode_json(v).encode("utf-8") for v in values]
+                self.file.write(b"".join(encoded))
+                layout["index_offset"] = self.file.tell()
+                self.file.write(np.cumsum([0] + [len(v) for v in encoded], dtype = np.int64).tobytes())
+            else:
+                self.file.write(np.asarray(values, dtype = dtype).tobytes())
+            chunk["columns"][column] = layout
+        self.file.flush()
+        self.chunks.append(chunk)
+        # The chunk's data is on disk before the line that points to it
+        self.index_file.write(json.dumps(chunk) + "\n")
+        self.index_file.flush()
+        self.pending_columns = None
+        self.pending_values = {}
+
+    def close(self):
+        """Write any buffered rows and close the file. The log can still be read afterwards."""
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.index_file.close()
+            self.index_file = None
+
+    def rename(self, new_filename):
+        """Move the file and its index (only once the log is closed)."""
+        os.rename(self.filename, new_filename)
+        os.rename(self.index_filename, new_filename + ".jsonl")
+        self.filename = new_filename
+
+    def read_chunk(self, chunk_number):
+        """Load the arrays of one written chunk, keeping the most recent one for sequential playback."""
+        if self.cached_chunk[0] == chunk_number:
+            return self.cached_chunk[1]
+        chunk = self.chunks[chunk_number]
+        rows = chunk["rows"]
+        arrays = {}
+        with open(self.filename, "rb") as file:
+            for column, layout in chunk["columns"].items():
+                if layout["type"] == "json":
+                    file.seek(layout["index_offset"])
+                    offsets = np.frombuffer(file.read(8 * (rows + 1)), dtype = np.int64)
+                    file.seek(layout["offset"])
+                    arrays[column] = (file.read(int(offsets[-1])), offsets)
+                else:
+                    dtype = np.dtype(layout["type"])
+                    file.seek(layout["offset"])
+                    arrays[column] = np.frombuffer(file.read(dtype.itemsize * rows), dtype = dtype)
+        self.cached_chunk = (chunk_number, arrays)
+        return arrays
+
+    def get(self, index):
+        """
+        Return a logged row.
+
+        Parameters:
+        -----------
+        index : int
+            The position of the row.
+
+        Returns:
+        --------
+        dict
+            A new dictionary holding the row's values.
+        """
+        written = self.length - (0 if self.pending_columns is None else len(self.pending_values[self.pending_columns[0]]))
+        if index >= written:
+            return {column: decode_value(values[index - written]) for column, values in self.pending_values.items()}
+        chunk_number = bisect.bisect_right([chunk["start"] for chunk in self.chunks], index) - 1
+        arrays = self.read_chunk(chunk_number)
+        row = index - self.chunks[chunk_number]["start"]
+        return {column: decode_array_value(arrays[column], row) for column in self.chunks[chunk_number]["columns"]}
+
+    def column(self, column):
+        """
+        Read every written value of one column, e.g. for post-run analysis.
+
+        Parameters:
+        -----------
+        column : str
+            The column name.
+
+        Returns:
+        --------
+        numpy.ndarray or list
+            A typed array when every chunk stored the column as numbers or bools, otherwise a list of decoded values.
+        """
+        self.flush()
+        parts = []
+        for chunk_number, chunk in enumerate(self.chunks):
+            if column not in chunk["columns"]:
+                continue
+            array = self.read_chunk(chunk_number)[column]
+            parts.append(array if isinstance(array, np.ndarray) else [decode_array_value(array, row) for row in range(chunk["rows"])])
+        if all(isinstance(part, np.ndarray) for part in parts):
+            return np.concatenate(parts) if len(parts) > 0 else np.array([])
+        return [value for part in parts for value in (part.tolist() if isinstance(part, np.ndarray) else part)]
+
+def decode_value(value):
+    if isinstance(value, JSONValue):
+        return json.loads(value)
+    return value.item() if hasattr(value, "item") else value
+
+def decode_array_value(array, row):
+    if isinstance(array, tuple):
+        data, offsets = array
+        return json.loads(data[offsets[row]:offsets[row + 1]])
+    return array[row].item()
+
+class LoggingSchema:
+    """
+    The flat layout of a logged row, worked out once from the simulator's object tree.
+
+    Each tick, `collect` reads every field straight from the object that owns it into one reused record,
+    rather than rebuilding and merging a nested dictionary per object. Lists, dicts, tuples, strings and None
+    are compared with the previous tick's value, and their encoded form is only rebuilt when they change,
+    so a polygon list that stays the same is not serialized again.
+
+    Attributes:
+    -----------
+    keys : list of str
+        The column names, in logging order.
+    record : dict
+        The latest values, keyed by column name. The same dictionary is refilled every tick.
+    changed : list of bool
+        Whether each field changed on the latest tick (numbers always count as changed).
+    encoded : list
+        Each field's value as returned by `encode_value`.
+    tree_version : int
+        The `subtree_version` of the tree the schema was built from.
+    """
+
+    # Values whose encoded form is cached between ticks
+    TRACKED_TYPES = (list, dict, tuple, str, type(None))
+    # Values that are left out of the CSV while they stay the same
+    LARGE_TYPES = (list, dict, tuple)
+
+    def __init__(self, fields, tree_version=0):
+        """
+        Parameters:
+        -----------
+        fields : list
+            (column name, owning object, attribute name) tuples; a repeated column name keeps its first position.
+        tree_version : int
+            The `subtree_version` of the root object the fields were collected from.
+        """
+        sources = {}
+        for key, owner, attribute in fields:
+            sources.setdefault(key, (owner, attribute))
+        self.keys = list(sources)
+        self.sources = list(sources.values())
+        self.record = dict.fromkeys(self.keys)
+        self.changed = [True] * len(self.keys)
+        self.encoded = [None] * len(self.keys)
+        self.large = [False] * len(self.keys)
+        self.json_keys = [json.dumps(key) for key in self.keys]
+        self.json_values = [None] * len(self.keys)
+        self.tree_version = tree_version
+
+    def collect(self):
+        """
+        Read every field into the record.
+
+        Returns:
+        --------
+        dict
+            The record. Lists and dicts in it are copies, so they keep this tick's contents.
+        """
+        record, keys, changed, encoded = self.record, self.keys, self.changed, self.encoded
+        for i, (owner, attribute) in enumerate(self.sources):
+            value = getattr(owner, attribute)
+            value_type = type(value)
+            if value_type in self.TRACKED_TYPES:
+                if encoded[i] is not None and type(record[keys[i]]) is value_type and self.same_value(record[keys[i]], value):
+                    changed[i] = False
+                    continue
+                # Shallow copies, as the systems' logging packages make
+                if value_type is list:
+                    value = list(value)
+                elif value_type is dict:
+                    value = dict(value)
+            changed[i] = True
+            self.large[i] = value_type in self.LARGE_TYPES
+            record[keys[i]] = value
+            encoded[i] = encode_value(value)
+            self.json_values[i] = None
+        return record
+
+    @staticmethod
+    def same_value(previous, value):
+        try:
+            return bool(previous == value)
+        except ValueError:
+            # Containers of NumPy arrays cannot be compared as a whole
+            return False
+
+    def csv_row(self, repeat_unchanged=True):
+        """
+        Return the record's values for the CSV file.
+
+        Parameters:
+        -----------
+        repeat_unchanged : bool
+            Write lists, dicts and tuples that did not change on this tick. When False (a sparse file) they are
+            left empty, and the last written value still applies (e.g. `pandas.DataFrame.ffill` restores them).
+        """
+        if repeat_unchanged:
+            return list(self.record.values())
+        return ["" if large and not changed else value for value, large, changed in zip(self.record.values(), self.large, self.changed)]
+
+    def json_value(self, i):
+        """Return the JSON text of one field, reusing it while the field does not change."""
+        if self.json_values[i] is None:
+            self.json_values[i] = encode_json(self.encoded[i])
+        return self.json_values[i]
+
+    def to_json(self, fields=None):
+        """
+        Return the record as JSON text, reusing the text of values that did not change.
+
+        Parameters:
+        -----------
+        fields : list of int, optional
+            The positions of the fields to include. Defaults to every field.
+        """
+        fields = range(len(self.keys)) if fields is None else fields
+        return "{" + ", ".join(f"{self.json_keys[i]}: {self.json_value(i)}" for i in fields) + "}"
+
+class LogEncoder:
+    """
+    Turns the rows collected by a LoggingSchema into the messages that the logger publishes.
+
+    In "full" mode every tick publishes every value; with the default settings this is a single JSON object
+    without a topic, the format the OPC UA server has always read. In "delta" mode a keyframe holding every
+    value is published every `keyframe_interval` ticks, and the ticks in between only carry the fields that
+    changed. Delta-mode messages are wrapped as {"Sequence": n, "Previous": m, "Keyframe": bool, "Data": {...}},
+    where "Previous" is the sequence number of the last message on the same topic: a subscriber that has not
+    seen it missed a delta, and should ignore deltas on that topic until the next keyframe.
+
+    With `topic_depth`, each message is split per subtree and published on the first `topic_depth` parts of
+    its fields' parent name followed by a dot (e.g. "World.PrimarySubmarine." with a depth of 2). Fields of the
+    simulator itself go on ".". ZMQ subscribers can then subscribe to just the prefixes that they need.
+    """
+
+    MODES = ["full", "delta"]
+    ENCODINGS = ["json", "msgpack"]
+    ROOT_TOPIC = "."
+
+    def __init__(self, mode="full", keyframe_interval=50, encoding="json", topic_depth=None):
+        """
+        Parameters:
+        -----------
+        mode : str
+            "full" or "delta".
+        keyframe_interval : int
+            The number of ticks between two keyframes in delta mode.
+        encoding : str
+            "json", or "msgpack" for a smaller binary encoding (needs the msgpack package).
+        topic_depth : int, optional
+            The number of name parts in each topic. Defaults to publishing everything without a topic.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown logger mode '{mode}'; expected one of {self.MODES}")
+        if encoding not in self.ENCODINGS:
+            raise ValueError(f"Unknown logger encoding '{encoding}'; expected one of {self.ENCODINGS}")
+        if encoding == "msgpack":
+            # Imported here so that the JSON encoding never needs msgpack installed
+            import msgpack
+            self.msgpack = msgpack
+        self.mode = mode
+        self.keyframe_interval = keyframe_interval
+        self.encoding = encoding
+        self.topic_depth = topic_depth
+        self.schema = None
+        self.sequence = 0
+
+    def topic(self, key):
+        """Return the topic that a field is published on."""
+        if self.topic_depth is None:
+            return None
+        parents = key.split(".")[:-1][:self.topic_depth]
+        return ".".join(parents) + "." if parents else self.ROOT_TOPIC
+
+    def bind(self, schema):
+        """Work out the topic of each of a schema's fields, and start again from a keyframe."""
+        self.schema = schema
+        self.topics = {}
+        for i, key in enumerate(schema.keys):
+            self.topics.setdefault(self.topic(key), []).append(i)
+        self.sent = [None] * len(schema.keys)
+        self.previous = dict.fromkeys(self.topics, -1)
+        self.ticks_since_keyframe = None
+
+    def encode(self, schema):
+        """
+        Build this tick's messages from the schema's latest record.
+
+        Returns:
+        --------
+        list
+            (topic, payload) tuples, ready to publish.
+        """
+        if schema is not self.schema:
+            self.bind(schema)
+        keyframe = self.ticks_since_keyframe is None or self.ticks_since_keyframe >= self.keyframe_interval
+        self.ticks_since_keyframe = 1 if keyframe else self.ticks_since_keyframe + 1
+        encoded, sent = schema.encoded, self.sent
+        messages = []
+        for topic, fields in self.topics.items():
+            if self.mode == "delta" and not keyframe:
+                # Unchanged lists and strings keep the same encoded object, so most fields are skipped on identity
+                fields = [i for i in fields if encoded[i] is not sent[i] and (type(encoded[i]) is not type(sent[i]) or encoded[i] != sent[i])]
+                if len(fields) == 0:
+                    continue
+            messages.append((topic, self.payload(schema, fields, keyframe, self.previous[topic])))
+            self.previous[topic] = self.sequence
+        self.sent = list(encoded)
+        self.sequence += 1
+        return messages
+
+    def payload(self, schema, fields, keyframe, previous):
+        """Encode the given fields of the schema's record as one message body."""
+        if self.encoding == "msgpack":
+            data = {schema.keys[i]: schema.record[schema.keys[i]] for i in fields}
+            if self.mode == "delta":
+                data = {"Sequence": self.sequence, "Previous": previous, "Keyframe": keyframe, "Data": data}
+            return self.msgpack.packb(data, default = lambda o: o.tolist() if hasattr(o, "tolist") else str(o))
+        data = schema.to_json(fields)
+        if self.mode == "delta":
+            data = f'{{"Sequence": {self.sequence}, "Previous": {previous}, "Keyframe": {json.dumps(keyframe)}, "Data": {data}}}'
+        return data
 
 class CSVLogger(GetterSetter):
-    def __init__(self, filename, zmq_port=5556):
+    def __init__(self, filename, zmq_port=5556, publisher=None, repeat_unchanged=True, encoder=None):
         super().__init__()
         self.filename = filename
+        # Builds the published messages for rows logged through a LoggingSchema
+        self.encoder = LogEncoder() if encoder is None else encoder
+        # Whether rows logged through a LoggingSchema repeat the lists, dicts and tuples that did not change (False writes a sparse file)
+        self.repeat_unchanged = repeat_unchanged
+        self.header_written = False
         self.ensure_directories_exist(self.filename)
         self.file = open(self.filename, 'w', newline='')
-        self.data = []
+        # Rows for playback are kept in a columnar file next to the CSV, so memory stays bounded on long runs
+        self.data = ColumnarLog(self.filename[:-4] + ".columns")
         self.file_open = True
         self.writer = csv.writer(self.file)
 
-        # ZeroMQ setup
-        self.context = zmq.Context()
-        self.socket = self.context.socket(zmq.PUB)
-        self.socket.bind(f"tcp://*:{zmq_port}")
+        # Publish each logged row; without an explicit publisher, fall back to a ZMQ PUB socket on zmq_port
+        self.publisher = Transport.ZMQTransport(zmq_port) if publisher is None else publisher
 
     def publish_data(self, data):
         try:
             
             json_data = json.dumps(data)
             # ic(json_data)
-            self.socket.send_string(json_data)
+            self.publisher.publish(None, json_data)
         except Exception as e:
             print(f"Error publishing data: {e}")
     
@@ -34,24 +483,40 @@ class CSVLogger(GetterSetter):
     def length(self):
         return len(self.data)
 
-    def log(self, data):
-        # If the file is new (or empty), write the headers (dictionary keys)
-        if os.path.getsize(self.filename) == 0:
-            
+    def log(self, data, schema=None):
+        """
+        Write a row to the CSV file and the playback log, and publish it.
+
+        Parameters:
+        -----------
+        data : dict
+            The logged values, keyed by column name.
+        schema : LoggingSchema or None
+            The schema that collected `data`, whose cached encodings are reused.
+        """
+        # If the file is new, write the headers (dictionary keys)
+        if not self.header_written:
             self.writer.writerow(data.keys())
             self.flush()
-        
-        # Write the dictionary values
-        self.writer.writerow(data.values())
-        self.data.append(data)
+            self.header_written = True
 
-        # Publish the data
-        self.publish_data(data)
+        if schema is None:
+            self.writer.writerow(data.values())
+            self.data.append(data)
+            self.publish_data(data)
+        else:
+            self.writer.writerow(schema.csv_row(self.repeat_unchanged))
+            self.data.append(data, schema.encoded)
+            try:
+                for topic, payload in self.encoder.encode(schema):
+                    self.publisher.publish(topic, payload)
+            except Exception as e:
+                print(f"Error publishing data: {e}")
     
     def get(self, index):
         if 0 <= index < len(self.data):
-            # The original data should be immutable, so make a copy
-            return self.data[index].copy()
+            # The original data should be immutable, so the log returns a new dictionary
+            return self.data.get(index)
         else:
             print(index)
             return None
@@ -64,10 +529,10 @@ class CSVLogger(GetterSetter):
         if self.file_open:
             self.flush()
             self.file.close()
+            self.data.close()
             self.file_open = False
         
-        self.socket.close()
-        self.context.term()
+        self.publisher.close()
     
     def ensure_directories_exist(self, file_path):
         # Extract the directory part of the file path
@@ -79,4 +544,5 @@ class CSVLogger(GetterSetter):
 
     def rename_file(self, new_name):
         os.rename(self.filename, new_name)
-        self.filename = new_name
\ No newline at end of file
+        self.data.rename(new_name[:-4] + ".columns")
+        self.filename = new_name
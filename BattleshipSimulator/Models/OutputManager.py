@@ -0,0 +1,124 @@
+import csv
+import time
+import os
+
+class OutputStream:
+    """
+    One CSV file that rows are appended to through a handle kept open for the whole run.
+
+    Rows are buffered in memory and only reach the disk when the stream is flushed.
+    """
+
+    # The size of the in-memory buffer of each file (in bytes); a flush empties it early
+    BUFFER_SIZE = 1 << 16
+
+    def __init__(self, path, header=None):
+        self.path = path
+        self.file = open(path, "a", newline = "", buffering = self.BUFFER_SIZE)
+        self.writer = csv.writer(self.file)
+        self.pending = 0
+        if header is not None and self.file.tell() == 0:
+            self.writer.writerow(header)
+
+    def writerow(self, row):
+        self.writer.writerow(row)
+        self.pending += 1
+
+    def flush(self):
+        self.file.flush()
+        self.pending = 0
+
+    def close(self):
+        self.file.close()
+
+class OutputManager:
+    """
+    Appends the side outputs of a run (the rudder, power, sonar and hardware CSV files) to files in one directory.
+
+    The files are opened on first use and kept open until `close`, instead of being opened and closed for every row.
+    Every file is flushed once it holds `flush_rows` unwritten rows, and all of them are flushed whenever
+    `flush_interval` seconds have passed since the last flush, so the files stay current while the simulation runs.
+    """
+
+    def __init__(self, directory, flush_rows=512, flush_interval=1.0):
+        """
+        Parameters:
+        -----------
+        directory : str
+            The directory the files are written to; it is created when the first file is opened.
+        flush_rows : int
+            The most rows a file buffers before it is flushed.
+        flush_interval : float
+            The longest time between two flushes (in seconds).
+        """
+        self.directory = directory
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.streams = {}
+        self.headers = {}
+        self.last_flush = time.monotonic()
+
+    def path(self, name):
+        """Return the path of a file in the output directory."""
+        return os.path.join(self.directory, name)
+
+    def set_header(self, name, header):
+        """
+        Set the header row that a file starts with, written when the file is created.
+
+        Parameters:
+        -----------
+        name : str
+            The file name, e.g. "output_rudder.csv".
+        header : list
+            The column names.
+        """
+        self.headers[name] = header
+
+    def stream(self, name):
+        """Return the stream of a file, opening it on first use."""
+        stream = self.streams.get(name)
+        if stream is None:
+            os.makedirs(self.directory, exist_ok = True)
+            stream = self.streams[name] = OutputStream(self.path(name), self.headers.get(name))
+        return stream
+
+    def writerow(self, name, row):
+        """
+        Append a row to a file.
+
+        Parameters:
+        -----------
+        name : str
+            The file name, e.g. "output_rudder.csv".
+        row : list
+            The values of the row.
+        """
+        stream = self.stream(name)
+        stream.writerow(row)
+        if stream.pending >= self.flush_rows:
+            stream.flush()
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows of every file to disk."""
+        for stream in self.streams.values():
+            stream.flush()
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        """Flush and close every file; a later row opens its file again."""
+        for stream in self.streams.values():
+            stream.flush()
+            stream.close()
+        self.streams = {}
+
+class NullOutputManager(OutputManager):
+    """Discards every row. Used when a component is created without a simulator, e.g. in tests."""
+
+    def __init__(self):
+        super().__init__(None)
+
+    def writerow(self, name, row):
+        pass
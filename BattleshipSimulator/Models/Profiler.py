@@ -0,0 +1,254 @@
+import threading
+import math
+import time
+
+class SpanStats:
+    """
+    The durations recorded under one span name: a count, a total, a maximum and a histogram.
+
+    The histogram splits every doubling of the duration into four buckets, from 1 microsecond up,
+    so percentiles are accurate to about 20% and recording a duration never allocates.
+    """
+
+    BUCKETS_PER_OCTAVE = 4
+    BUCKETS = 4 * 24 + 1        # The last bucket collects everything from about 16 seconds up
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * self.BUCKETS
+
+    def record(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        # Bucket 0 holds durations under a microsecond; bucket b holds those under 2**(b / 4) microseconds
+        microseconds = duration * 1e6
+        bucket = 0 if microseconds < 1 else int(self.BUCKETS_PER_OCTAVE * math.log2(microseconds)) + 1
+        self.buckets[min(bucket, self.BUCKETS - 1)] += 1
+
+    def merge(self, other):
+        """Add the durations recorded by another SpanStats, e.g. one returned by a worker process."""
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.buckets = [count + other_count for count, other_count in zip(self.buckets, other.buckets)]
+
+    def percentile(self, q):
+        """
+        Estimate a percentile from the histogram.
+
+        Parameters:
+        -----------
+        q : float
+            The percentile, between 0 and 100.
+
+        Returns:
+        --------
+        float
+            The upper bound of the bucket that holds the percentile (in seconds), capped at the largest duration.
+        """
+        target = q / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and count > 0:
+                return min(2 ** (bucket / self.BUCKETS_PER_OCTAVE) / 1e6, self.max)
+        return self.max
+
+class Span:
+    """Times the code in a `with` block and records it under a name when the block exits."""
+
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stats.record(time.perf_counter() - self.start)
+        return False
+
+class NullSpan:
+    """Stands in for a span while profiling is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+class NullProfiler:
+    """The profiler used while profiling is off; its spans do nothing."""
+
+    enabled = False
+    NULL_SPAN = NullSpan()
+
+    def span(self, name):
+        return self.NULL_SPAN
+
+    def record(self, name, duration):
+        pass
+
+class TickProfiler:
+    """
+    Collects the time spent in named spans of the simulation tick, e.g. "World.update" or "RadarSonar.update".
+
+    Spans may be nested; each one records its own wall-clock time, including the spans inside it.
+    The summary may be read from another thread (e.g. the GUI's) while the simulation thread records spans.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.stats = {}
+        self.start_time = time.perf_counter()
+        # Guards adding a span name, so that another thread can copy the names without the dict changing under it
+        self.lock = threading.Lock()
+
+    def span(self, name):
+        """
+        Time a block of code under a name.
+
+        Parameters:
+        -----------
+        name : str
+            The name to record the duration under.
+
+        Returns:
+        --------
+        Span
+            A context manager that records the block's duration when it exits.
+        """
+        return Span(self.span_stats(name))
+
+    def record(self, name, duration):
+        """
+        Record a duration that was measured elsewhere, e.g. how old a verdict was when it was read.
+
+        Parameters:
+        -----------
+        name : str
+            The name to record the duration under.
+        duration : float
+            The duration (in seconds).
+        """
+        self.span_stats(name).record(duration)
+
+    def span_stats(self, name):
+        stats = self.stats.get(name)
+        if stats is None:
+            with self.lock:
+                stats = self.stats.setdefault(name, SpanStats())
+        return stats
+
+    def merge(self, stats):
+        """
+        Add the durations recorded by another profiler, e.g. one that ran in a worker process.
+
+        Parameters:
+        -----------
+        stats : dict
+            The other profiler's `stats`: a SpanStats for each span name.
+        """
+        for name, span_stats in stats.items():
+            self.span_stats(name).merge(span_stats)
+
+    def reset(self):
+        """Forget every recorded duration."""
+        with self.lock:
+            self.stats = {}
+        self.start_time = time.perf_counter()
+
+    def summary(self):
+        """
+        Summarize every span, the slowest in total first.
+
+        Returns:
+        --------
+        dict
+            For each span name: count, total, mean, p50, p95, p99 and max (in seconds).
+        """
+        with self.lock:
+            items = list(self.stats.items())
+        summary = {}
+        for name, stats in sorted(items, key = lambda item: -item[1].total):
+            summary[name] = {
+                "count": stats.count,
+                "total": stats.total,
+                "mean": stats.total / stats.count if stats.count > 0 else 0,
+                "p50": stats.percentile(50),
+                "p95": stats.percentile(95),
+                "p99": stats.percentile(99),
+                "max": stats.max
+            }
+        return summary
+
+    def report(self):
+        """
+        Format the summary as a table, with times in milliseconds.
+
+        Returns:
+        --------
+        str
+            One line per span, the slowest in total first.
+        """
+        elapsed = time.perf_counter() - self.start_time
+        lines = [f"{'Span':<28}{'Count':>8}{'Total s':>10}{'% Wall':>8}{'Mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Max ms':>9}"]
+        for name, stats in self.summary().items():
+            lines.append(
+                f"{name:<28}{stats['count']:>8}{stats['total']:>10.3f}{100 * stats['total'] / elapsed if elapsed > 0 else 0:>8.1f}"
+                f"{1e3 * stats['mean']:>10.3f}{1e3 * stats['p50']:>9.3f}{1e3 * stats['p95']:>9.3f}{1e3 * stats['p99']:>9.3f}{1e3 * stats['max']:>9.3f}"
+            )
+        return "\n".join(lines)
+
+# The profiler that every span is recorded with; profiling is off until `enable` is called
+profiler = NullProfiler()
+
+def enable():
+    """
+    Turn profiling on for this process, keeping the durations already recorded if it was on.
+
+    Returns:
+    --------
+    TickProfiler
+        The active profiler.
+    """
+    global profiler
+    if not profiler.enabled:
+        profiler = TickProfiler()
+    return profiler
+
+def disable():
+    """Turn profiling off."""
+    global profiler
+    profiler = NullProfiler()
+
+def span(name):
+    """
+    Time a block of code under a name with the active profiler; this does nothing while profiling is off.
+
+    Parameters:
+    -----------
+    name : str
+        The name to record the duration under, e.g. "World.update".
+    """
+    return profiler.span(name)
+
+def record(name, duration):
+    """
+    Record a duration measured elsewhere with the active profiler; this does nothing while profiling is off.
+
+    Parameters:
+    -----------
+    name : str
+        The name to record the duration under, e.g. "Verdict.latency".
+    duration : float
+        The duration (in seconds).
+    """
+    profiler.record(name, duration)
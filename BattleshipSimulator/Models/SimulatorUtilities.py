@@ -9,9 +9,6 @@ import BattleshipSimulator.Models.BattleshipConstant as BattleshipConstant
 import os
 import random
 import uuid
-import csv
-import json
-import pandas as pd
 
 def calculate_heading_from_points(object_x, object_y, direction_x, direction_y):
     # Calculate the difference in coordinates
@@ -373,7 +370,7 @@ def update_path_coordinates_with_angle(x, y, path, speed, timedelta):
     
     return new_x, new_y, facing_angle_degrees, updated_path
 
-def polygons_intersect(polygon1_coords, polygon2_coords):
+def polygons_intersect(polygon1_coords, polygon2_coords, geometry_cache=None):
     """
     Determine if one polygon touches or overlaps another polygon with optional transformations.
 
@@ -391,6 +388,8 @@ def polygons_intersect(polygon1_coords, polygon2_coords):
         Rotation angle in degrees for the first polygon.
     angle2 : float, optional
         Rotation angle in degrees for the second polygon.
+    geometry_cache : GeometryCache, optional
+        A cache that holds the polygons of static shapes, so they are not rebuilt on every call.
 
     Returns:
     --------
@@ -399,8 +398,16 @@ def polygons_intersect(polygon1_coords, polygon2_coords):
     """
 
     # Convert coordinates to Shapely Polygons
-    polygon1 = Polygon(polygon1_coords)
-    polygon2 = Polygon(polygon2_coords)
+    if geometry_cache is None:
+        polygon1 = Polygon(polygon1_coords)
+        polygon2 = Polygon(polygon2_coords)
+    else:
+        polygon1 = geometry_cache.polygon(polygon1_coords)
+        polygon2 = geometry_cache.polygon(polygon2_coords)
+        # The prepared predicate rules out most cached shapes without computing the intersection
+        cached_polygon2 = geometry_cache.get(polygon2_coords)
+        if cached_polygon2 is not None and not cached_polygon2.prepared.intersects(polygon1):
+            return False, None
     # Check if the polygons intersect (touch or overlap)
     intersection = polygon1.intersection(polygon2)
     is_overlap = not intersection.is_empty
@@ -413,7 +420,7 @@ def polygons_intersect(polygon1_coords, polygon2_coords):
     
     return is_overlap, [list(i.exterior.coords) for i in intersection] if is_overlap else None
 
-def line_intersects_polygon(line_coords, polygon_coords):
+def line_intersects_polygon(line_coords, polygon_coords, geometry_cache=None):
     """
     Determine if a line (defined by two points) intersects a polygon.
 
@@ -423,6 +430,8 @@ def line_intersects_polygon(line_coords, polygon_coords):
         A list of two (x, y) tuples defining the line.
     polygon_coords : list of tuple
         A list of (x, y) tuples defining the polygon.
+    geometry_cache : GeometryCache, optional
+        A cache that holds the prepared polygons of static shapes.
 
     Returns:
     --------
@@ -432,10 +441,10 @@ def line_intersects_polygon(line_coords, polygon_coords):
 
     # Convert coordinates to Shapely LineString and Polygon
     line = LineString(line_coords)
-    polygon = Polygon(polygon_coords)
+    polygon = Polygon(polygon_coords) if geometry_cache is None else geometry_cache.prepared(polygon_coords)
 
     # Check if the line intersects the polygon
-    is_intersect = line.intersects(polygon)
+    is_intersect = polygon.intersects(line)
 
     return is_intersect
 
@@ -552,13 +561,34 @@ def distance(point1, point2):
     x2, y2 = point2
     return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
 
-def getNextPosition(speed, targetHeading, prevEta, vehicle, timeDelta, oldNu, oldU, hardware):
+def applyRudderCommand(hardware, targetHeading, delta_c):
+    #################################################################
+    # Records a rudder command with the hardware (and the rudder    #
+    # CSV outputs), returning the command that actually reaches the #
+    # rudder, which a rudder attack offsets                         #
+    #################################################################
+    rudder_elec = 20000 + random.uniform(-1000, 1000)
+    if (hardware.global_status == BattleshipConstant.RUDDER_ATTACK):
+        delta_c = delta_c + random.uniform(0.3, 0.6)
+        rudder_elec = rudder_elec + random.uniform(2000, 5000)
+        hardware.outputs.writerow("output_rudder_attack.csv", [targetHeading, delta_c, rudder_elec])
+    else:
+        hardware.outputs.writerow("output_rudder.csv", [targetHeading, delta_c, rudder_elec])
+    
+    hardware.rudder_log.append([targetHeading, delta_c, rudder_elec])
+    # Publish the rudder readings to the rudder IDS, one message per window
+    hardware.rudder_window.append([targetHeading, delta_c, rudder_elec])
+    return delta_c
+
+def getNextPosition(speed, targetHeading, prevEta, vehicle, timeDelta, oldNu, oldU, hardware, row=None):
     #################################################################
     # prevEta, oldNu, oldU determine the state of the               #
     # vehicle in the past                                           #
     # targetHeading is the new heading the ship wants to go         #
     # speed is the current speed                                    #
     # timeDelta is the change in time to the next index in simData  #
+    # row, if given, receives the simData row (e.g. a row of the    #
+    # model's StateHistory) instead of a new array                  #
     #################################################################
     # u is control
 
@@ -568,8 +598,6 @@ def getNextPosition(speed, targetHeading, prevEta, vehicle, timeDelta, oldNu, ol
     eta = prevEta    # position/attitude, user editable
     nu = oldNu                              # velocity, defined by vehicle class
     u_actual = oldU                  # actual inputs, defined by vehicle class - steering?
-    # Initialization of table used to store the simulation data
-    simData = np.empty( [0, 2*DOF + 2 * vehicle.dimU], float)
     # Vehicle specific control systems
     if (vehicle.controlMode == 'depthAutopilot'):
         u_control = vehicle.depthAutopilot(eta,nu,timeDelta)
@@ -581,43 +609,20 @@ def getNextPosition(speed, targetHeading, prevEta, vehicle, timeDelta, oldNu, ol
         u_control = vehicle.DPcontrol(eta,nu,timeDelta)
 
     # Store simulation data in simData
-    # States, inc. heading, rudder, position, etc.
-    signals = np.append( np.append( np.append(eta,nu),u_control), u_actual )
-    # Refactored signals in the correct format
-    simData = np.vstack( [simData, signals] )
+    # States, inc. heading, rudder, position, etc. (one row, which the caller appends to its history)
+    signals = np.concatenate([eta, nu, u_control, u_actual], out = row)
 
     # Propagate vehicle and attitude dynamics
-    rudder_elec = 20000 + random.uniform(-1000, 1000)
-    if (hardware.global_status == BattleshipConstant.RUDDER_ATTACK):
-        u_control[0] = u_control[0] + random.uniform(0.3, 0.6)
-        rudder_elec = rudder_elec + random.uniform(2000, 5000)
-        with open("output\output_rudder_attack.csv", "a", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow([targetHeading, u_control[0], rudder_elec])
-    else:
-        with open("output\output_rudder.csv", "a", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow([targetHeading, u_control[0], rudder_elec])
-    
-    hardware.rudder_log.append([targetHeading, u_control[0], rudder_elec])
-    if (len(hardware.rudder_log) >= 10):
-        group_log = hardware.rudder_log[-10:]
-        for i, chunk in enumerate(group_log):
-            # Convert the chunk to JSON
-            chunk = pd.DataFrame([chunk], columns=["heading", "rudder angle", "rudder power"])
-            chunk_json = chunk.to_json(orient="records")
-            payload = json.dumps({"ChunkID": i, "Data": chunk_json})
-            print(payload)
+    u_control[0] = applyRudderCommand(hardware, targetHeading, u_control[0])
 
-            # Publish the chunk
-            hardware.rudder_data_client.publish("submarine/rudder_input", payload)
-            print(payload)
-
-
-    nu, u_actual = vehicle.dynamics(eta,nu,u_actual,u_control,timeDelta)
-    eta = attitudeEuler(eta,nu,timeDelta)
+    if hasattr(vehicle, "integrate"):
+        # Advance the state arrays in place instead of allocating new ones
+        vehicle.integrate(eta,nu,u_actual,u_control[0],timeDelta)
+    else:
+        nu, u_actual = vehicle.dynamics(eta,nu,u_actual,u_control,timeDelta)
+        eta = attitudeEuler(eta,nu,timeDelta)
 
-    return simData, eta, nu, u_actual
+    return signals, eta, nu, u_actual
 
 def load_yaml(infile):
     with open(infile, "r") as stream:
@@ -713,6 +718,56 @@ def get_distance_at_angle(point, polygon, angle):
     
     return point.distance(nearest_point)
 
+def range_profile(point, polygons, angles, max_range=1e6, no_hit=0):
+    """
+    Cast rays from a point at every angle and return the distance to the nearest polygon along each one.
+
+    All rays are tested against all polygon edges at once with NumPy, giving the same distances as calling
+    get_distance_at_angle for every angle and polygon and keeping the nearest.
+
+    Parameters:
+    -----------
+    point : shapely.geometry.Point
+        The origin of the rays.
+    polygons : list of shapely.geometry.Polygon
+        The polygons the rays can hit.
+    angles : array_like
+        The ray directions, in degrees (mathematical convention, as in get_distance_at_angle).
+    max_range : float, optional
+        The length of each ray.
+    no_hit : float, optional
+        The distance reported for a ray that hits nothing.
+
+    Returns:
+    --------
+    numpy.ndarray
+        The distance along each ray.
+    """
+    angles = np.radians(np.asarray(angles, dtype = float))
+    # A point inside (or on) a polygon is at distance 0 in every direction
+    if any(polygon.intersects(point) for polygon in polygons):
+        return np.zeros(len(angles))
+    rings = [np.asarray(ring.coords) for polygon in polygons for ring in [polygon.exterior, *polygon.interiors]]
+    if len(rings) == 0:
+        return np.full(len(angles), no_hit, dtype = float)
+    starts = np.concatenate([ring[:-1] for ring in rings])
+    edges = np.concatenate([ring[1:] - ring[:-1] for ring in rings])
+    # Rays are point + t * direction and edges are start + u * edge; solve both for every (ray, edge) pair
+    direction_x = np.cos(angles)[:, np.newaxis]
+    direction_y = np.sin(angles)[:, np.newaxis]
+    offset_x = starts[:, 0] - point.x
+    offset_y = starts[:, 1] - point.y
+    denominator = direction_x * edges[:, 1] - direction_y * edges[:, 0]
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        t = (offset_x * edges[:, 1] - offset_y * edges[:, 0]) / denominator
+        u = (offset_x * direction_y - offset_y * direction_x) / denominator
+    # Edges parallel to a ray give a zero denominator; the ray still meets their end points through the neighbouring edges
+    tolerance = 1e-12
+    hits = (denominator != 0) & (t >= 0) & (t <= max_range) & (u >= -tolerance) & (u <= 1 + tolerance)
+    distances = np.where(hits, t, np.inf).min(axis = 1)
+    distances[np.isinf(distances)] = no_hit
+    return distances
+
 def calculate_power(speed_mps, mode, beam_ft=34, drag_coeff=0.25, efficiency=0.75):
     ############################################################################################
     # This function only needs to take in the current speed of the ship for calculation.
@@ -0,0 +1,100 @@
+import numpy as np
+from shapely import STRtree, box
+from shapely.geometry import Polygon
+
+def coordinate_bounds(coords):
+    """
+    Calculate the bounding box of a list of coordinates.
+
+    Parameters:
+    -----------
+    coords : list of tuple
+        A list of (x, y) tuples.
+
+    Returns:
+    --------
+    tuple
+        (min x, min y, max x, max y)
+    """
+    coords = np.asarray(coords, dtype = float)
+    return (*coords.min(axis = 0), *coords.max(axis = 0))
+
+def bounds_overlap(bounds1, bounds2):
+    """Return True if two (min x, min y, max x, max y) bounding boxes touch or overlap."""
+    return bounds1[0] <= bounds2[2] and bounds2[0] <= bounds1[2] and bounds1[1] <= bounds2[3] and bounds2[1] <= bounds1[3]
+
+class SpatialIndex:
+    """
+    Finds the obstacles and models that may touch a region, so that only those need exact geometry tests.
+
+    The static obstacles are indexed once in an STRtree. Models move every tick, so each model's bounding box
+    is kept separately and replaced whenever its geometry is recalculated.
+    """
+
+    def __init__(self, obstacles):
+        """
+        Parameters:
+        -----------
+        obstacles : list
+            The obstacles of the world, each a list of (x, y) tuples.
+        """
+        self.obstacles = obstacles
+        self.tree = STRtree([Polygon(obstacle) for obstacle in obstacles])
+        self.model_bounds = {}
+
+    def update_model(self, model, coords):
+        """
+        Record the latest geometry of a model.
+
+        Parameters:
+        -----------
+        model : BattleshipModel
+            The model that moved.
+        coords : list of tuple
+            The model's geometry in world coordinates.
+        """
+        self.model_bounds[model] = coordinate_bounds(coords)
+
+    def query_obstacles(self, regions):
+        """
+        Find the obstacles whose bounding boxes overlap any of the regions.
+
+        Parameters:
+        -----------
+        regions : list
+            The (min x, min y, max x, max y) bounding boxes to search.
+
+        Returns:
+        --------
+        list
+            The candidate obstacles, in the same order as the world's obstacles.
+        """
+        if len(self.obstacles) == 0:
+            return []
+        indices = np.unique(np.concatenate([self.tree.query(box(*region)) for region in regions]))
+        return [self.obstacles[i] for i in indices]
+
+    def query_models(self, models, regions):
+        """
+        Find the models whose bounding boxes overlap any of the regions.
+
+        Models that have not reported a geometry yet are always returned, so they are never missed.
+
+        Parameters:
+        -----------
+        models : list
+            The models to consider.
+        regions : list
+            The (min x, min y, max x, max y) bounding boxes to search.
+
+        Returns:
+        --------
+        list
+            The candidate models, in the same order as they were given.
+        """
+        candidates = []
+        for model in models:
+            model_bounds = self.model_bounds.get(model)
+            if model_bounds is None or any(bounds_overlap(model_bounds, region) for region in regions):
+                candidates.append(model)
+        return candidates
@@ -0,0 +1,70 @@
+import numpy as np
+
+class StateHistory:
+    """
+    A growable table of vehicle states, one row per simulation step.
+
+    Rows are written into a preallocated array whose capacity doubles when it fills up, so appending is
+    amortised O(1) instead of copying the whole history on every step as np.vstack does.
+
+    Attributes:
+    -----------
+    width : int
+        The number of values in a row.
+    """
+
+    def __init__(self, width, capacity=1024):
+        """
+        Parameters:
+        -----------
+        width : int
+            The number of values in a row.
+        capacity : int
+            The number of rows allocated up front.
+        """
+        self.width = width
+        self.buffer = np.empty((max(1, capacity), width), float)
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, row):
+        """
+        Add a row to the end of the history.
+
+        Parameters:
+        -----------
+        row : array_like
+            The `width` values of the row.
+        """
+        self.new_row()[:] = row
+
+    def new_row(self):
+        """
+        Add a row to the end of the history, to be filled in by the caller.
+
+        Returns:
+        --------
+        numpy.ndarray
+            A writable view of the new row (its values are undefined until written).
+        """
+        if self.length == len(self.buffer):
+            grown = np.empty((2 * len(self.buffer), self.width), float)
+            grown[:self.length] = self.buffer[:self.length]
+            self.buffer = grown
+        self.length += 1
+        return self.buffer[self.length - 1]
+
+    def view(self):
+        """
+        Return the rows written so far.
+
+        Returns:
+        --------
+        numpy.ndarray
+            A read-only (length, width) view of the history; it does not see rows appended later.
+        """
+        rows = self.buffer[:self.length]
+        rows.flags.writeable = False
+        return rows
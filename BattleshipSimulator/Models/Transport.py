@@ -0,0 +1,361 @@
+import BattleshipSimulator.Models.BattleshipConstant as BattleshipConstant
+import BattleshipSimulator.Models.Profiler as Profiler
+import importlib.util
+import threading
+import queue
+import json
+import time
+import sys
+import os
+
+# The module that defines the Aggregator's shared memory status block, shared with the Security_Monitor scripts
+STATUS_BLOCK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "Security_Monitor", "StatusBlock.py")
+
+class Transport:
+    """
+    Base class for the channels that the simulator publishes on.
+
+    A transport hides where a message goes (nowhere, an in-process queue, an MQTT broker or a ZMQ socket),
+    so the simulator can run headless without any network setup.
+    """
+
+    NAME = "Transport"
+
+    def publish(self, topic, payload):
+        """
+        Publish a message.
+
+        Parameters:
+        -----------
+        topic : str or None
+            The topic to publish on. None publishes the payload without a topic.
+        payload : str or bytes
+            The message body.
+        """
+        pass
+
+    def close(self):
+        """Release any sockets or connections held by the transport."""
+        pass
+
+class NullTransport(Transport):
+    """Discards every message. Used for headless throughput runs."""
+
+    NAME = "null"
+
+class QueueTransport(Transport):
+    """
+    Keeps messages in an in-process queue so they can be consumed by the same process (e.g. tests or embedded monitors).
+
+    The queue is bounded, so a consumer that falls behind cannot make it grow without limit: when it is full,
+    new messages are dropped and counted instead of blocking the simulation.
+    """
+
+    NAME = "queue"
+
+    def __init__(self, maxsize=256):
+        self.messages = queue.Queue(maxsize)
+        self.dropped = 0
+
+    def publish(self, topic, payload):
+        try:
+            self.messages.put_nowait((topic, payload))
+        except queue.Full:
+            self.dropped += 1
+
+    def get(self, timeout=None):
+        """Return the next (topic, payload) tuple, blocking for up to `timeout` seconds."""
+        return self.messages.get(timeout = timeout)
+
+    def drain(self):
+        """Return and remove every queued (topic, payload) tuple."""
+        drained = []
+        while True:
+            try:
+                drained.append(self.messages.get_nowait())
+            except queue.Empty:
+                return drained
+
+class MQTTTransport(Transport):
+    """Publishes over one persistent connection to an MQTT broker."""
+
+    NAME = "mqtt"
+
+    def __init__(self, host="localhost", port=1883, client_id="Battleship_Simulator", keepalive=60):
+        # Imported here so that runs without a broker never load paho
+        import paho.mqtt.client as mqtt
+        self.client = mqtt.Client(client_id=client_id, protocol=mqtt.MQTTv311, callback_api_version=mqtt.CallbackAPIVersion.VERSION1)
+        self.client.connect(host, port, keepalive)
+        # The network loop keeps the connection alive between publishes
+        self.client.loop_start()
+
+    def publish(self, topic, payload):
+        self.client.publish(topic, payload)
+
+    def close(self):
+        self.client.loop_stop()
+        self.client.disconnect()
+
+class ZMQTransport(Transport):
+    """
+    Publishes on a bound ZMQ PUB socket.
+
+    Messages without a topic are sent as a single frame; messages with a topic are sent as [topic, payload]
+    so subscribers can filter on the topic prefix.
+    """
+
+    NAME = "zmq"
+
+    def __init__(self, port=5556):
+        # Imported here so that runs without a ZMQ publisher never load pyzmq
+        import zmq
+        self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.PUB)
+        self.socket.bind(f"tcp://*:{port}")
+
+    def publish(self, topic, payload):
+        if type(payload) is str:
+            payload = payload.encode("utf-8")
+        if topic is None:
+            self.socket.send(payload)
+        else:
+            self.socket.send_multipart([topic.encode("utf-8"), payload])
+
+    def close(self):
+        self.socket.close()
+        self.context.term()
+
+class BackgroundPublisher(Transport):
+    """
+    Hands messages to a single background thread that owns the wrapped transport's connection.
+
+    The simulation thread only pays for a queue insert. The queue is bounded, so when the network cannot
+    keep up, publish blocks until there is room (backpressure) instead of letting messages pile up in memory.
+    """
+
+    NAME = "background"
+
+    # Sentinel that tells the publishing thread to stop
+    _STOP = object()
+
+    def __init__(self, transport, maxsize=256):
+        self.transport = transport
+        self.messages = queue.Queue(maxsize)
+        self.thread = threading.Thread(target = self.run, name = f"{transport.NAME}-publisher", daemon = True)
+        self.thread.start()
+
+    def run(self):
+        while (message := self.messages.get()) is not self._STOP:
+            try:
+                self.transport.publish(*message)
+            except Exception as e:
+                print(f"Error publishing data: {e}")
+
+    def publish(self, topic, payload):
+        self.messages.put((topic, payload))
+
+    def close(self):
+        # Everything queued before the sentinel is still published
+        self.messages.put(self._STOP)
+        self.thread.join()
+        self.transport.close()
+
+class TelemetryWindow:
+    """
+    Accumulates telemetry rows and publishes them as one message per window.
+
+    The message has the format the IDS scripts read: {"ChunkID": n, "Data": <JSON records>}.
+
+    Parameters:
+    -----------
+    transport : Transport
+        The transport the windows are published on.
+    topic : str
+        The topic the windows are published on.
+    columns : list
+        The name of each value in a row.
+    size : int
+        The number of rows in a window.
+    stride : int, optional
+        The number of new rows between two windows. Defaults to the window size, so windows do not overlap.
+    """
+
+    def __init__(self, transport, topic, columns, size=10, stride=None):
+        self.transport = transport
+        self.topic = topic
+        self.columns = columns
+        self.size = size
+        self.stride = size if stride is None else stride
+        self.rows = []
+        self.rows_since_publish = 0
+        self.chunk_id = 0
+
+    def append(self, row):
+        """
+        Add a row, publishing a window if enough new rows have arrived.
+
+        Parameters:
+        -----------
+        row : list
+            The values of the row, in the same order as the columns.
+
+        Returns:
+        --------
+        bool
+            True if a window was published.
+        """
+        self.rows.append({column: float(value) for column, value in zip(self.columns, row)})
+        del self.rows[:-self.size]
+        self.rows_since_publish += 1
+        if len(self.rows) < self.size or self.rows_since_publish < self.stride:
+            return False
+        self.transport.publish(self.topic, json.dumps({"ChunkID": self.chunk_id, "Data": json.dumps(self.rows)}))
+        self.chunk_id += 1
+        self.rows_since_publish = 0
+        return True
+
+TRANSPORTS = {transport.NAME: transport for transport in [NullTransport, QueueTransport, MQTTTransport, ZMQTransport]}
+
+def create_transport(backend, **kwargs):
+    """
+    Create a transport from its name.
+
+    Parameters:
+    -----------
+    backend : str
+        One of "null", "queue", "mqtt" or "zmq".
+    **kwargs
+        Passed to the transport's constructor.
+
+    Returns:
+    --------
+    Transport
+        The new transport.
+    """
+    if backend not in TRANSPORTS:
+        raise ValueError(f"Unknown transport '{backend}'; expected one of {list(TRANSPORTS)}")
+    return TRANSPORTS[backend](**kwargs)
+
+class VerdictSource:
+    """
+    Base class for where the simulator reads the security monitor's verdict from.
+    """
+
+    NAME = "VerdictSource"
+
+    def read(self):
+        """
+        Return the attack code of the latest verdict.
+
+        Returns:
+        --------
+        int
+            One of the codes in BattleshipConstant.
+        """
+        return BattleshipConstant.NORMAL
+
+    def close(self):
+        pass
+
+class NullVerdictSource(VerdictSource):
+    """Always reports normal operation. Used when no security monitor is running."""
+
+    NAME = "null"
+
+class SharedMemoryVerdictSource(VerdictSource):
+    """
+    Reads the verdicts that the Aggregator publishes in its shared memory status block (Security_Monitor/StatusBlock.py).
+
+    Each read takes a consistent snapshot of the latest verdict. When a new verdict arrives, the time since its IDS
+    produced it is kept as `latency` (and recorded as "Verdict.latency" while profiling).
+
+    Only current verdicts are acted on: one written before the source was opened (e.g. left over from an earlier
+    run) or older than `stale_after` seconds is `stale`, and reads as NORMAL until a new verdict arrives.
+    """
+
+    NAME = "shared_memory"
+
+    def __init__(self, name=None, stale_after=10.0):
+        """
+        Parameters:
+        -----------
+        name : str, optional
+            The name of the shared memory segment. Defaults to the one the Aggregator writes.
+        stale_after : float or None
+            The age (in seconds) after which a verdict is stale; None keeps verdicts current until the next one.
+        """
+        StatusBlock = load_status_block()
+        self.block = StatusBlock.StatusBlock(StatusBlock.SEGMENT_NAME if name is None else name)
+        self.stale_after = stale_after
+        self.opened_ns = time.time_ns()
+        self.snapshot = self.block.read()
+        self.latency = None
+
+    def read(self):
+        # Most ticks see no new verdict, and comparing the sequence number is much cheaper than a snapshot
+        if self.snapshot is not None and self.block.sequence == self.snapshot.sequence:
+            snapshot = None
+        else:
+            snapshot = self.block.read()
+        if snapshot is not None:
+            if self.snapshot is not None and snapshot.sequence != self.snapshot.sequence:
+                self.latency = (time.time_ns() - snapshot.source_ns) / 1e9
+                Profiler.record("Verdict.latency", self.latency)
+            self.snapshot = snapshot
+        if self.stale:
+            return BattleshipConstant.NORMAL
+        return self.snapshot.attack_code
+
+    @property
+    def age(self):
+        """The time since the latest verdict was written (in seconds), or None if none was written since the source was opened."""
+        if self.snapshot is None or self.snapshot.sequence == 0 or self.snapshot.updated_ns < self.opened_ns:
+            return None
+        return (time.time_ns() - self.snapshot.updated_ns) / 1e9
+
+    @property
+    def stale(self):
+        """True if no verdict was written since the source was opened, or the latest one is older than `stale_after` seconds."""
+        age = self.age
+        return age is None or (self.stale_after is not None and age > self.stale_after)
+
+    def close(self):
+        self.block.close()
+
+def load_status_block():
+    """
+    Import the status block module from the Security_Monitor directory, where the Aggregator imports it as `StatusBlock`.
+
+    Returns:
+    --------
+    module
+        The StatusBlock module.
+    """
+    if "StatusBlock" not in sys.modules:
+        spec = importlib.util.spec_from_file_location("StatusBlock", STATUS_BLOCK_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["StatusBlock"] = module
+        spec.loader.exec_module(module)
+    return sys.modules["StatusBlock"]
+
+VERDICT_SOURCES = {source.NAME: source for source in [NullVerdictSource, SharedMemoryVerdictSource]}
+
+def create_verdict_source(backend, **kwargs):
+    """
+    Create a verdict source from its name.
+
+    Parameters:
+    -----------
+    backend : str
+        One of "null" or "shared_memory".
+    **kwargs
+        Passed to the verdict source's constructor.
+
+    Returns:
+    --------
+    VerdictSource
+        The new verdict source.
+    """
+    if backend not in VERDICT_SOURCES:
+        raise ValueError(f"Unknown verdict source '{backend}'; expected one of {list(VERDICT_SOURCES)}")
+    return VERDICT_SOURCES[backend](**kwargs)
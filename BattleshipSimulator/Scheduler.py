@@ -0,0 +1,114 @@
+import threading
+import time
+
+class SimulationScheduler:
+    """ Steps a controller's simulation at a chosen rate, on the calling thread or on a background thread
+
+    The rate is the number of simulated seconds per wall-clock second: 1 runs in real time, N runs N times
+    faster than real time and None runs as fast as possible. Each step holds the controller's lock, so a view
+    on another thread can read a consistent snapshot between steps.
+
+    Attributes
+    ----------
+    ticks : int
+        The number of steps taken
+    simulation_time : float
+        The simulated time covered by those steps (in seconds)
+    paused : bool
+        While True, the scheduler waits instead of stepping
+    """
+
+    # How long an idle (paused or finished) scheduler waits before checking again
+    IDLE_WAIT = .01
+    # The most the schedule may fall behind before it stops trying to catch up (in wall-clock seconds)
+    MAX_LAG = .25
+
+    def __init__(self, controller, timedelta=.5, rate=None):
+        """
+        Parameters
+        ----------
+        controller : BattleshipController
+            The controller to step
+        timedelta : float
+            The simulated time that passes on each step (in seconds)
+        rate : float, optional
+            Simulated seconds per wall-clock second; None runs as fast as possible
+        """
+        self.controller = controller
+        self.timedelta = timedelta
+        self.rate = rate
+        self.ticks = 0
+        self.simulation_time = 0
+        self.paused = False
+        self.wall_time = 0
+        self.deadline = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def set_rate(self, rate):
+        """ Change the rate; the schedule restarts from the current step so no steps are skipped or rushed
+
+        Parameters
+        ----------
+        rate : float or None
+            Simulated seconds per wall-clock second; None runs as fast as possible
+        """
+        self.rate = rate
+        self.deadline = None
+
+    @property
+    def achieved_rate(self):
+        """ The simulated seconds per wall-clock second achieved so far """
+        return self.simulation_time / self.wall_time if self.wall_time > 0 else 0
+
+    def step(self):
+        """ Advance the simulation by one step """
+        self.controller.update(self.timedelta)
+        self.ticks += 1
+        self.simulation_time += self.timedelta
+
+    def run(self, max_ticks=None, stop_when_finished=True):
+        """ Step the simulation on the calling thread
+
+        Parameters
+        ----------
+        max_ticks : int, optional
+            Return after this many steps
+        stop_when_finished : bool
+            Return once the simulation stops running; otherwise keep waiting (e.g. for a restart) until `stop` is called
+        """
+        self.deadline = None
+        start_time = time.perf_counter()
+        ticks = 0
+        while not self.stop_event.is_set() and (max_ticks is None or ticks < max_ticks):
+            running = self.controller.simulation.simulation_running
+            if not running and stop_when_finished:
+                break
+            if self.paused or not running:
+                self.deadline = None
+                time.sleep(self.IDLE_WAIT)
+                continue
+            if self.rate is not None:
+                now = time.perf_counter()
+                # Restart the schedule after a pause, a rate change or falling too far behind
+                if self.deadline is None or now - self.deadline > self.MAX_LAG:
+                    self.deadline = now
+                if self.deadline > now:
+                    time.sleep(self.deadline - now)
+                self.deadline += self.timedelta / self.rate
+            self.step()
+            ticks += 1
+        self.wall_time += time.perf_counter() - start_time
+
+    def start(self):
+        """ Step the simulation on a background thread until `stop` is called """
+        self.stop_event.clear()
+        self.thread = threading.Thread(target = self.run, kwargs = {"stop_when_finished": False}, name = "simulation-scheduler", daemon = True)
+        self.thread.start()
+
+    def stop(self):
+        """ Stop the background thread, waiting for the current step to finish """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
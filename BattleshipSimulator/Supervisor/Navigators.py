@@ -1,8 +1,7 @@
-import requests
 from BattleshipSimulator.Models.GetterSetter import GetterSetter
 import BattleshipSimulator.Models.SimulatorUtilities as SimulatorUtilities
 import shapely
-import csv
+import numpy as np
 
 class BaseNavigator(GetterSetter):
 
@@ -14,6 +13,21 @@ class BaseNavigator(GetterSetter):
     def override(self):
         # Return true if any of the model's attributes were overridden
         return self.supervisor_override
+
+    @property
+    def geometry_cache(self):
+        # The world caches the polygons of its static obstacles
+        return None if self.model.world is None else self.model.world.geometry_cache
+
+    def get_polygon(self, shape):
+        """Return the Shapely polygon of a shape, taken from the world's geometry cache when it is a static obstacle."""
+        geometry_cache = self.geometry_cache
+        return shapely.Polygon(shape) if geometry_cache is None else geometry_cache.polygon(shape)
+
+    def buffer_shape(self, shape, distance):
+        """Grow a shape by a safety distance, reusing the cached result for static obstacles."""
+        geometry_cache = self.geometry_cache
+        return SimulatorUtilities.buffer_shape(shape, distance) if geometry_cache is None else geometry_cache.buffered(shape, distance)
     
     def logging_package(self):
         logged_objects = {}
@@ -48,11 +62,13 @@ class BaseRemoteNavigator(BaseNavigator):
         Returns:
         - dict: The parsed JSON data from the response.
         """
+        # Only remote navigators need requests, so it is not imported with the module
+        import requests
         self.is_error = False
         self.error_text = ""
 
         try:
-            return requests.post(self.POST_url, timeout = self.timeout, json = {k:self.model.get_attribute(k.replace(".",":")) for k in self.attributes}).json()
+            return requests.post(self.POST_url, timeout = self.timeout, json = dict(zip(self.attributes, self.model.get_attributes([k.replace(".",":") for k in self.attributes])))).json()
         except Exception as err:
             self.is_error = True
             self.error_text = str(err)
@@ -105,10 +121,11 @@ class CollisionAvoidanceNavigator(BaseNavigator):
             collision = False
             sign = -1
             for object in warning_objects:
+                object_polygon = self.get_polygon(object)
                 # check for intersection of the polygons and warning objects
-                if (shapely.intersects(shapely.Polygon(object), poly1) or shapely.intersects(shapely.Polygon(object), poly2)):
+                if (shapely.intersects(object_polygon, poly1) or shapely.intersects(object_polygon, poly2)):
                     collision = True
-                    if (shapely.intersects(shapely.Polygon(object), poly1)):
+                    if (shapely.intersects(object_polygon, poly1)):
                         sign = 1
             return {"heading": heading + sign * buffer_heading} if collision else {}
         else:
@@ -154,15 +171,15 @@ class PointAvoidanceNavigator(BaseNavigator):
             
             for obstacle in self.model.get_attribute("RadarSonar:radar_objects"):
                 # Artificially increase the size of the object by 2x the ship's width
-                enlarged_obstacle = SimulatorUtilities.buffer_shape(obstacle, safe_threshhold)
+                enlarged_obstacle = self.buffer_shape(obstacle, safe_threshhold)
                 obstacle_added = False
-                if SimulatorUtilities.line_intersects_polygon(headling_line_coords, enlarged_obstacle):
+                if SimulatorUtilities.line_intersects_polygon(headling_line_coords, enlarged_obstacle, self.geometry_cache):
                     heading_override = True
                     # Save a reference to the enlarged obstacle, the distance to all of its points, and the angle in relation to the current heading
                     self.relevant_objects.append(enlarged_obstacle)
                     obstacle_added = True
                     # TODO: if x,y is already inside the polygon, skim along the edge
-                if SimulatorUtilities.line_intersects_polygon(chosen_heading_line_coords, enlarged_obstacle):
+                if SimulatorUtilities.line_intersects_polygon(chosen_heading_line_coords, enlarged_obstacle, self.geometry_cache):
                     waypoint_heading_override = True
                     # Save a reference to the enlarged obstacle, the distance to all of its points, and the angle in relation to the current heading
                     if not obstacle_added:
@@ -210,11 +227,13 @@ class PointAvoidanceNavigator(BaseNavigator):
 # CIP begin
 class NewPointAvoidanceNavigator(BaseNavigator):
 
-    def __init__(self, model):
+    def __init__(self, model, angular_resolution=1):
         super().__init__(model)
         self.logging_variables = ["relevant_objects"]
         self.relevant_objects = []
         self.last_override_value = None
+        # The angle (in degrees) between two rays of the sonar sweep
+        self.sweep_angles = np.arange(0, 360, angular_resolution)
 
     def override(self):
         if self.model.get_attribute("RadarSonar:collision_warning"):
@@ -247,35 +266,22 @@ class NewPointAvoidanceNavigator(BaseNavigator):
             # try to generate sonar training data
             current_point = shapely.Point(model_x, model_y)
             collision_distance_in_each_angle = [model_x, model_y, model_chosen_h]
-            for angle in range(0, 360, 1):
-                min_collision_distance_in_angle = None
-                for obstacle in self.model.get_attribute("RadarSonar:radar_objects"):
-                    collision_distance_in_angle = SimulatorUtilities.get_distance_at_angle(current_point, shapely.Polygon(obstacle), angle)
-                    if (collision_distance_in_angle == None):
-                        continue
-                    else:
-                        if (min_collision_distance_in_angle == None):
-                            min_collision_distance_in_angle = collision_distance_in_angle
-                        else:
-                            min_collision_distance_in_angle = min(min_collision_distance_in_angle, collision_distance_in_angle)
-                
-                collision_distance_in_each_angle.append(min_collision_distance_in_angle if min_collision_distance_in_angle is not None else 0)
-            with open("collision_data.csv", "a") as f: 
-                for data in collision_distance_in_each_angle:
-                    f.write(str(data) + ",")
-                f.write("\n")
+            radar_polygons = [self.get_polygon(obstacle) for obstacle in self.model.get_attribute("RadarSonar:radar_objects")]
+            # Distance to the nearest obstacle along every ray of the sweep (0 where nothing is hit)
+            collision_distance_in_each_angle += SimulatorUtilities.range_profile(current_point, radar_polygons, self.sweep_angles).tolist()
+            self.model.hardware.outputs.writerow("collision_data.csv", collision_distance_in_each_angle)
 
             for obstacle in self.model.get_attribute("RadarSonar:radar_objects"):
                 # Artificially increase the size of the object by 2x the ship's width
-                enlarged_obstacle = SimulatorUtilities.buffer_shape(obstacle, safe_threshhold)
+                enlarged_obstacle = self.buffer_shape(obstacle, safe_threshhold)
                 obstacle_added = False
-                if SimulatorUtilities.line_intersects_polygon(headling_line_coords, enlarged_obstacle):
+                if SimulatorUtilities.line_intersects_polygon(headling_line_coords, enlarged_obstacle, self.geometry_cache):
                     heading_override = True
                     # Save a reference to the enlarged obstacle, the distance to all of its points, and the angle in relation to the current heading
                     self.relevant_objects.append(enlarged_obstacle)
                     obstacle_added = True
                     # TODO: if x,y is already inside the polygon, skim along the edge
-                if SimulatorUtilities.line_intersects_polygon(chosen_heading_line_coords, enlarged_obstacle):
+                if SimulatorUtilities.line_intersects_polygon(chosen_heading_line_coords, enlarged_obstacle, self.geometry_cache):
                     waypoint_heading_override = True
                     # Save a reference to the enlarged obstacle, the distance to all of its points, and the angle in relation to the current heading
                     if not obstacle_added:
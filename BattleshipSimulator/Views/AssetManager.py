@@ -0,0 +1,169 @@
+from collections import OrderedDict
+import threading
+import base64
+import json
+import time
+import os
+
+class LRUCache:
+    """
+    A dictionary of at most `maxsize` entries that evicts the least recently used entry when it is full.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, loader):
+        """
+        Return the entry of a key, calling `loader()` to create it on a miss.
+
+        Parameters:
+        -----------
+        key : hashable
+            The key of the entry.
+        loader : callable
+            Creates the entry; it is only called when the key is not cached.
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        value = loader()
+        self.entries[key] = value
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last = False)
+        return value
+
+class AssetManager:
+    """
+    Loads the textures and encoded image payloads that the GUI uses once, instead of on every frame.
+
+    Both are kept in LRU caches, so memory stays bounded when many different assets are shown.
+    """
+
+    IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
+
+    def __init__(self, max_textures=32, max_payloads=64, texture_loader=None):
+        """
+        Parameters:
+        -----------
+        max_textures : int
+            The most textures kept loaded.
+        max_payloads : int
+            The most encoded images kept in memory.
+        texture_loader : callable, optional
+            Loads a texture from a path. Defaults to arcade.load_texture.
+        """
+        self.textures = LRUCache(max_textures)
+        self.payloads = LRUCache(max_payloads)
+        self.texture_loader = texture_loader
+
+    def texture(self, path):
+        """Return the texture of an image file."""
+        if self.texture_loader is None:
+            # Imported here so that the payload cache can be used without a window
+            import arcade
+            self.texture_loader = arcade.load_texture
+        return self.textures.get(path, lambda: self.texture_loader(path))
+
+    def image_payload(self, path):
+        """Return the JSON message that carries an image file to the sonar IDS: {"ImageName", "ImageData"}."""
+        def encode():
+            with open(path, "rb") as image_file:
+                encoded_image = base64.b64encode(image_file.read()).decode('utf-8')
+            return json.dumps({"ImageName": os.path.basename(path), "ImageData": encoded_image})
+        return self.payloads.get(path, encode)
+
+    def image_payloads(self, directory, count=None):
+        """
+        Return the messages of the images in a directory.
+
+        Parameters:
+        -----------
+        directory : str
+            The directory to list; the listing is cached along with the payloads.
+        count : int, optional
+            Only return the first `count` images.
+        """
+        image_paths = self.payloads.get(("listing", directory), lambda: [
+            os.path.join(directory, f) for f in os.listdir(directory) if f.lower().endswith(self.IMAGE_EXTENSIONS)
+        ])
+        return [self.image_payload(image_path) for image_path in image_paths[:count]]
+
+class RateLimitedSender:
+    """
+    Publishes messages from a background thread, at most once every `interval` seconds per topic.
+
+    `send` never blocks the caller. If a topic is sent again before its previous messages went out,
+    only the newest messages are kept, so a caller that sends every frame produces one burst per interval.
+    """
+
+    def __init__(self, publish, interval=1.0):
+        """
+        Parameters:
+        -----------
+        publish : callable
+            Called as publish(topic, payload) on the sender's thread.
+        interval : float
+            The shortest time between two publishes on the same topic (in seconds).
+        """
+        self.publish = publish
+        self.interval = interval
+        self.pending = {}
+        self.last_sent = {}
+        self.sent = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target = self.run, name = "asset-sender", daemon = True)
+        self.thread.start()
+
+    def send(self, topic, payloads):
+        """
+        Queue the messages of a topic, replacing any that have not gone out yet.
+
+        Parameters:
+        -----------
+        topic : str
+            The topic to publish on.
+        payloads : list
+            The messages, published in order.
+        """
+        with self.condition:
+            self.pending[topic] = payloads
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while True:
+                    if self.closed and len(self.pending) == 0:
+                        return
+                    now = time.monotonic()
+                    due = [topic for topic in self.pending if self.closed or now - self.last_sent.get(topic, -self.interval) >= self.interval]
+                    if len(due) > 0:
+                        break
+                    # Sleep until the earliest pending topic may be sent again, or until something new is queued
+                    self.condition.wait(None if len(self.pending) == 0 else min(self.last_sent[topic] + self.interval for topic in self.pending) - now)
+                batches = [(topic, self.pending.pop(topic)) for topic in due]
+                for topic in due:
+                    self.last_sent[topic] = now
+            for topic, payloads in batches:
+                for payload in payloads:
+                    try:
+                        self.publish(topic, payload)
+                        self.sent += 1
+                    except Exception as e:
+                        print(f"Error publishing data: {e}")
+
+    def close(self):
+        """Publish whatever is still pending and stop the thread."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
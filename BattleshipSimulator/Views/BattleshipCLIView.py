@@ -0,0 +1,23 @@
+import BattleshipSimulator.Models.Profiler as Profiler
+
+class BattleshipViewCLI():
+    
+    def __init__(self, controller):
+        self.elapsed_time = 0
+        self.controller = controller
+    
+    def start(self, timedelta = .5, rate = None):
+        print(f"Running {self.controller.get_attribute('Simulation:config_file')}")
+        # Step at the requested rate (simulated seconds per second), or as fast as possible
+        scheduler = self.controller.scheduler(timedelta, rate)
+        scheduler.run()
+        self.elapsed_time += scheduler.simulation_time
+        print(f"  {('+' if self.controller.get_attribute('Simulation:simulation_status') == 'Success' else '-')} Simulation {('successful' if self.controller.get_attribute('Simulation:simulation_status') == 'Success' else 'failed')} in {self.elapsed_time} seconds")
+        if Profiler.profiler.enabled:
+            print(f"  {scheduler.ticks} ticks at {round(scheduler.ticks / scheduler.wall_time, 1) if scheduler.wall_time > 0 else 0} ticks/sec")
+            print(Profiler.profiler.report())
+    
+    def on_update(self, timedelta):
+        self.elapsed_time += timedelta
+        # Update the model
+        self.controller.update(timedelta)
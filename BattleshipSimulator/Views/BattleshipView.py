@@ -1,31 +1,16 @@
 import BattleshipSimulator.Models.SimulatorUtilities as SimulatorUtilities
 import BattleshipSimulator.Models.SimulatorViewUtilities as SimulatorViewUtilities
+import BattleshipSimulator.Models.BattleshipConstant as BattleshipConstant
+import BattleshipSimulator.Models.Profiler as Profiler
+import BattleshipSimulator.Views.AssetManager as AssetManager
+# Kept importable from here for code that used it before it had its own module
+from BattleshipSimulator.Views.BattleshipCLIView import BattleshipViewCLI
 import arcade
+from arcade.earclip import earclip
 import time
-from playsound import playsound
 import threading
 import math
 import json
-import os
-import base64
-import pandas as pd
-
-class BattleshipViewCLI():
-    
-    def __init__(self, controller):
-        self.elapsed_time = 0
-        self.controller = controller
-    
-    def start(self, timedelta = .5):
-        print(f"Running {self.controller.get_attribute('Simulation:config_file')}")
-        while self.controller.get_attribute("Simulation:simulation_running"):
-            self.on_update(timedelta)
-        print(f"  {('+' if self.controller.get_attribute('Simulation:simulation_status') == 'Success' else '-')} Simulation {('successful' if self.controller.get_attribute('Simulation:simulation_status') == 'Success' else 'failed')} in {self.elapsed_time} seconds")
-    
-    def on_update(self, timedelta):
-        self.elapsed_time += timedelta
-        # Update the model
-        self.controller.update(timedelta)
 
 class BattleshipViewGUI(arcade.View):
     """
@@ -57,8 +42,10 @@ class BattleshipViewGUI(arcade.View):
     #TODO: move the multiplier somewhere else
     SIM_TIMEDELTA_CONSTANT = .5
     SIM_TIME_MULTIPLIER = 1
+    # The shortest time between two batches of sonar images sent to the IDS during an engagement (in seconds)
+    SONAR_PUBLISH_INTERVAL = .5
 
-    def __init__(self, controller, screen_width=800, screen_height=600):
+    def __init__(self, controller, screen_width=800, screen_height=600, scheduler=None):
         """
         Initializes the BattleshipView with a model, controller, and window properties.
 
@@ -70,8 +57,12 @@ class BattleshipViewGUI(arcade.View):
             The width of the screen (default is 800).
         screen_height : int, optional
             The height of the screen (default is 600).
+        scheduler : SimulationScheduler, optional
+            Steps the simulation on its own thread at its own rate, while the view draws the latest state.
+            By default, the view steps the simulation SIM_TIME_MULTIPLIER times per frame.
         """
         super().__init__()
+        self.scheduler = scheduler
         arcade.Window.background_color = arcade.color.DARK_SKY_BLUE
         self.controller = controller
         self.screen_width = screen_width
@@ -86,7 +77,14 @@ class BattleshipViewGUI(arcade.View):
         self.width, self.height = arcade.get_window().get_size()  # CIP
         self.weapon_attack_pause_counter = 0                        # CIP
         self.sound_play_counter = 200                                # CIP
+        # Textures and sonar images are loaded once; the images are published from a background thread
+        self.assets = AssetManager.AssetManager()
+        self.sonar_sender = AssetManager.RateLimitedSender(lambda topic, payload: self.controller.simulation.transport.publish(topic, payload), self.SONAR_PUBLISH_INTERVAL)
+        # The latest copy of the simulation state, which frames are drawn from without holding the controller's lock
+        self.frame = self.controller.snapshot()
         self.setup()
+        if self.scheduler is not None:
+            self.scheduler.start()
     
     def setup(self):
         self.status_bar = Status_Pane(self.screen_width - 150, self.screen_height / 2, 300, self.screen_height, self)
@@ -97,16 +95,64 @@ class BattleshipViewGUI(arcade.View):
         for ship_id, ship_model in self.controller.get_attribute("Simulation:World:models").items():
             self.setup_battleship(ship_id, ship_model)
         
-        # Clear the ShapeList to update it
+        self.bake_obstacles()
+
+    def bake_obstacles(self):
+        """
+        Triangulate the static obstacles once and upload them as a single shape, which is drawn every frame.
+
+        arcade.create_polygon only fills convex polygons, so the obstacles are ear-clipped (as
+        arcade.draw_polygon_filled does) and batched as plain triangles. The triangles are kept in
+        `triangle_cache`, so radar, warning and collision objects (which are obstacles) reuse them.
+        The shapes of those objects are in pixels too, so they are dropped here and rebuilt on the next frame.
+        """
+        self.triangle_cache = {}
+        self.category_shapes = {}
         self.obstacle_list = arcade.ShapeElementList()
-        obstacle_color = arcade.color.DARK_BROWN
-        for obstacle in self.controller.get_attribute("Simulation:World:obstacles"):
-            if obstacle[0][0] == 1026:
-                print("here")
-            obstacle_shape = arcade.create_polygon(SimulatorViewUtilities.convert_coords_list_meters_to_pixels(
-                obstacle, self.PIXELS_PER_METER, self.height),      # CIP
-            obstacle_color)
+        obstacles = self.controller.get_attribute("Simulation:World:obstacles")
+        for obstacle in obstacles:
+            self.triangle_cache[id(obstacle)] = (obstacle, self.triangulate(obstacle))
+        obstacle_shape = self.create_polygons_filled(obstacles, arcade.color.DARK_BROWN)
+        if obstacle_shape is not None:
             self.obstacle_list.append(obstacle_shape)
+
+    def triangulate(self, polygon):
+        """Return the triangles of a polygon in pixels, as a flat list of points."""
+        coords = SimulatorViewUtilities.convert_coords_list_meters_to_pixels(polygon, self.PIXELS_PER_METER, self.height)  # CIP
+        return [point for triangle in earclip(coords) for point in triangle]
+
+    def create_polygons_filled(self, polygons, color):
+        """
+        Build one shape that fills every polygon, so that they are drawn with a single draw call.
+
+        Returns:
+        --------
+        arcade.Shape or None
+            The shape, or None if there are no polygons.
+        """
+        points = []
+        for polygon in polygons:
+            cached = self.triangle_cache.get(id(polygon))
+            # Playback data holds copies of the obstacles, which are triangulated on the fly
+            points += cached[1] if cached is not None and cached[0] is polygon else self.triangulate(polygon)
+        if len(points) == 0:
+            return None
+        return arcade.create_line_generic(points, color, arcade.gl.TRIANGLES)
+
+    def category_shape(self, category, polygons, color):
+        """
+        Return the shape that fills the objects of a category (e.g. "radar_objects"), which is only built
+        and uploaded again when the objects differ from the last frame's.
+
+        Returns:
+        --------
+        arcade.Shape or None
+            The shape, or None if there are no objects.
+        """
+        cached = self.category_shapes.get(category)
+        if cached is None or cached[0] != polygons:
+            cached = self.category_shapes[category] = (polygons, self.create_polygons_filled(polygons, color))
+        return cached[1]
     
     def setup_battleship(self, model_id, model):
         if model_id in self.ship_models:
@@ -140,6 +186,9 @@ class BattleshipViewGUI(arcade.View):
         current_ship["current_battleship_graphic"] = current_ship["ship_shape_list"][current_ship["collision_index"]]
     
     def on_update(self, timedelta):
+        self.update_frame(timedelta)
+
+    def update_frame(self, timedelta):
         # Check the size of the window (for Linux and Mac)
         left, screen_width, bottom, screen_height = arcade.get_viewport()
         if self.screen_width != screen_width or self.screen_height != screen_height:
@@ -168,33 +217,42 @@ class BattleshipViewGUI(arcade.View):
         if self.restart_flag:
             self.restart_simulation()
         else:
+            self.frame = self.controller.snapshot()
             # Force the simulation to pause if the simulation is no longer running (ended)
-            if not self.controller.get_attribute("Simulation:simulation_running") and not self.pause_simulation:
+            if not self.frame["simulation_running"] and not self.pause_simulation:
                 self.pause_simulation = True
                 self.playback_ui.reset()
             self.elapsed_time += timedelta
-            if not self.pause_simulation or (self.pause_simulation and self.no_playback_pause):
+            running = not self.pause_simulation or (self.pause_simulation and self.no_playback_pause)
+            if self.scheduler is not None:
+                self.scheduler.paused = not running
+            if running:
                 # Update the models
-                if self.controller.get_attribute("Simulation:simulation_running"):
-                    # If the constant
-                    sim_timedelta = self.SIM_TIMEDELTA_CONSTANT if self.SIM_TIMEDELTA_CONSTANT > 0 else timedelta
-                    for _ in range(self.SIM_TIME_MULTIPLIER):
-                        self.simulation_time += sim_timedelta
-                        self.controller.update(sim_timedelta)
+                if self.frame["simulation_running"]:
+                    if self.scheduler is None:
+                        # If the constant
+                        sim_timedelta = self.SIM_TIMEDELTA_CONSTANT if self.SIM_TIMEDELTA_CONSTANT > 0 else timedelta
+                        for _ in range(self.SIM_TIME_MULTIPLIER):
+                            self.simulation_time += sim_timedelta
+                            self.controller.update(sim_timedelta)
+                    else:
+                        self.simulation_time = self.scheduler.simulation_time
+                    self.frame = self.controller.snapshot()
                     # The model that is displayed depends on the collision state (none, warning, event)
                     for ship_id, current_ship in self.ship_models.items():
-                        if not self.get_model_attribute(ship_id, "RadarSonar:collision_warning"):
+                        ship_state = self.frame["models"][ship_id]
+                        if not ship_state["collision_warning"]:
                             current_ship["collision_index"] = 0
-                        elif not self.get_model_attribute(ship_id, "RadarSonar:collision_event"):
+                        elif not ship_state["collision_event"]:
                             current_ship["collision_index"] = 1
                         else:
                             current_ship["collision_index"] = 2
                 
                         # Use the correct graphic to identify the collision state
                         current_ship["current_battleship_graphic"] = current_ship["ship_shape_list"][current_ship["collision_index"]]        
-                        current_ship["current_battleship_graphic"].center_x = self.get_model_attribute(ship_id, "x") * self.PIXELS_PER_METER
-                        current_ship["current_battleship_graphic"].center_y = self.height - self.get_model_attribute(ship_id, "y") * self.PIXELS_PER_METER
-                        current_ship["current_battleship_graphic"].angle = 360 - self.get_model_attribute(ship_id, "heading")
+                        current_ship["current_battleship_graphic"].center_x = ship_state["x"] * self.PIXELS_PER_METER
+                        current_ship["current_battleship_graphic"].center_y = self.height - ship_state["y"] * self.PIXELS_PER_METER
+                        current_ship["current_battleship_graphic"].angle = 360 - ship_state["heading"]
             else:
                 playback_data = self.playback_ui.playback_data()
                 # The model that is displayed depends on the collision state (none, warning, event)
@@ -214,6 +272,8 @@ class BattleshipViewGUI(arcade.View):
             self.playback_ui.update(timedelta)
     
     def on_resize(self, width, height):
+        # The baked obstacles are in pixels, so they are rebuilt for the new window
+        self.bake_obstacles()
         self.status_bar.change_size(width - 150, height / 2, 300, height)
         self.playback_ui.change_size((self.screen_width - self.status_bar.width) / 2, 40, (self.screen_width - self.status_bar.width) - 100, 30)
         self.screen_width = width
@@ -223,6 +283,10 @@ class BattleshipViewGUI(arcade.View):
         """
         Draws the battleship's representation and information on the screen.
         """
+        self.draw_frame()
+
+    def draw_frame(self):
+        # Everything live is drawn from the latest snapshot, so the simulation thread never waits on a render
 
         self.clear()
         arcade.start_render()
@@ -230,53 +294,40 @@ class BattleshipViewGUI(arcade.View):
         # If the simulation is paused, we need to pull the data from the past
         playback_data = self.playback_ui.playback_data() if self.pause_simulation and not self.no_playback_pause else None
         
-        # Draw the world
-        # TODO: There is an issue rendering some polygons using the ShapeList
-        #self.obstacle_list.draw()
-        for obstacle in self.controller.get_attribute("Simulation:World:obstacles"):
-            arcade.draw_polygon_filled(SimulatorViewUtilities.convert_coords_list_meters_to_pixels(
-                obstacle, self.PIXELS_PER_METER, self.height),  # CIP
-            arcade.color.DARK_BROWN)
-        
+        # Draw the world, which was triangulated and uploaded once
+        self.obstacle_list.draw()
+
+        # The radar, warning and collision objects of every ship are drawn as one shape per color, in that order,
+        # which stays on the GPU for as long as the objects do not change
+        for category, color in [("radar_objects", arcade.color.DARK_PASTEL_GREEN), ("warning_objects", arcade.color.ORANGE), ("collision_objects", arcade.color.RED)]:
+            category_objects = []
+            for ship_id in self.ship_models:
+                category_objects += self.frame_attribute(ship_id, f"RadarSonar:{category}") if playback_data is None else playback_data[f"World.{ship_id}.RadarSonar.{category}"]
+            category_shape = self.category_shape(category, category_objects, color)
+            if category_shape is not None:
+                category_shape.draw()
         for ship_id, current_ship in self.ship_models.items():
-            radar_objects = self.get_model_attribute(ship_id, 'RadarSonar:radar_objects') if playback_data is None else playback_data[f"World.{ship_id}.RadarSonar.radar_objects"]
-            if len(radar_objects) > 0:
-                for radar_object in radar_objects:
-                    arcade.draw_polygon_filled(SimulatorViewUtilities.convert_coords_list_meters_to_pixels(radar_object, self.PIXELS_PER_METER, self.height),   # CIP
-                        arcade.color.DARK_PASTEL_GREEN)
-        for ship_id, current_ship in self.ship_models.items():
-            warning_objects = self.get_model_attribute(ship_id, 'RadarSonar:warning_objects') if playback_data is None else playback_data[f"World.{ship_id}.RadarSonar.warning_objects"]
-            if len(warning_objects) > 0:
-                for warning_object in warning_objects:
-                    arcade.draw_polygon_filled(SimulatorViewUtilities.convert_coords_list_meters_to_pixels(warning_object, self.PIXELS_PER_METER, self.height), # CIP
-                        arcade.color.ORANGE)
-        for ship_id, current_ship in self.ship_models.items():
-            collision_objects = self.get_model_attribute(ship_id, 'RadarSonar:collision_objects') if playback_data is None else playback_data[f"World.{ship_id}.RadarSonar.collision_objects"]
-            if len(collision_objects) > 0:
-                for collision_object in collision_objects:
-                    arcade.draw_polygon_filled(SimulatorViewUtilities.convert_coords_list_meters_to_pixels(collision_object, self.PIXELS_PER_METER, self.height),   # CIP
-                        arcade.color.RED)
             # Draw the radar range
-            radar_geometry = self.get_model_attribute(ship_id, 'RadarSonar:radar_geometry') if playback_data is None else playback_data[f"World.{ship_id}.RadarSonar.radar_geometry"]
+            radar_geometry = self.frame_attribute(ship_id, 'RadarSonar:radar_geometry') if playback_data is None else playback_data[f"World.{ship_id}.RadarSonar.radar_geometry"]
             arcade.draw_polygon_outline(SimulatorViewUtilities.convert_coords_list_meters_to_pixels(radar_geometry, self.PIXELS_PER_METER, self.height), arcade.color.DIM_GRAY, 2)  # CIP
 
         # Draw each ship in the simulation
         for ship_id, current_ship in self.ship_models.items():
             # Draw the waypoints
-            completed_waypoints = self.get_model_attribute(ship_id, "Navigation:completed_waypoints") if playback_data is None else playback_data[f"World.{ship_id}.Navigation.completed_waypoints"]
-            waypoints = self.get_model_attribute(ship_id, "Navigation:waypoints") if playback_data is None else playback_data[f"World.{ship_id}.Navigation.waypoints"]
+            completed_waypoints = self.frame_attribute(ship_id, "Navigation:completed_waypoints") if playback_data is None else playback_data[f"World.{ship_id}.Navigation.completed_waypoints"]
+            waypoints = self.frame_attribute(ship_id, "Navigation:waypoints") if playback_data is None else playback_data[f"World.{ship_id}.Navigation.waypoints"]
             all_waypoints = completed_waypoints + waypoints
             if len(all_waypoints) > 0:
                 for i, waypoint in enumerate(all_waypoints):
                     foreground_color = arcade.color.BLACK if waypoint in waypoints else arcade.color.DARK_GRAY
                     background_color = arcade.color.YELLOW if waypoint in waypoints else arcade.color.GRAY
                     waypoint = SimulatorViewUtilities.convert_coords_meters_to_pixels(*waypoint, self.PIXELS_PER_METER, self.height)    # CIP
-                    arcade.draw_circle_filled(waypoint[0], waypoint[1], self.get_model_attribute(ship_id, "Navigation:ALLOWED_DISTANCE_ERROR") * self.PIXELS_PER_METER, background_color + (192,))
+                    arcade.draw_circle_filled(waypoint[0], waypoint[1], self.frame_attribute(ship_id, "Navigation:ALLOWED_DISTANCE_ERROR") * self.PIXELS_PER_METER, background_color + (192,))
                     arcade.draw_point(waypoint[0], waypoint[1], foreground_color, 4)
                     arcade.draw_text(f"{ship_id} - Waypoint {i + 1}", waypoint[0] + 4, waypoint[1] + 4, foreground_color, font_size = 14)
             
             # Draw targets
-            targets = self.get_model_attribute(ship_id, "Weapons:targets") if playback_data is None else playback_data[f"World.{ship_id}.Weapons.targets"]
+            targets = self.frame_attribute(ship_id, "Weapons:targets") if playback_data is None else playback_data[f"World.{ship_id}.Weapons.targets"]
             if len(targets) > 0:
                 for i, target in enumerate(targets):
                     foreground_color = arcade.color.BLACK if target in targets else arcade.color.DARK_GRAY
@@ -290,10 +341,10 @@ class BattleshipViewGUI(arcade.View):
 
             # Draw the path taken
             if not self.pause_simulation or self.playback_ui.current_index == self.playback_ui.max_index:
-                current_path = self.get_model_attribute(ship_id, "Navigation:actual_path")
+                current_path = self.frame_attribute(ship_id, "Navigation:actual_path")
                 future_path = []
             else:
-                complete_path = self.get_model_attribute(ship_id, "Navigation:actual_path")
+                complete_path = self.frame_attribute(ship_id, "Navigation:actual_path")
                 current_path = complete_path[:self.playback_ui.current_index + 1]
                 future_path = complete_path[self.playback_ui.current_index + 1:]
             arcade.draw_line_strip(SimulatorViewUtilities.convert_coords_list_meters_to_pixels(
@@ -332,13 +383,13 @@ class BattleshipViewGUI(arcade.View):
                     current_ship["current_battleship_graphic"].center_x,
                     current_ship["current_battleship_graphic"].center_y,
                     150,
-                    self.get_model_attribute(ship_id, "waypoint_heading") if playback_data is None else playback_data[f"World.{ship_id}.waypoint_heading"]
+                    self.frame_attribute(ship_id, "waypoint_heading") if playback_data is None else playback_data[f"World.{ship_id}.waypoint_heading"]
                 )
                 chosen_heading_text_line = SimulatorUtilities.calculate_line_coordinates_from_end(
                     current_ship["current_battleship_graphic"].center_x,
                     current_ship["current_battleship_graphic"].center_y,
                     250,
-                    self.get_model_attribute(ship_id, "waypoint_heading") if playback_data is None else playback_data[f"World.{ship_id}.waypoint_heading"]
+                    self.frame_attribute(ship_id, "waypoint_heading") if playback_data is None else playback_data[f"World.{ship_id}.waypoint_heading"]
                 )
                 port_option_line = SimulatorUtilities.calculate_line_coordinates_from_end(
                     current_heading_line[2],
@@ -367,84 +418,85 @@ class BattleshipViewGUI(arcade.View):
                 
                 arcade.draw_line(*current_heading_line, arcade.color.BLUE)
 
-                chosen_direction = self.get_model_attribute(ship_id, 'chosen_direction') if playback_data is None else playback_data[f"World.{ship_id}.chosen_direction"]
+                chosen_direction = self.frame_attribute(ship_id, 'chosen_direction') if playback_data is None else playback_data[f"World.{ship_id}.chosen_direction"]
                 color = arcade.color.RED if chosen_direction == "port" else arcade.color.DIM_GRAY
                 arcade.draw_line(*port_option_line, color)
                 arcade.draw_point(port_option_line[2], port_option_line[3], color, 6)
-                arcade.draw_text(f"{round(self.get_model_attribute(ship_id, 'option_port') if playback_data is None else playback_data[f'World.{ship_id}.option_port'], 2)}°", port_option_text_line[2], port_option_text_line[3], color, anchor_x="center", anchor_y="center", font_size = 14)
+                arcade.draw_text(f"{round(self.frame_attribute(ship_id, 'option_port') if playback_data is None else playback_data[f'World.{ship_id}.option_port'], 2)}°", port_option_text_line[2], port_option_text_line[3], color, anchor_x="center", anchor_y="center", font_size = 14)
 
                 color = arcade.color.ISLAMIC_GREEN if chosen_direction == "starboard" else arcade.color.DIM_GRAY
                 arcade.draw_line(*starboard_option_line, color)
                 arcade.draw_point(starboard_option_line[2], starboard_option_line[3], color, 6)
-                arcade.draw_text(f"{round(self.get_model_attribute(ship_id, 'option_starboard') if playback_data is None else playback_data[f'World.{ship_id}.option_starboard'], 2)}°", starboard_option_text_line[2], starboard_option_text_line[3], color, anchor_x="center", anchor_y="center", font_size = 14)
+                arcade.draw_text(f"{round(self.frame_attribute(ship_id, 'option_starboard') if playback_data is None else playback_data[f'World.{ship_id}.option_starboard'], 2)}°", starboard_option_text_line[2], starboard_option_text_line[3], color, anchor_x="center", anchor_y="center", font_size = 14)
                 
                 arcade.draw_point(current_heading_line[2], current_heading_line[3], arcade.color.BLUE, 6)
-                arcade.draw_text(f"{round(self.get_model_attribute(ship_id, 'heading') if playback_data is None else playback_data[f'World.{ship_id}.heading'], 2)}°", current_heading_text_line[2], current_heading_text_line[3], arcade.color.BLUE, anchor_x="center", anchor_y="center", font_size = 14)
+                arcade.draw_text(f"{round(self.frame_attribute(ship_id, 'heading') if playback_data is None else playback_data[f'World.{ship_id}.heading'], 2)}°", current_heading_text_line[2], current_heading_text_line[3], arcade.color.BLUE, anchor_x="center", anchor_y="center", font_size = 14)
                 arcade.draw_line(*north_heading_line, arcade.color.BLUE)
                 arcade.draw_line(*chosen_heading_line, arcade.color.BLACK)
                 arcade.draw_point(chosen_heading_line[2], chosen_heading_line[3], arcade.color.BLACK, 6)
-                arcade.draw_text(f"{round(self.get_model_attribute(ship_id, 'waypoint_heading') if playback_data is None else playback_data[f'World.{ship_id}.waypoint_heading'], 2)}°", chosen_heading_text_line[2], chosen_heading_text_line[3], arcade.color.BLACK, anchor_x="center", anchor_y="center", font_size = 14)
+                arcade.draw_text(f"{round(self.frame_attribute(ship_id, 'waypoint_heading') if playback_data is None else playback_data[f'World.{ship_id}.waypoint_heading'], 2)}°", chosen_heading_text_line[2], chosen_heading_text_line[3], arcade.color.BLACK, anchor_x="center", anchor_y="center", font_size = 14)
 
-                arcade.draw_text(ship_id, (self.get_model_attribute(ship_id, 'x') if playback_data is None else playback_data[f'World.{ship_id}.x']) * self.PIXELS_PER_METER, self.height - (self.get_model_attribute(ship_id, 'y') if playback_data is None else self.height - playback_data[f'World.{ship_id}.y']) * self.PIXELS_PER_METER - 50, arcade.color.BLACK, anchor_x="center", anchor_y="center", font_size = 14)  # CIP
+                arcade.draw_text(ship_id, (self.frame_attribute(ship_id, 'x') if playback_data is None else playback_data[f'World.{ship_id}.x']) * self.PIXELS_PER_METER, self.height - (self.frame_attribute(ship_id, 'y') if playback_data is None else self.height - playback_data[f'World.{ship_id}.y']) * self.PIXELS_PER_METER - 50, arcade.color.BLACK, anchor_x="center", anchor_y="center", font_size = 14)  # CIP
 
-                if self.pause_simulation and self.playback_ui.current_index == self.playback_ui.max_index and self.get_model_attribute(ship_id, "user_override_heading") is not None:
+                if self.pause_simulation and self.playback_ui.current_index == self.playback_ui.max_index and self.frame_attribute(ship_id, "user_override_heading") is not None:
                     override_heading_line = SimulatorUtilities.calculate_line_coordinates_from_end(
                         current_ship["current_battleship_graphic"].center_x,
                         current_ship["current_battleship_graphic"].center_y,
                         150,
-                        (self.get_model_attribute(ship_id, "user_override_heading"))
+                        (self.frame_attribute(ship_id, "user_override_heading"))
                     )
                     override_heading_text_line = SimulatorUtilities.calculate_line_coordinates_from_end(
                         current_ship["current_battleship_graphic"].center_x,
                         current_ship["current_battleship_graphic"].center_y,
                         200,
-                        (self.get_model_attribute(ship_id, "user_override_heading"))
+                        (self.frame_attribute(ship_id, "user_override_heading"))
                     )
                     arcade.draw_line(*override_heading_line, arcade.color.YELLOW)
                     arcade.draw_point(override_heading_line[2], override_heading_line[3], arcade.color.YELLOW, 6)
-                    arcade.draw_text(f"{self.get_model_attribute(ship_id, 'user_override_heading')}°", override_heading_text_line[2], override_heading_text_line[3], arcade.color.YELLOW, anchor_x="center", anchor_y="center", font_size = 14)
-                elif (self.get_model_attribute(ship_id, 'user_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.user_override_heading']) is not None:
+                    arcade.draw_text(f"{self.frame_attribute(ship_id, 'user_override_heading')}°", override_heading_text_line[2], override_heading_text_line[3], arcade.color.YELLOW, anchor_x="center", anchor_y="center", font_size = 14)
+                elif (self.frame_attribute(ship_id, 'user_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.user_override_heading']) is not None:
                     override_heading_line = SimulatorUtilities.calculate_line_coordinates_from_end(
                         current_ship["current_battleship_graphic"].center_x,
                         current_ship["current_battleship_graphic"].center_y,
                         150,
-                        (self.get_model_attribute(ship_id, 'user_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.user_override_heading'])
+                        (self.frame_attribute(ship_id, 'user_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.user_override_heading'])
                     )
                     override_heading_text_line = SimulatorUtilities.calculate_line_coordinates_from_end(
                         current_ship["current_battleship_graphic"].center_x,
                         current_ship["current_battleship_graphic"].center_y,
                         200,
-                        (self.get_model_attribute(ship_id, 'user_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.user_override_heading'])
+                        (self.frame_attribute(ship_id, 'user_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.user_override_heading'])
                     )
                     arcade.draw_line(*override_heading_line, arcade.color.YELLOW)
                     arcade.draw_point(override_heading_line[2], override_heading_line[3], arcade.color.YELLOW, 6)
-                    arcade.draw_text(f"{round(self.get_model_attribute(ship_id, 'user_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.user_override_heading'], 2)}°", override_heading_text_line[2], override_heading_text_line[3], arcade.color.YELLOW, anchor_x="center", anchor_y="center", font_size = 14)
+                    arcade.draw_text(f"{round(self.frame_attribute(ship_id, 'user_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.user_override_heading'], 2)}°", override_heading_text_line[2], override_heading_text_line[3], arcade.color.YELLOW, anchor_x="center", anchor_y="center", font_size = 14)
                 
-                if (self.get_model_attribute(ship_id, 'ca_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.ca_override_heading']) is not None:
+                if (self.frame_attribute(ship_id, 'ca_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.ca_override_heading']) is not None:
                     override_heading_line = SimulatorUtilities.calculate_line_coordinates_from_end(
                         current_ship["current_battleship_graphic"].center_x,
                         current_ship["current_battleship_graphic"].center_y,
                         150,
-                        self.get_model_attribute(ship_id, 'ca_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.ca_override_heading']
+                        self.frame_attribute(ship_id, 'ca_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.ca_override_heading']
                     )
                     override_heading_text_line = SimulatorUtilities.calculate_line_coordinates_from_end(
                         current_ship["current_battleship_graphic"].center_x,
                         current_ship["current_battleship_graphic"].center_y,
                         200,
-                        self.get_model_attribute(ship_id, 'ca_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.ca_override_heading']
+                        self.frame_attribute(ship_id, 'ca_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.ca_override_heading']
                     )
                     arcade.draw_line(*override_heading_line, arcade.color.DEEP_CARROT_ORANGE)
                     arcade.draw_point(override_heading_line[2], override_heading_line[3], arcade.color.DEEP_CARROT_ORANGE, 6)
-                    arcade.draw_text(f"{round(self.get_model_attribute(ship_id, 'ca_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.ca_override_heading'], 2)}°", override_heading_text_line[2], override_heading_text_line[3], arcade.color.DEEP_CARROT_ORANGE, anchor_x="center", anchor_y="center", font_size = 14)
+                    arcade.draw_text(f"{round(self.frame_attribute(ship_id, 'ca_override_heading') if playback_data is None else playback_data[f'World.{ship_id}.ca_override_heading'], 2)}°", override_heading_text_line[2], override_heading_text_line[3], arcade.color.DEEP_CARROT_ORANGE, anchor_x="center", anchor_y="center", font_size = 14)
 
-                    for coll_object in (self.get_model_attribute(ship_id, 'CollisionAvoidance:relevant_objects') if playback_data is None else playback_data[f'World.{ship_id}.CollisionAvoidance.relevant_objects']):
+                    for coll_object in (self.frame_attribute(ship_id, 'CollisionAvoidance:relevant_objects') if playback_data is None else playback_data[f'World.{ship_id}.CollisionAvoidance.relevant_objects']):
                          arcade.draw_polygon_outline(SimulatorViewUtilities.convert_coords_list_meters_to_pixels(coll_object, self.PIXELS_PER_METER, self.height), arcade.color.BLACK, 1)   # CIP
 
             arcade.draw_text(f"{self.playback_ui.max_index}", self.status_bar.min_x - 5, self.screen_height, arcade.color.BLACK, anchor_x = "right", anchor_y = "top", font_size = 16)
             # CIP begin
-            to_attack_target = self.get_model_attribute(ship_id, "Weapons:to_attack_target_index")
+            to_attack_target = self.frame_attribute(ship_id, "Weapons:to_attack_target_index")
             if to_attack_target is not None:
                 def play_sonar_sound():
+                    from playsound import playsound
                     playsound('./fish/sonar1.wav')
 
                 if self.sound_play_counter >= 200:
@@ -456,25 +508,12 @@ class BattleshipViewGUI(arcade.View):
 
                 # TODO: form into Eliz's MQTT json packet
                 # weapon target information
-                valid_extensions = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
-                image_paths = [os.path.join("./Security_Monitor/Test_Data/Sonar_Malicious", f) for f in os.listdir("./Security_Monitor/Test_Data/Sonar_Malicious") if f.lower().endswith(valid_extensions)]
-
-                for image_path in image_paths[:3]:
-                    with open(image_path, "rb") as image_file:
-                        encoded_image = base64.b64encode(image_file.read()).decode('utf-8')
-
-                    # Create the payload
-                    payload = json.dumps({
-                        "ImageName": os.path.basename(image_path),
-                        "ImageData": encoded_image
-                    })
+                # The images are encoded once, and the sender publishes them off the render thread at a limited rate
+                self.sonar_sender.send("submarine/sonar_input", self.assets.image_payloads("./Security_Monitor/Test_Data/Sonar_Malicious", 3))
 
-                    # Publish the payload
-                    self.controller.simulation.image_data_client.publish("submarine/sonar_input", payload)
-
-                image_texture = arcade.load_texture("Security_Monitor/Noisy_Images/file1.jpg")
-                image_texture2 = arcade.load_texture("Security_Monitor/Noisy_Images/file2.jpg")
-                image_texture3 = arcade.load_texture("Security_Monitor/Noisy_Images/file3.jpg")
+                image_texture = self.assets.texture("Security_Monitor/Noisy_Images/file1.jpg")
+                image_texture2 = self.assets.texture("Security_Monitor/Noisy_Images/file2.jpg")
+                image_texture3 = self.assets.texture("Security_Monitor/Noisy_Images/file3.jpg")
                 arcade.draw_scaled_texture_rectangle(
                     self.screen_width - 150, self.screen_height // 2, 
                     image_texture,
@@ -494,8 +533,8 @@ class BattleshipViewGUI(arcade.View):
                 )
 
                 self.weapon_attack_pause_counter += 1
-                if (self.weapon_attack_pause_counter >= 150 and self.controller.simulation.world.models[ship_id].hardware.shared_mem_aggregator_buff[0] != 3):
-                    image_texture_skeleton = arcade.load_texture("fish/skeleton.png")
+                if (self.weapon_attack_pause_counter >= 150 and self.frame_attribute(ship_id, "predicted_attack") != BattleshipConstant.SONAR_JAMMING):
+                    image_texture_skeleton = self.assets.texture("fish/skeleton.png")
                     arcade.draw_scaled_texture_rectangle(
                         self.screen_width - 150, self.screen_height // 4,  
                         image_texture_skeleton,
@@ -504,9 +543,9 @@ class BattleshipViewGUI(arcade.View):
 
                 if (self.weapon_attack_pause_counter >= 200):
                     # weapon target info
-                    target = self.controller.simulation.world.models[ship_id].subsystems["Weapons"].targets[to_attack_target]
-                    submarine_x = self.controller.simulation.world.models[ship_id].x
-                    submarine_y = self.controller.simulation.world.models[ship_id].y
+                    target = self.frame_attribute(ship_id, "Weapons:targets")[to_attack_target]
+                    submarine_x = self.frame_attribute(ship_id, "x")
+                    submarine_y = self.frame_attribute(ship_id, "y")
                     target_x = target[0]
                     target_y = target[1]
                     target_size = target[2]
@@ -515,14 +554,16 @@ class BattleshipViewGUI(arcade.View):
                     weapon_choice = 1 if  target_size > 1 else 0
                     weapon_log = [submarine_x, submarine_y, target_size, target_type, target_x, target_y, submarine_target_distance, weapon_choice]
                     weapon_log = ["1","Unarmed","None","None","None","Unarmed","No","Non-Malicious"]
-                    weapon_log = pd.DataFrame([weapon_log], columns=["S.No.", "Current Status", "Recommended Weapon", "Command Sent", "Armed Weapon", "Expected Next Status", "Fired?", "Class"])
-                    row_json = weapon_log.to_json()
+                    # The same JSON as a one-row DataFrame.to_json, which the weapons IDS reads back with pandas
+                    row_json = json.dumps({column: {"0": value} for column, value in zip(["S.No.", "Current Status", "Recommended Weapon", "Command Sent", "Armed Weapon", "Expected Next Status", "Fired?", "Class"], weapon_log)}, separators = (",", ":"))
                     payload = json.dumps({"RowID": "1", "Data": row_json})
 
-                    self.controller.simulation.weapon_data_client.publish("submarine/weapons_input", payload)
+                    self.controller.simulation.transport.publish("submarine/weapons_input", payload)
 
-                    self.controller.simulation.world.models[ship_id].subsystems["Weapons"].targets.pop(to_attack_target)
-                    self.controller.simulation.world.models[ship_id].subsystems["Weapons"].to_attack_target_index = None
+                    # The engaged target is removed from the live model, so the simulation waits for this one change
+                    with self.controller.lock:
+                        self.controller.simulation.world.models[ship_id].subsystems["Weapons"].targets.pop(to_attack_target)
+                        self.controller.simulation.world.models[ship_id].subsystems["Weapons"].to_attack_target_index = None
                     self.pause_simulation = False
                     self.no_playback_pause = False
                     self.controller.get_child("Simulation").resume()
@@ -540,10 +581,10 @@ class BattleshipViewGUI(arcade.View):
         if not self.no_playback_pause:
             self.status_bar.draw()
 
-        if self.controller.get_attribute("Simulation:simulation_running"):
+        if self.frame["simulation_running"]:
             arcade.draw_text(f"Press <SPACE> to {'pause' if not self.pause_simulation else 'resume'} or <ENTER> to restart", 5, self.screen_height, arcade.color.BLACK, anchor_x = "left", anchor_y = "top", font_size = 16)
         else:
-            arcade.draw_text(f"Result: {self.controller.get_attribute('Simulation:simulation_status')}; press <ENTER> to restart", 5, self.screen_height, arcade.color.BLACK, anchor_x = "left", anchor_y = "top", font_size = 16)
+            arcade.draw_text(f"Result: {self.frame['simulation_status']}; press <ENTER> to restart", 5, self.screen_height, arcade.color.BLACK, anchor_x = "left", anchor_y = "top", font_size = 16)
         if arcade.get_window().fullscreen:
             arcade.draw_text("Press <ESC> to exit fullscreen", 5, self.screen_height - 24, arcade.color.BLACK, anchor_x = "left", anchor_y = "top", font_size = 16)
 
@@ -683,20 +724,48 @@ class BattleshipViewGUI(arcade.View):
         # Wait for the update() to delete the key entry so we don't have a race condition
         self.keys_down[key]["delete"] = True
 
+    def on_hide_view(self):
+        self.close()
+
+    def close(self):
+        """
+        Stop the view's background threads and release the simulation's channels.
+
+        Called when the view is hidden or the window closes. Pending sonar images are published before the
+        transport they go out on is closed; a simulation that has terminated already closed its own channels.
+        """
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        self.sonar_sender.close()
+        with self.controller.lock:
+            simulation = self.controller.simulation
+            if simulation.simulation_running:
+                simulation.simulation_running = False
+                simulation.logger.close()
+                simulation.close_io()
+
     def restart_simulation(self):
         self.controller.restart()
         self.restart_flag = False
         self.pause_simulation = False
 
+    def frame_attribute(self, model_id, attribute):
+        """Return a model attribute (one of BattleshipController.VIEW_ATTRIBUTES) from the latest snapshot."""
+        return self.frame["models"][model_id][attribute]
+
     def get_model_attribute(self, model_id, attribute):
-        return self.controller.get_attribute(f"Simulation:World:{model_id}:{attribute}")
+        with self.controller.lock:
+            return self.controller.get_attribute(f"Simulation:World:{model_id}:{attribute}")
 
     def set_model_attribute(self, model_id, attribute, value):
-        self.controller.set_attribute(f"Simulation:World:{model_id}:{attribute}", value)
+        with self.controller.lock:
+            self.controller.set_attribute(f"Simulation:World:{model_id}:{attribute}", value)
 
 class Status_Pane():
 
     STD_OFFSET = 5
+    # The number of spans shown while profiling
+    PROFILE_ROWS = 8
 
     def __init__(self, x, y, width, height, parent_view, tracked_object = "PrimarySubmarine"):
 
@@ -722,27 +791,32 @@ class Status_Pane():
         text_strings = ["","",""]
         self.monitored_data = {
             "----- Model Data -----": {
-                "Ship X": round(self.parent_view.get_model_attribute(self.tracked_object, 'x')),
-                "Ship Y": round(self.parent_view.get_model_attribute(self.tracked_object, 'y')),
-                "Speed": f"{round(self.parent_view.get_model_attribute(self.tracked_object, 'current_speed'), 1)} m/s",
-                "Heading": f"{round(self.parent_view.get_model_attribute(self.tracked_object, 'heading'))}°",
-                "Chosen Heading": f"{round(self.parent_view.get_model_attribute(self.tracked_object, 'chosen_heading'))}°",
-                "Action": self.parent_view.get_model_attribute(self.tracked_object, 'actions'),
-                "Col. Warning": self.parent_view.get_model_attribute(self.tracked_object, "RadarSonar:collision_warning"),
-                "Col. Event": self.parent_view.get_model_attribute(self.tracked_object, "RadarSonar:collision_event")
+                "Ship X": round(self.parent_view.frame_attribute(self.tracked_object, 'x')),
+                "Ship Y": round(self.parent_view.frame_attribute(self.tracked_object, 'y')),
+                "Speed": f"{round(self.parent_view.frame_attribute(self.tracked_object, 'current_speed'), 1)} m/s",
+                "Heading": f"{round(self.parent_view.frame_attribute(self.tracked_object, 'heading'))}°",
+                "Chosen Heading": f"{round(self.parent_view.frame_attribute(self.tracked_object, 'chosen_heading'))}°",
+                "Action": self.parent_view.frame_attribute(self.tracked_object, 'actions'),
+                "Col. Warning": self.parent_view.frame_attribute(self.tracked_object, "RadarSonar:collision_warning"),
+                "Col. Event": self.parent_view.frame_attribute(self.tracked_object, "RadarSonar:collision_event")
             },
             "----- View Data -----": {
                 "Sim Time": SimulatorViewUtilities.seconds_to_hms(self.parent_view.simulation_time),
-                "Sim Time Delta": f"{round(self.parent_view.controller.get_attribute('Simulation:timedelta'), 2)} s",
+                "Sim Time Delta": f"{round(self.parent_view.frame['timedelta'], 2)} s",
                 "Frame Rate": f"{int(arcade.get_fps())} FPS",
                 "Mouse X (px)": self.parent_view.mouse_x,
                 "Mouse Y (px)": self.parent_view.mouse_y,
                 "Mouse X (m)": round(self.parent_view.mouse_x / self.parent_view.PIXELS_PER_METER, 2),
                 "Mouse Y (m)": round(self.parent_view.mouse_y / self.parent_view.PIXELS_PER_METER, 2),
-                "Under Attack": self.get_attack_string(int(self.parent_view.get_model_attribute(self.tracked_object, "under_attack_status")))
+                "Under Attack": self.get_attack_string(int(self.parent_view.frame_attribute(self.tracked_object, "under_attack_status")))
             },
             #"----- Log Data -----": {k.rsplit(".")[-1]:v for k, v in self.parent_view.controller.world.logging_package().items()}
         }
+        if Profiler.profiler.enabled:
+            # The slowest parts of the tick, as mean / 95th percentile milliseconds
+            self.monitored_data["----- Tick Profile (ms) -----"] = {
+                name: f"{1e3 * stats['mean']:.2f} / {1e3 * stats['p95']:.2f}" for name, stats in list(Profiler.profiler.summary().items())[:self.PROFILE_ROWS]
+            }
         for section in self.monitored_data:
             text_strings[0] += "\n"
             text_strings[1] += "\n"
@@ -808,7 +882,7 @@ class Playback_Pane():
         self.slider_x = self.max_x
 
     def update(self, timedelta):
-        self.max_index = self.parent_view.controller.get_attribute("Simulation:Logger:length") - 1
+        self.max_index = self.parent_view.frame["log_length"] - 1
 
     def draw(self):
         arcade.draw_rectangle_filled(self.bar_x, self.y, self.bar_width, self.height, arcade.color.RED)
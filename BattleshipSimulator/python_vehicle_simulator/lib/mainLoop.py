@@ -7,6 +7,8 @@ Author:     Thor I. Fossen
 """
 
 import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor
 from .gnc import attitudeEuler
 
 ###############################################################################
@@ -57,18 +59,24 @@ def printVehicleinfo(vehicle, sampleTime, N):
 ###############################################################################
 # Function simulate(N, sampleTime, vehicle)
 ###############################################################################
-def simulate(N, sampleTime, vehicle):
+def simulate(N, sampleTime, vehicle, eta = None, out = None):
+    """
+    simTime, simData = simulate(N, sampleTime, vehicle, eta, out) runs one
+    trajectory of N steps. eta is the initial position/attitude (zero if
+    omitted) and out, if given, is an (N+1) x (2*DOF + 2*dimU) array that
+    receives simData instead of a new array.
+    """
     
     DOF = 6                     # degrees of freedom
     t = 0                       # initial simulation time
 
     # Initial state vectors
-    eta = np.array([0, 0, 0, 0, 0, 0], float)    # position/attitude, user editable
+    eta = np.zeros(DOF, float) if eta is None else np.array(eta, float)    # position/attitude, user editable
     nu = vehicle.nu                              # velocity, defined by vehicle class
     u_actual = vehicle.u_actual                  # actual inputs, defined by vehicle class
     
-    # Initialization of table used to store the simulation data
-    simData = np.empty( [0, 2*DOF + 2 * vehicle.dimU], float)
+    # Table used to store the simulation data, one row per step
+    simData = np.empty( [N+1, 2*DOF + 2 * vehicle.dimU], float) if out is None else out
 
     # Simulator for-loop
     for i in range(0,N+1):
@@ -88,8 +96,7 @@ def simulate(N, sampleTime, vehicle):
             u_control = vehicle.stepInput(t)          
         
         # Store simulation data in simData
-        signals = np.append( np.append( np.append(eta,nu),u_control), u_actual )
-        simData = np.vstack( [simData, signals] ) 
+        simData[i] = np.concatenate( [eta, nu, u_control, u_actual] )
 
         # Propagate vehicle and attitude dynamics
         [nu, u_actual]  = vehicle.dynamics(eta,nu,u_actual,u_control,sampleTime)
@@ -99,3 +106,72 @@ def simulate(N, sampleTime, vehicle):
     simTime = np.arange(start=0, stop=t+sampleTime, step=sampleTime)[:, None]
 
     return(simTime,simData)
+
+
+###############################################################################
+# Function simulateEnsemble(N, sampleTime, vehicles)
+###############################################################################
+def simulateMember(N, sampleTime, vehicle, eta):
+    """
+    simData = simulateMember(N, sampleTime, vehicle, eta) runs one member
+    of an ensemble (in a worker process).
+    """
+    return simulate(N, sampleTime, vehicle, eta)[1]
+
+
+def simulateEnsemble(N, sampleTime, vehicles, eta = None, parameters = None, processes = None, out = None):
+    """
+    simTime, simData = simulateEnsemble(N, sampleTime, vehicles, eta,
+    parameters, processes, out) runs M trajectories of N steps, one per
+    vehicle, and returns simData as an M x (N+1) x (2*DOF + 2*dimU) array.
+
+    The ensemble is sampled by the caller, e.g. 
+
+        V_c = np.random.uniform(0, 1, M)
+        vehicles = [remus100('depthHeadingAutopilot',30,50,1525,V,-30) for V in V_c]
+
+    Inputs:
+        vehicles: list of M vehicle objects of the same type and controlMode
+        eta: M x 6 initial positions/attitudes, zero if omitted
+        parameters: dict of attribute name -> M values set on the vehicles
+            before running, e.g. {'wn': wn} for autopilot gains or 
+            {'nu': nu0} for initial velocities
+        processes: worker processes for vehicles that cannot be vectorized,
+            1 runs them in this process, None uses every CPU
+        out: preallocated result array (e.g. a np.memmap)
+
+    Heading autopilot frigates are stepped together by frigateBatch, so the
+    ensemble costs about as many NumPy calls as one trajectory. Any other
+    vehicle is simulated member by member across a process pool.
+    """
+    # Imported here since the vehicles import this package
+    from ..vehicles.frigate import frigate
+    from ..vehicles.frigateBatch import frigateBatch
+
+    DOF = 6
+    M = len(vehicles)
+    eta = np.zeros((M, DOF), float) if eta is None else np.array(eta, float).reshape(M, DOF)
+    for name, values in ({} if parameters is None else parameters).items():
+        for vehicle, value in zip(vehicles, values):
+            setattr(vehicle, name, value)
+
+    simData = np.empty( [M, N+1, 2*DOF + 2 * vehicles[0].dimU], float) if out is None else out
+    simTime = np.arange(N+1)[:, None] * sampleTime
+
+    if all(type(vehicle) is frigate and vehicle.controlMode == 'headingAutopilot' for vehicle in vehicles):
+        batch = frigateBatch(vehicles, eta)
+        for i in range(0,N+1):
+            batch.step(sampleTime, rows = simData[:, i])
+        batch.store()
+    elif processes == 1:
+        for m in range(M):
+            simulate(N, sampleTime, vehicles[m], eta[m], out = simData[m])
+    else:
+        processes = os.cpu_count() if processes is None else processes
+        with ProcessPoolExecutor(processes) as pool:
+            # A few chunks per worker keeps the pickling overhead low while balancing the load
+            results = pool.map(simulateMember, [N] * M, [sampleTime] * M, vehicles, eta, chunksize = max(1, M // (4 * processes)))
+            for m, memberData in enumerate(results):
+                simData[m] = memberData
+
+    return(simTime,simData)
@@ -10,11 +10,10 @@ Author:     Thor I. Fossen
 """
 
 import math
-import matplotlib.pyplot as plt
 import numpy as np
 from BattleshipSimulator.python_vehicle_simulator.lib.gnc import ssa
-import mpl_toolkits.mplot3d.axes3d as p3
-import matplotlib.animation as animation
+
+# matplotlib is imported by the plotting functions, so that simulating does not load it
 
 legendSize = 10  # legend size
 figSize1 = [25, 13]  # figure1 size in cm
@@ -34,6 +33,8 @@ def cm2inch(value):  # inch to cm
 # position/attitude and velocities versus time in figure no. figNo
 def plotVehicleStates(simTime, simData, figNo):
 
+    import matplotlib.pyplot as plt
+
     # Time vector
     t = simTime
 
@@ -125,6 +126,8 @@ def plotVehicleStates(simTime, simData, figNo):
 # in figure no. figNo
 def plotControls(simTime, simData, vehicle, figNo):
 
+    import matplotlib.pyplot as plt
+
     DOF = 6
 
     # Time vector
@@ -161,6 +164,10 @@ def plotControls(simTime, simData, vehicle, figNo):
 # plot3D(simData,numDataPoints,FPS,filename,figNo) plots the vehicles position (x, y, z) in 3D
 # in figure no. figNo
 def plot3D(simData,numDataPoints,FPS,filename,figNo):
+
+    import matplotlib.pyplot as plt
+    import mpl_toolkits.mplot3d.axes3d as p3
+    import matplotlib.animation as animation
         
     # State vectors
     x = simData[:,0]
@@ -3,6 +3,7 @@
 
 from .DSRV import *
 from .frigate import *
+from .frigateBatch import *
 from .otter import *
 from .ROVzefakkel import *
 from .semisub import *
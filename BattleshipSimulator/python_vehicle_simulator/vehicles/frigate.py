@@ -32,6 +32,15 @@ Methods:
 
     u = headingAutopilot(eta,nu,sampleTime) 
         PID controller for automatic heading control based on pole placement.
+
+    delta_c = rudderCommand(eta,nu,sampleTime) is the same controller, 
+        returning the rudder command as a scalar.
+
+    integrate(eta,nu,u_actual,delta_c,sampleTime) advances eta, nu and
+        u_actual in place by one Euler step, without allocating arrays.
+
+    delta_c = step(eta,nu,u_actual,sampleTime,substeps,row) runs the heading
+        autopilot and integrate() substeps times, updating the states in place.
        
         u = stepInput(t) generates rudder angle step inputs.   
        
@@ -168,10 +177,11 @@ class frigate:
         return u_control             
 
 
-    def headingAutopilot(self,eta,nu,sampleTime):
+    def rudderCommand(self,eta,nu,sampleTime):
         """
-        u = headingAutopilot(eta,nu,sampleTime) is a PID controller 
-        for automatic heading control based on pole placement.
+        delta_c = rudderCommand(eta,nu,sampleTime) is the heading autopilot's 
+        PID controller, based on pole placement, returning the rudder command 
+        (rad) as a scalar.
         
         delta = (T/K) * a_d + (1/K) * rd 
                - Kp * ( ssa( psi-psi_d ) + Td * (r - r_d) + (1/Ti) * z )
@@ -197,6 +207,82 @@ class frigate:
             PIDpolePlacement( self.e_int, e_psi, e_r, self.psi_d, self.r_d, self.a_d, \
             m, d, k, wn_d, zeta_d, wn, zeta, psi_ref, self.r_max, sampleTime )
 
-        u_control = np.array([delta],float)   
+        return delta
+
+
+    def headingAutopilot(self,eta,nu,sampleTime):
+        """
+        u = headingAutopilot(eta,nu,sampleTime) is a PID controller 
+        for automatic heading control based on pole placement.
+        """
+        u_control = np.array([self.rudderCommand(eta,nu,sampleTime)],float)   
          
-        return u_control     
\ No newline at end of file
+        return u_control     
+
+
+    def integrate(self,eta,nu,u_actual,delta_c,sampleTime):
+        """
+        integrate(eta,nu,u_actual,delta_c,sampleTime) overwrites eta, nu and 
+        u_actual with their values at [k+1]. It is equivalent to dynamics() 
+        followed by attitudeEuler(), written out for this model's states 
+        so that no arrays are allocated.
+        """
+        delta = u_actual[0]
+        r     = nu[5]
+
+        # Rudder angle saturation and dynamics
+        if ( abs(delta) >= self.deltaMax * math.pi/180 ):
+            delta = math.copysign(self.deltaMax * math.pi/180, delta)
+
+        delta_dot = delta_c - delta
+        if ( abs(delta_dot) >= self.DdeltaMax * math.pi/180 ):
+            delta_dot = math.copysign(self.DdeltaMax * math.pi/180, delta_dot)
+
+        # Dynamics and forward Euler integration [k+1] (only r has a derivative)
+        r_dot = (1 / self.T) * ( self.K * delta - self.n3 * r**3 - self.n1 * r )
+        nu[5] = r + sampleTime * r_dot
+        u_actual[0] = delta + sampleTime * delta_dot
+
+        # Attitude: eta[k+1] = eta + sampleTime * [ Rzyx * nu[0:3], Tzyx * nu[3:6] ]
+        cphi = math.cos(eta[3])
+        sphi = math.sin(eta[3])
+        cth  = math.cos(eta[4])
+        sth  = math.sin(eta[4])
+        cpsi = math.cos(eta[5])
+        spsi = math.sin(eta[5])
+        u, v, w, p, q, r = nu
+
+        x_dot = cpsi*cth * u + (-spsi*cphi+cpsi*sth*sphi) * v + (spsi*sphi+cpsi*cphi*sth) * w
+        y_dot = spsi*cth * u + (cpsi*cphi+sphi*sth*spsi) * v + (-cpsi*sphi+sth*spsi*cphi) * w
+        z_dot = -sth * u + cth*sphi * v + cth*cphi * w
+        phi_dot   = p + sphi*sth/cth * q + cphi*sth/cth * r
+        theta_dot = cphi * q - sphi * r
+        psi_dot   = sphi/cth * q + cphi/cth * r
+
+        eta[0] += sampleTime * x_dot
+        eta[1] += sampleTime * y_dot
+        eta[2] += sampleTime * z_dot
+        eta[3] += sampleTime * phi_dot
+        eta[4] += sampleTime * theta_dot
+        eta[5] += sampleTime * psi_dot
+
+
+    def step(self,eta,nu,u_actual,sampleTime,substeps = 1,row = None):
+        """
+        delta_c = step(eta,nu,u_actual,sampleTime,substeps,row) runs the 
+        heading autopilot and integrates the ship substeps times, updating 
+        eta, nu and u_actual in place. If row is given, it is filled with 
+        [eta, nu, delta_c, u_actual] as they were before the last substep 
+        was integrated (the layout of one simData row). Returns the last 
+        rudder command (rad).
+        """
+        for k in range(substeps):
+            delta_c = self.rudderCommand(eta,nu,sampleTime)
+            if row is not None and k == substeps - 1:
+                row[0:6] = eta
+                row[6:12] = nu
+                row[12] = delta_c
+                row[13] = u_actual[0]
+            self.integrate(eta,nu,u_actual,delta_c,sampleTime)
+
+        return delta_c
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+frigateBatch.py:
+
+    Steps many frigates (see frigate.py) at once. The states of N ships are
+    stacked into arrays, so the Norrbin (1963) model, the rudder dynamics
+    and the heading autopilot of the whole group are advanced by a few
+    NumPy operations instead of N scalar Python calls:
+
+        eta      (N,6)   position/attitude
+        nu       (N,6)   velocity, nu = [ U 0 0 0 0 r ]'
+        u_actual (N,1)   actual rudder angle (rad)
+
+    The model parameters (K, T, n3, ...) and the autopilot states (e_int,
+    psi_d, r_d, a_d, ref) are arrays of length N, so ships built for
+    different speeds can share a batch. The constructor is:
+
+    frigateBatch(vehicles,eta)
+        Stacks frigate('headingAutopilot',U,psi_d) instances
+            vehicles: list of frigate objects
+            eta: (N,6) initial positions/attitudes, zero if omitted
+
+Methods:
+
+    delta_c = rudderCommand(sampleTime,index) runs the heading autopilot
+        of the ships in index (all ships if None), returning their rudder
+        commands (rad).
+
+    integrate(delta_c,sampleTime,index) advances eta, nu and u_actual of
+        the ships in index in place by one Euler step.
+
+    delta_c = step(sampleTime,substeps,index,rows) runs rudderCommand() and
+        integrate() substeps times. rows, if given, is filled with the
+        simData rows [eta, nu, delta_c, u_actual] of the last substep.
+
+    store() copies nu, u_actual and the autopilot states back to the
+        frigate objects.
+
+Author:     Thor I. Fossen (frigate model), batched for the BattleshipSimulator
+"""
+import numpy as np
+import math
+
+# Class Vehicle
+class frigateBatch:
+    """
+    frigateBatch(vehicles,eta)      Heading autopilots of N frigates
+
+    Inputs:
+        vehicles: list of frigate objects (their parameters and states are copied)
+        eta: (N,6) positions/attitudes
+    """
+
+    # Per-ship parameters and autopilot states copied from the frigate objects
+    parameters = ['K', 'T', 'n1', 'n3', 'deltaMax', 'DdeltaMax', 'wn', 'zeta', 'wn_d', 'zeta_d', 'r_max']
+    states = ['e_int', 'psi_d', 'r_d', 'a_d', 'ref']
+
+    def __init__(self, vehicles, eta = None):
+
+        self.vehicles = list(vehicles)
+        n = len(self.vehicles)
+
+        self.name = "Batch of %d frigates (see 'frigateBatch.py' for more details)" % n
+        self.eta = np.zeros((n,6),float) if eta is None else np.array(eta,float).reshape(n,6)
+        self.nu = np.array([vehicle.nu for vehicle in self.vehicles],float).reshape(n,6)
+        self.u_actual = np.array([vehicle.u_actual for vehicle in self.vehicles],float).reshape(n,1)
+
+        for name in self.parameters + self.states:
+            setattr(self, name, np.array([getattr(vehicle,name) for vehicle in self.vehicles],float))
+
+
+    def __len__(self):
+        return len(self.vehicles)
+
+
+    def rudderCommand(self,sampleTime,index = None):
+        """
+        delta_c = rudderCommand(sampleTime,index) is the PID pole placement
+        heading autopilot of frigate.rudderCommand() for the ships in index.
+
+        delta = (T/K) * a_d + (1/K) * rd
+               - Kp * ( ssa( psi-psi_d ) + Td * (r - r_d) + (1/Ti) * z )
+
+        """
+        i = slice(None) if index is None else index
+
+        psi_d = self.psi_d[i]
+        r_d = self.r_d[i]
+        a_d = self.a_d[i]
+        e_int = self.e_int[i]
+        e_psi = self.eta[i,5] - psi_d           # yaw angle tracking error
+        e_r   = self.nu[i,5] - r_d              # yaw rate tracking error
+        psi_ref = self.ref[i] * math.pi / 180   # yaw angle setpoint
+
+        wn = self.wn[i]
+        zeta = self.zeta[i]
+        wn_d = self.wn_d[i]
+        zeta_d = self.zeta_d[i]
+
+        m = self.T[i] / self.K[i]
+        d = self.n1[i] / self.K[i]
+        k = 0
+
+        # PID gains based on pole placement
+        Kp = m * wn ** 2 - k
+        Kd = m * 2 * zeta * wn - d
+        Ki = (wn / 10) * Kp
+
+        # PID control law
+        delta = -Kp * e_psi - Kd * e_r - Ki * e_int
+
+        # Integral error, Euler's method
+        self.e_int[i] = e_int + sampleTime * e_psi
+
+        # 3rd-order reference model for smooth position, velocity and acceleration
+        j_d = wn_d**3 * (psi_ref - psi_d) - (2*zeta_d+1) * wn_d**2 * r_d - (2*zeta_d+1) * wn_d * a_d
+        self.psi_d[i] = psi_d + sampleTime * r_d
+        self.r_d[i] = np.clip(r_d + sampleTime * a_d, -self.r_max[i], self.r_max[i])
+        self.a_d[i] = a_d + sampleTime * j_d
+
+        return delta
+
+
+    def integrate(self,delta_c,sampleTime,index = None):
+        """
+        integrate(delta_c,sampleTime,index) overwrites eta, nu and u_actual
+        of the ships in index with their values at [k+1], as
+        frigate.integrate() does for one ship.
+        """
+        i = slice(None) if index is None else index
+
+        delta = self.u_actual[i,0]
+        r     = self.nu[i,5]
+
+        # Rudder angle saturation and dynamics
+        deltaMax = self.deltaMax[i] * math.pi/180
+        delta = np.where( np.abs(delta) >= deltaMax, np.sign(delta) * deltaMax, delta )
+
+        DdeltaMax = self.DdeltaMax[i] * math.pi/180
+        delta_dot = delta_c - delta
+        delta_dot = np.where( np.abs(delta_dot) >= DdeltaMax, np.sign(delta_dot) * DdeltaMax, delta_dot )
+
+        # Dynamics and forward Euler integration [k+1] (only r has a derivative)
+        r_dot = (1 / self.T[i]) * ( self.K[i] * delta - self.n3[i] * r**3 - self.n1[i] * r )
+        self.nu[i,5] = r + sampleTime * r_dot
+        self.u_actual[i,0] = delta + sampleTime * delta_dot
+
+        # Attitude: eta[k+1] = eta + sampleTime * [ Rzyx * nu[0:3], Tzyx * nu[3:6] ]
+        eta = self.eta[i]
+        u, v, w, p, q, r = self.nu[i].T
+        cphi, cth, cpsi = np.cos(eta[:,3:6]).T
+        sphi, sth, spsi = np.sin(eta[:,3:6]).T
+
+        eta_dot = np.empty_like(eta)
+        eta_dot[:,0] = cpsi*cth * u + (-spsi*cphi+cpsi*sth*sphi) * v + (spsi*sphi+cpsi*cphi*sth) * w
+        eta_dot[:,1] = spsi*cth * u + (cpsi*cphi+sphi*sth*spsi) * v + (-cpsi*sphi+sth*spsi*cphi) * w
+        eta_dot[:,2] = -sth * u + cth*sphi * v + cth*cphi * w
+        eta_dot[:,3] = p + sphi*sth/cth * q + cphi*sth/cth * r
+        eta_dot[:,4] = cphi * q - sphi * r
+        eta_dot[:,5] = sphi/cth * q + cphi/cth * r
+
+        self.eta[i] = eta + sampleTime * eta_dot
+
+
+    def step(self,sampleTime,substeps = 1,index = None,rows = None):
+        """
+        delta_c = step(sampleTime,substeps,index,rows) runs the heading
+        autopilots and integrates the ships in index substeps times. If rows
+        is given, it is filled with [eta, nu, delta_c, u_actual] as they were
+        before the last substep was integrated. Returns the last rudder
+        commands (rad).
+        """
+        i = slice(None) if index is None else index
+
+        for k in range(substeps):
+            delta_c = self.rudderCommand(sampleTime,index)
+            if rows is not None and k == substeps - 1:
+                rows[:,0:6] = self.eta[i]
+                rows[:,6:12] = self.nu[i]
+                rows[:,12] = delta_c
+                rows[:,13] = self.u_actual[i,0]
+            self.integrate(delta_c,sampleTime,index)
+
+        return delta_c
+
+
+    def store(self):
+        """
+        store() copies nu, u_actual and the autopilot states of every ship
+        back to its frigate object.
+        """
+        for n, vehicle in enumerate(self.vehicles):
+            vehicle.nu = self.nu[n].copy()
+            vehicle.u_actual = self.u_actual[n].copy()
+            for name in self.states:
+                setattr(vehicle, name, float(getattr(self,name)[n]))
@@ -1,17 +1,43 @@
-from opcua import Client
 import paho.mqtt.client as mqtt
+import threading
 import time
 import json
 import random
-from icecream import ic
 
-ic.configureOutput(includeContext=True, contextAbsPath=True)
+# How often the server samples the subscribed nodes, and how often one combined telemetry message is published
+SUBSCRIPTION_PERIOD_MS = 100
+PUBLISH_PERIOD_S = 0.1
 
 def apply_power_fluctuation(power_value):
     fluctuation_factor = random.uniform(0.93, 1.08)  # ±7% fluctuation
     return power_value * fluctuation_factor
 
+class DataChangeHandler:
+    """
+    Keeps the latest value of every subscribed node, as reported by the server's data change notifications.
+    """
+
+    def __init__(self, key_mappings):
+        self.key_mappings = key_mappings
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def datachange_notification(self, node, val, data):
+        with self.lock:
+            self.values[self.key_mappings[node.nodeid.to_string()]] = val
+
+    def take(self):
+        """Return the values that changed since the last call."""
+        with self.lock:
+            values, self.values = self.values, {}
+        return values
+
 def main():
+    # Imported here so that the subscription handler can be used (and tested) without an OPC UA stack
+    from opcua import Client
+    from icecream import ic
+    ic.configureOutput(includeContext=True, contextAbsPath=True)
+
     client = Client("opc.tcp://opcua_server:4840")
     client.connect()
     print("OPC UA Client connected")
@@ -19,6 +45,7 @@ def main():
     mqtt_client = mqtt.Client()
     mqtt_client.username_pw_set("EfNBzauFCrlWTctinSyT", "")
     mqtt_client.connect("kr4k3n.thingsboard.io", 1883)
+    mqtt_client.loop_start()
     print("Connected to ThingsBoard")
 
     key_mappings = {
@@ -33,33 +60,29 @@ def main():
         "ns=2;i=10": "Power"
     }
 
-    
+    # The server pushes changed values instead of the client polling each node
+    handler = DataChangeHandler(key_mappings)
+    subscription = client.create_subscription(SUBSCRIPTION_PERIOD_MS, handler)
+    subscription.subscribe_data_change([client.get_node(node_id) for node_id in key_mappings])
 
     while True:
         try:
-            for node_id, key in key_mappings.items():
-                opcua_node = client.get_node(node_id)
-                value = opcua_node.get_value()
-                
+            data = handler.take()
+            if len(data) > 0:
                 # Apply multiplier to desired speed
-                if key == "World.PrimaryBattleship.Engine.desired_speed":
+                if "World.PrimaryBattleship.Engine.desired_speed" in data:
                     speed_multiplier = random.uniform(9.8, 10.4)
-                    value *= speed_multiplier
-
+                    data["World.PrimaryBattleship.Engine.desired_speed"] *= speed_multiplier
 
                 # Apply fluctuation to Power value
-                if key == "Power":
-                    value = apply_power_fluctuation(value)
-
-                print(f"{key}: {value}")
+                if "Power" in data:
+                    data["Power"] = apply_power_fluctuation(data["Power"])
 
-                data = {key: value}
-                data_out = json.dumps(data)
-                mqtt_client.publish("v1/devices/me/telemetry", data_out, 0)
+                print(data)
 
-                # Debug Statement
-                #ic(mqtt_client.publish("v1/devices/me/telemetry", data_out, 0))
-            time.sleep(0.001)
+                # One telemetry message carries every value that changed during the cycle
+                mqtt_client.publish("v1/devices/me/telemetry", json.dumps(data), 0)
+            time.sleep(PUBLISH_PERIOD_S)
         except Exception as e:
             print(e)
 
@@ -1,11 +1,43 @@
-from opcua import Server
 import zmq
 import json
-import time
+import os
 import random
-from icecream import ic
 
-ic.configureOutput(includeContext=True, contextAbsPath=True)
+# These must match the simulator's io settings (logger_topic_depth and logger_encoding)
+# LOGGER_TOPICS is a comma separated list of ZMQ prefixes, e.g. ".,World.PrimaryBattleship." with a topic depth of 2
+LOGGER_TOPICS = os.environ.get("LOGGER_TOPICS", "").split(",")
+LOGGER_ENCODING = os.environ.get("LOGGER_ENCODING", "json")
+
+# Longest wait for the first message of a batch, and the most queued messages merged into one batch of writes
+POLL_TIMEOUT_MS = 100
+MAX_BATCH = 1000
+
+DESIRED_SPEED_KEY = "World.PrimaryBattleship.Engine.desired_speed"
+
+def decode_message(payload):
+    if LOGGER_ENCODING == "msgpack":
+        import msgpack
+        return msgpack.unpackb(payload)
+    return json.loads(payload)
+
+class LogState:
+    """
+    Rebuilds the logged values from full rows, or from keyframes and deltas (see LogEncoder).
+    """
+
+    def __init__(self):
+        self.last_sequence = {}
+
+    def apply(self, topic, message):
+        """Return the values carried by a message, or an empty dict if a delta arrived after a missed message."""
+        if "Sequence" not in message:
+            return message
+        if not message["Keyframe"] and self.last_sequence.get(topic) != message["Previous"]:
+            # A delta was lost, so wait for the next keyframe on this topic
+            self.last_sequence.pop(topic, None)
+            return {}
+        self.last_sequence[topic] = message["Sequence"]
+        return message["Data"]
 
 def calculate_power(speed_m_per_s, rho=1025, cd=0.035, area_m2=1005):
     drag_force = 0.5 * cd * rho * area_m2 * speed_m_per_s ** 2
@@ -13,7 +45,56 @@ def calculate_power(speed_m_per_s, rho=1025, cd=0.035, area_m2=1005):
 
     return power
 
+def receive_batch(socket, state):
+    """
+    Wait for a message, then merge it with every message that is already queued.
+
+    Only the latest value of each key is kept, so a burst of ticks costs one round of writes.
+    """
+    latest = {}
+    if not socket.poll(POLL_TIMEOUT_MS):
+        return latest
+    for _ in range(MAX_BATCH):
+        try:
+            # Messages published with a topic arrive as [topic, payload]
+            frames = socket.recv_multipart(zmq.NOBLOCK)
+        except zmq.Again:
+            break
+        topic = frames[0].decode("utf-8") if len(frames) > 1 else None
+        message = frames[-1]
+        try:
+            latest.update(state.apply(topic, decode_message(message)))
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"Invalid message received: {message} Error: {str(e)}")
+    return latest
+
+def changed_values(latest, written, keys):
+    """Return the values of the keys that arrived in a batch and differ from the last ones written."""
+    return {key: latest[key] for key in keys if latest.get(key) is not None and written.get(key) != latest[key]}
+
+def desired_speed(latest, written):
+    """Return the desired speed of a batch, or the last one written if the batch did not carry it."""
+    speed = latest.get(DESIRED_SPEED_KEY)
+    return written.get(DESIRED_SPEED_KEY) if speed is None else speed
+
+def write_values(server, nodes, values):
+    """Write several variables with a single request to the server's address space."""
+    from opcua import ua
+    params = ua.WriteParameters()
+    for node, value in zip(nodes, values):
+        write_value = ua.WriteValue()
+        write_value.NodeId = node.nodeid
+        write_value.AttributeId = ua.AttributeIds.Value
+        write_value.Value = ua.DataValue(ua.Variant(value))
+        params.NodesToWrite.append(write_value)
+    return server.iserver.isession.write(params)
+
 def main():
+    # Imported here so that the batching above can be used (and tested) without an OPC UA stack
+    from opcua import Server
+    from icecream import ic
+    ic.configureOutput(includeContext=True, contextAbsPath=True)
+
     server = Server()
     server.set_endpoint("opc.tcp://0.0.0.0:4840")
     add_space = server.register_namespace("OPCUA_BATTLESHIP_DATA_SERVER")
@@ -47,32 +128,33 @@ def main():
     context = zmq.Context()
     socket = context.socket(zmq.SUB)
     socket.connect("tcp://battleship:5556")
-    socket.setsockopt_string(zmq.SUBSCRIBE, '')
+    for topic in LOGGER_TOPICS:
+        socket.setsockopt_string(zmq.SUBSCRIBE, topic)
 
-    
+    state = LogState()
+    written = {}
 
     while True:
-            
-        message = socket.recv_string()
-        try:
-            data = json.loads(message)
-            for key in keys_to_extract:
-                value = data.get(key)
-                if value is not None:
-                    opcua_variables[key].set_value(value)
-                    if key == "World.PrimaryBattleship.Engine.desired_speed":
-                        power_watts = calculate_power(value)
-
-                        # Fluctuate power by ±7% at each update
-                        fluctuation_factor = random.uniform(0.93, 1.08)
-                        fluctuated_power_watts = power_watts * fluctuation_factor
-                        power_megawatts = fluctuated_power_watts / 1e6
-                        power.set_value(power_megawatts)
-                        print(f"This is the current power: {power_megawatts}")
-
-        except json.JSONDecodeError as e:
-            print(f"Invalid JSON received: {message} Error: {str(e)}")
-        time.sleep(0.001)
+        latest = receive_batch(socket, state)
+        # Only the values that differ from the last ones written are sent to the address space
+        changed = changed_values(latest, written, keys_to_extract)
+        nodes = [opcua_variables[key] for key in changed]
+        values = list(changed.values())
+        speed = desired_speed(latest, written)
+        # Power gets a fresh reading on every batch, even when only the other values changed (as in delta mode)
+        if len(latest) > 0 and speed is not None:
+            power_watts = calculate_power(speed)
+
+            # Fluctuate power by ±7% at each update
+            fluctuation_factor = random.uniform(0.93, 1.08)
+            fluctuated_power_watts = power_watts * fluctuation_factor
+            power_megawatts = fluctuated_power_watts / 1e6
+            nodes.append(power)
+            values.append(power_megawatts)
+            print(f"This is the current power: {power_megawatts}")
+        if len(nodes) > 0:
+            write_values(server, nodes, values)
+            written.update(changed)
 
 if __name__ == "__main__":
     main()
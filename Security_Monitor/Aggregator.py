@@ -1,6 +1,8 @@
 import paho.mqtt.client as mqtt
 import json
-from multiprocessing import shared_memory
+import math
+import time
+from StatusBlock import StatusBlock
 
 # MQTT Configuration
 BROKER = "localhost"
@@ -17,6 +19,13 @@ MINE = 5                    # Some or all systems shut down
 POWER_ATTACK = 6            # power attack
 RUDDER_ATTACK = 7           # rudder attack
 
+# The attack code reported when a system's IDS detects an attack (other systems report NORMAL)
+SYSTEM_ATTACK_CODES = {
+    "Sonar": SONAR_JAMMING,
+    "Power": POWER_ATTACK,
+    "Rudder": RUDDER_ATTACK,
+}
+
 # System-wide status
 system_status = {
     "Sonar": "Normal",
@@ -24,6 +33,12 @@ system_status = {
     "Rudder": "Normal",
     "Weapons": "Normal",
 }
+# The confidence and arrival time (ns) of each system's latest prediction
+system_confidence = {system: math.nan for system in system_status}
+system_updated = {system: 0 for system in system_status}
+
+# The shared memory status block the simulator reads the verdicts from, opened once by run_aggregator
+status_block = None
 
 def on_message(client, userdata, msg):
     """
@@ -36,6 +51,10 @@ def on_message(client, userdata, msg):
         
         topic = msg.topic.split("/")[-1].capitalize()  # Get system name from topic (e.g., "Sonar")
         prediction = payload.get("Prediction", "Unknown")
+        confidence = float(payload.get("Confidence", math.nan))
+        received_ns = time.time_ns()
+        # The IDS may stamp its message with the time (in seconds) it produced it
+        source_ns = int(payload["Timestamp"] * 1e9) if "Timestamp" in payload else received_ns
 
         # Map Sonar-specific predictions to standard ones
         if topic == "Sonar":
@@ -47,27 +66,22 @@ def on_message(client, userdata, msg):
         # Update system status
         if topic in system_status:
             system_status[topic] = prediction
+            system_confidence[topic] = confidence
+            system_updated[topic] = received_ns
 
         # Determine overall system status
         overall_status = "Anomalous" if "Attack" in system_status.values() else "Normal"
 
-        try:
-            shared_mem_aggregator = shared_memory.SharedMemory("aggregator", False, 10)
-        except:
-            shared_mem_aggregator = shared_memory.SharedMemory("aggregator", True, 10)
-        shared_mem_aggregator_buff = shared_mem_aggregator.buf
-        shared_mem_aggregator_buff[0] = 1
-        if overall_status == "Normal":
-            shared_mem_aggregator_buff[0] = 1
-        elif topic == "Sonar":
-            shared_mem_aggregator_buff[0] = 3
-        elif topic == "Power":
-            shared_mem_aggregator_buff[0] = 6
-        elif topic == "Rudder":
-            shared_mem_aggregator_buff[0] = 7
-        print(f"BUFF {shared_mem_aggregator_buff[0]}")
- 
- 
+        # Publish the verdict to the simulator
+        attack_code = NORMAL if overall_status == "Normal" else SYSTEM_ATTACK_CODES.get(topic, NORMAL)
+        status_block.write(
+            attack_code,
+            "Normal" if overall_status == "Normal" else "Attack",
+            {system: (system_status[system], system_confidence[system], system_updated[system]) for system in system_status},
+            confidence,
+            source_ns
+        )
+        print(f"VERDICT {attack_code}")
 
         # Log updates
 
@@ -84,6 +98,9 @@ def on_message(client, userdata, msg):
 
 
 def run_aggregator():
+    global status_block
+    status_block = StatusBlock()
+
     client = mqtt.Client()
     client.on_message = on_message
     client.connect(BROKER, PORT, 60)
@@ -3,14 +3,7 @@ import pickle
 import json
 import paho.mqtt.client as mqtt
 import os
-import warnings
-
-# Suppress specific FutureWarnings
-warnings.filterwarnings(
-    "ignore",
-    category=FutureWarning,
-    message="Passing literal json to 'read_json' is deprecated"
-)
+from RollingFeatures import RollingFeatures
 
 
 # MQTT Configuration
@@ -33,21 +26,17 @@ def load_model(model_path):
         model = pickle.load(file)
     return model
 
-# Preprocessing: Extract features from incoming power data
-def extract_features(data):
-    features = []
-    # Calculate statistical features for the chunk
-    avg = data['Power'].mean()
-    std = data['Power'].std()
-    min_val = data['Power'].min()
-    max_val = data['Power'].max()
-    range_val = max_val - min_val
-
-    # Append features
-    features.append([avg, std, min_val, max_val, range_val])
-    
+# Number of samples in each feature window
+WINDOW_SIZE = 10
+FEATURE_COLUMNS = ['Mean', 'StdDev', 'Min', 'Max', 'Range']
+
+# Rolling statistics over the most recent power samples, kept across messages
+rolling = RollingFeatures(["Power"], WINDOW_SIZE)
+
+# Preprocessing: Extract features from the latest window of power data
+def extract_features(rolling):
     # Return as DataFrame
-    feature_df = pd.DataFrame(features, columns=['Mean', 'StdDev', 'Min', 'Max', 'Range'])
+    feature_df = pd.DataFrame([rolling.features()], columns=FEATURE_COLUMNS)
     
     return feature_df
 
@@ -68,20 +57,25 @@ def on_message(client, userdata, msg):
         chunk_id = payload.get("ChunkID", -1)
         chunk_data = payload.get("Data", "")
 
-        # Convert JSON string to DataFrame
-        data = pd.read_json(chunk_data)
-        print(f"DATAFRAME POWER: {data}")
+        # Convert JSON string to records
+        records = json.loads(chunk_data)
 
         # Debugging: Print the raw chunk data
-        print(f"Chunk {chunk_id} Raw Data:\n{data}")
+        print(f"Chunk {chunk_id} Raw Data:\n{records}")
 
         # Ensure the input data has the correct column
-        if "Power" not in data.columns:
+        if any("Power" not in record for record in records):
             print(f"Chunk {chunk_id}: Missing 'Power' column. Skipping.")
             return
 
+        # Update the rolling statistics one sample at a time
+        rolling.extend([record["Power"]] for record in records)
+        if not rolling.ready:
+            print(f"Chunk {chunk_id}: Waiting for {WINDOW_SIZE - rolling.count} more samples.")
+            return
+
         # Extract features
-        features = extract_features(data)
+        features = extract_features(rolling)
 
         # Debugging: Print the extracted features
         print(f"Extracted Features for Chunk {chunk_id}:\n{features}")
@@ -96,7 +90,7 @@ def on_message(client, userdata, msg):
         #print(f"Chunk {chunk_id} Prediction: {prediction_label}")
 
         # Log the results
-        log_results(chunk_id, data['Power'].tolist(), features, prediction_label)
+        log_results(chunk_id, rolling.window()[:, 0].tolist(), features, prediction_label)
 
         # Publish the result
         result = {"System": "Power", "ChunkID": chunk_id, "Prediction": prediction_label}
@@ -2,14 +2,7 @@ import pandas as pd
 import pickle
 import json
 import paho.mqtt.client as mqtt
-import warnings
-
-# Suppress specific FutureWarnings
-warnings.filterwarnings(
-    "ignore",
-    category=FutureWarning,
-    message="Passing literal json to 'read_json' is deprecated"
-)
+from RollingFeatures import RollingFeatures
 
 
 # MQTT Configuration
@@ -24,54 +17,28 @@ def load_model(model_path):
         model = pickle.load(file)
     return model
 
-# Preprocessing: Group data into chunks of 10 and extract features
-def extract_features(data):
-    features = []
-    for i in range(0, len(data)):
-        chunk = data.iloc[i:i+10]
-        if len(chunk) < 10:
-            break
-        # Compute statistical features
-        mean_heading = chunk['heading'].mean()
-        std_heading = chunk['heading'].std()
-        min_heading = chunk['heading'].min()
-        max_heading = chunk['heading'].max()
-        range_heading = max_heading - min_heading
-
-        mean_angle = chunk['rudder angle'].mean()
-        std_angle = chunk['rudder angle'].std()
-        min_angle = chunk['rudder angle'].min()
-        max_angle = chunk['rudder angle'].max()
-        range_angle = max_angle - min_angle
+# Number of samples in each feature window
+WINDOW_SIZE = 10
+REQUIRED_COLUMNS = ['heading', 'rudder angle', 'rudder power']
+FEATURE_COLUMNS = [
+    'mean_heading', 'std_heading', 'min_heading', 'max_heading', 'range_heading',
+    'mean_angle', 'std_angle', 'min_angle', 'max_angle', 'range_angle',
+    'mean_power', 'std_power', 'min_power', 'max_power', 'range_power'
+]
 
-        mean_power = chunk['rudder power'].mean()
-        std_power = chunk['rudder power'].std()
-        min_power = chunk['rudder power'].min()
-        max_power = chunk['rudder power'].max()
-        range_power = max_power - min_power
-
-        # Append features
-        features.append([
-            mean_heading, std_heading, min_heading, max_heading, range_heading,
-            mean_angle, std_angle, min_angle, max_angle, range_angle,
-            mean_power, std_power, min_power, max_power, range_power
-        ])
-    
-    # Return as DataFrame
-    feature_columns = [
-        'mean_heading', 'std_heading', 'min_heading', 'max_heading', 'range_heading',
-        'mean_angle', 'std_angle', 'min_angle', 'max_angle', 'range_angle',
-        'mean_power', 'std_power', 'min_power', 'max_power', 'range_power'
-    ]
-    return pd.DataFrame(features, columns=feature_columns)
-
-def evaluate_rudder_data(model, chunk):
+def evaluate_rudder_data(model, rolling, records):
     """
-    Evaluate a chunk of rudder data and return predictions.
+    Feed rudder samples through the rolling feature engine and return a prediction for each completed window.
     """
-    features = extract_features(chunk)
-    predictions = model.predict(features)
-    return predictions
+    features = []
+    for record in records:
+        rolling.append([record[col] for col in REQUIRED_COLUMNS])
+        # Windows do not overlap, matching the 10-row chunks the model was trained on
+        if rolling.ready and rolling.samples % WINDOW_SIZE == 0:
+            features.append(rolling.features())
+    if not features:
+        return []
+    return model.predict(pd.DataFrame(features, columns=FEATURE_COLUMNS))
 
 def publish_prediction(client, prediction):
     """
@@ -90,16 +57,16 @@ def on_message(client, userdata, msg):
     try:
         # Decode the incoming message
         payload = json.loads(msg.payload.decode())
-        chunk_data = pd.read_json(payload["Data"], orient="records")
+        records = json.loads(payload["Data"])
         
         # Ensure required columns exist
-        required_columns = ['heading', 'rudder angle', 'rudder power']
-        for col in required_columns:
-            if col not in chunk_data.columns:
-                raise ValueError(f"The input data must contain a '{col}' column.")
+        for record in records:
+            for col in REQUIRED_COLUMNS:
+                if col not in record:
+                    raise ValueError(f"The input data must contain a '{col}' column.")
 
         # Evaluate the data
-        predictions = evaluate_rudder_data(userdata["model"], chunk_data)
+        predictions = evaluate_rudder_data(userdata["model"], userdata["rolling"], records)
         
         # Publish predictions
         for prediction in predictions:
@@ -115,7 +82,7 @@ if __name__ == "__main__":
     rf_model = load_model(model_path)
 
     # Initialize MQTT client
-    client = mqtt.Client(client_id="Rudder_IDS", protocol=mqtt.MQTTv311, callback_api_version=mqtt.CallbackAPIVersion.VERSION1, userdata={"model": rf_model})
+    client = mqtt.Client(client_id="Rudder_IDS", protocol=mqtt.MQTTv311, callback_api_version=mqtt.CallbackAPIVersion.VERSION1, userdata={"model": rf_model, "rolling": RollingFeatures(REQUIRED_COLUMNS, WINDOW_SIZE)})
 
     client.on_message = on_message
     client.connect(BROKER, PORT, 60)
@@ -1,11 +1,13 @@
-import torch
-from torchvision import transforms
 from PIL import Image
 import io
 import base64
 import json
 import paho.mqtt.client as mqtt
 import warnings
+import threading
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
@@ -15,18 +17,38 @@ PORT = 1883
 SONAR_INPUT_TOPIC = "submarine/sonar_input"
 SONAR_OUTPUT_TOPIC = "submarine/sonar"
 
-# Define the transformations (same as during training)
-transform = transforms.Compose([
-    transforms.Resize((224, 224)),
-    transforms.ToTensor(),
-    transforms.Normalize(mean=[0.5, 0.5, 0.5], std=[0.5, 0.5, 0.5])
-])
-
-# Load the model
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-model = torch.load("resnet18_complete.pth", map_location=device)
-model.to(device)
-model.eval()  # Set to evaluation mode
+# Batching configuration
+BATCH_SIZE = 8              # Largest number of images classified in one forward pass
+BATCH_TIMEOUT_MS = 20       # Longest time the first image of a batch waits for more to arrive
+PREPROCESS_WORKERS = 4      # Threads that decode and transform images
+
+MODEL_PATH = "resnet18_complete.pth"
+
+# Set by load_model when the script starts, so that importing this module (e.g. to test the batching stage)
+# needs neither torch nor the model file
+torch = None
+transform = None
+device = None
+model = None
+
+def load_model(model_path):
+    """Import torch, define the image transformations and load the model onto the best available device."""
+    global torch, transform, device, model
+    import torch
+    from torchvision import transforms
+
+    # Define the transformations (same as during training)
+    transform = transforms.Compose([
+        transforms.Resize((224, 224)),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.5, 0.5, 0.5], std=[0.5, 0.5, 0.5])
+    ])
+
+    # Load the model
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model = torch.load(model_path, map_location=device)
+    model.to(device)
+    model.eval()  # Set to evaluation mode
 
 # Define class names
 class_names = ['Malicious', 'Non-Malicious']  # Replace with your actual class names
@@ -37,27 +59,81 @@ def add_gaussian_noise(image_tensor, mean=0.0, std=0.1):
     noisy_image = image_tensor + noise
     return torch.clamp(noisy_image, 0, 1)  # Ensure pixel values stay in range [0, 1]
 
-# Function to classify an image
-def classify_image(image_data, mean=0.0, std=0.1):
-    try:
-        # Decode the base64 image data
-        image = Image.open(io.BytesIO(base64.b64decode(image_data))).convert('RGB')
+# Function to decode and preprocess one image (runs on the preprocessing pool)
+def preprocess_image(image_data, mean=0.0, std=0.1):
+    # Decode the base64 image data
+    image = Image.open(io.BytesIO(base64.b64decode(image_data))).convert('RGB')
 
-        # Preprocess the image
-        input_tensor = transform(image).unsqueeze(0).to(device)
+    # Preprocess the image and add Gaussian noise
+    return add_gaussian_noise(transform(image), mean=mean, std=std)
 
-        # Add Gaussian noise
-        input_tensor = add_gaussian_noise(input_tensor, mean=mean, std=std)
+# Function to classify a batch of preprocessed images in one forward pass
+def classify_batch(input_tensors):
+    with torch.no_grad():
+        outputs = model(torch.stack(input_tensors).to(device))
+        _, predicted = torch.max(outputs, 1)
+        return [class_names[index] for index in predicted.tolist()]
 
-        # Perform classification
-        with torch.no_grad():
-            outputs = model(input_tensor)
-            _, predicted = torch.max(outputs, 1)
-            return class_names[predicted.item()]
+# Function to classify an image
+def classify_image(image_data, mean=0.0, std=0.1):
+    try:
+        return classify_batch([preprocess_image(image_data, mean=mean, std=std)])[0]
     except Exception as e:
         print(f"Error processing image: {e}")
         return None
 
+# Images waiting to be classified, as (image name, preprocessing future) in arrival order
+pending_images = queue.Queue()
+preprocess_pool = ThreadPoolExecutor(max_workers=PREPROCESS_WORKERS)
+
+def collect_batch():
+    """
+    Block until an image arrives, then gather up to BATCH_SIZE images or until BATCH_TIMEOUT_MS has passed.
+    """
+    batch = [pending_images.get()]
+    deadline = time.monotonic() + BATCH_TIMEOUT_MS / 1000
+    while len(batch) < BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(pending_images.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+def process_batch(client):
+    """
+    Classify the next batch of pending images and publish one result per image, in arrival order.
+    Images that could not be decoded are left out of the batch.
+    """
+    names, tensors = [], []
+    for image_name, future in collect_batch():
+        try:
+            tensors.append(future.result())
+            names.append(image_name)
+        except Exception as e:
+            print(f"Error processing image {image_name}: {e}")
+    if not tensors:
+        return
+    try:
+        predictions = classify_batch(tensors)
+    except Exception as e:
+        print(f"Error classifying batch: {e}")
+        return
+    # Publish the results
+    for image_name, prediction in zip(names, predictions):
+        result = json.dumps({"Image": image_name, "Prediction": prediction})
+        client.publish(SONAR_OUTPUT_TOPIC, result)
+        #print(f"Processed {image_name}: Classified as {prediction}")
+
+def run_batcher(client):
+    """
+    Classify the pending images in batches and publish one result per image.
+    """
+    while True:
+        process_batch(client)
+
 # Function to handle incoming MQTT messages
 def on_message(client, userdata, msg):
     try:
@@ -66,24 +142,23 @@ def on_message(client, userdata, msg):
         image_name = payload.get("ImageName", "Unknown")
         image_data = payload.get("ImageData", "")
 
-        # Classify the image
-        prediction = classify_image(image_data)
-
-        # Publish the result
-        if prediction:
-            result = json.dumps({"Image": image_name, "Prediction": prediction})
-            client.publish(SONAR_OUTPUT_TOPIC, result)
-            #print(f"Processed {image_name}: Classified as {prediction}")
+        # Preprocess the image off the MQTT thread; the batcher classifies it
+        pending_images.put((image_name, preprocess_pool.submit(preprocess_image, image_data)))
     except Exception as e:
         print(f"Error handling incoming message: {e}")
 
 if __name__ == "__main__":
+    load_model(MODEL_PATH)
+
     # Initialize MQTT client
     client = mqtt.Client(client_id="Sonar_IDS", protocol=mqtt.MQTTv311, callback_api_version=mqtt.CallbackAPIVersion.VERSION1)
 
     client.on_message = on_message
     client.connect(BROKER, PORT, 60)
 
+    # Start the batching inference stage
+    threading.Thread(target=run_batcher, args=(client,), daemon=True).start()
+
     # Subscribe to the sonar input topic
     client.subscribe(SONAR_INPUT_TOPIC)
 
@@ -0,0 +1,114 @@
+import numpy as np
+from collections import deque
+
+class RollingFeatures:
+    """
+    Incremental rolling statistics over the last `size` samples of one or more signals.
+
+    Samples are kept in a NumPy ring buffer. Each new sample updates the mean and variance of every
+    signal in O(1) with a sliding Welford update, and the min/max with monotonic deques, so features
+    are available after every sample without rebuilding a DataFrame.
+
+    The standard deviation uses the sample (ddof=1) definition, matching pandas. The sums are recomputed
+    from the buffer once per lap of the ring, which keeps the update O(1) amortised.
+    """
+
+    def __init__(self, columns, size=10):
+        """
+        Parameters:
+        -----------
+        columns : list
+            The name of each signal, in the order the values appear in a sample.
+        size : int
+            The number of samples in the window.
+        """
+        self.columns = list(columns)
+        self.size = size
+        self.buffer = np.zeros((size, len(self.columns)))
+        self.head = 0
+        self.count = 0
+        self.samples = 0
+        self.mean = np.zeros(len(self.columns))
+        self.m2 = np.zeros(len(self.columns))
+        # Each deque holds (sample number, value) pairs; the front is the min/max of the window
+        self.min_deques = [deque() for _ in self.columns]
+        self.max_deques = [deque() for _ in self.columns]
+
+    @property
+    def ready(self):
+        """True once the window holds `size` samples."""
+        return self.count == self.size
+
+    def append(self, sample):
+        """
+        Add a sample, evicting the oldest one when the window is full.
+
+        Parameters:
+        -----------
+        sample : list
+            One value per signal, in the same order as the columns.
+        """
+        values = np.asarray(sample, dtype = float)
+        if self.count == self.size:
+            # Replace the oldest value with the new one, keeping the count constant
+            oldest = self.buffer[self.head].copy()
+            new_mean = self.mean + (values - oldest) / self.size
+            self.m2 += (values - oldest) * (values - new_mean + oldest - self.mean)
+            self.mean = new_mean
+        else:
+            self.count += 1
+            delta = values - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (values - self.mean)
+        self.buffer[self.head] = values
+        self.head = (self.head + 1) % self.size
+        if self.head == 0:
+            # Resynchronise once per lap of the ring buffer, so rounding errors from the sliding update cannot accumulate
+            self.mean = self.buffer.mean(axis = 0)
+            self.m2 = ((self.buffer - self.mean) ** 2).sum(axis = 0)
+
+        expired = self.samples - self.size
+        for i, value in enumerate(values.tolist()):
+            min_deque = self.min_deques[i]
+            while min_deque and min_deque[-1][1] >= value:
+                min_deque.pop()
+            min_deque.append((self.samples, value))
+            if min_deque[0][0] <= expired:
+                min_deque.popleft()
+            max_deque = self.max_deques[i]
+            while max_deque and max_deque[-1][1] <= value:
+                max_deque.pop()
+            max_deque.append((self.samples, value))
+            if max_deque[0][0] <= expired:
+                max_deque.popleft()
+        self.samples += 1
+
+    def extend(self, samples):
+        """Add several samples in order."""
+        for sample in samples:
+            self.append(sample)
+
+    def window(self):
+        """Return the samples in the window, oldest first, as a (count, columns) array."""
+        if self.count < self.size:
+            return self.buffer[:self.count].copy()
+        return np.roll(self.buffer, -self.head, axis = 0)
+
+    def features(self):
+        """
+        Return the statistics of the window.
+
+        Returns:
+        --------
+        numpy.ndarray
+            For each signal in turn: mean, std, min, max and range.
+        """
+        minimum = np.array([min_deque[0][1] for min_deque in self.min_deques])
+        maximum = np.array([max_deque[0][1] for max_deque in self.max_deques])
+        # Rounding can leave a tiny (even negative) sum of squares when the window is constant
+        if self.count > 1:
+            std = np.sqrt(np.maximum(self.m2, 0) / (self.count - 1))
+            std[maximum == minimum] = 0
+        else:
+            std = np.full(len(self.columns), np.nan)
+        return np.column_stack([self.mean, std, minimum, maximum, maximum - minimum]).ravel()
@@ -0,0 +1,140 @@
+from multiprocessing import shared_memory
+from collections import namedtuple
+import struct
+import math
+import time
+
+# The shared memory segment that the Aggregator publishes its verdicts in
+SEGMENT_NAME = "aggregator_status"
+
+# The systems that have an IDS, in the order their records are stored
+SYSTEMS = ("Sonar", "Power", "Rudder", "Weapons")
+STATUS_CODES = {"Unknown": 0, "Normal": 1, "Attack": 2}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+MAGIC = b"AGST"
+VERSION = 1
+
+# Layout (little-endian, no padding):
+#   header  magic (4s), version (H), system count (H), sequence (Q)
+#   verdict attack code (i), overall status (i), confidence (d), updated at (q, ns), source time (q, ns)
+#   systems one record per system: status (i), confidence (d), updated at (q, ns)
+HEADER = struct.Struct("<4sHHQ")
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = 8
+VERDICT = struct.Struct("<iidqq")
+SYSTEM = struct.Struct("<idq")
+PAYLOAD = struct.Struct("<" + VERDICT.format[1:] + SYSTEM.format[1:] * len(SYSTEMS))
+SIZE = HEADER.size + PAYLOAD.size
+
+SystemStatus = namedtuple("SystemStatus", ["status", "confidence", "updated_ns"])
+StatusSnapshot = namedtuple("StatusSnapshot", ["sequence", "attack_code", "status", "confidence", "updated_ns", "source_ns", "systems"])
+
+class StatusBlock:
+    """
+    The Aggregator's latest verdict, kept in a fixed-layout shared memory record that other processes read without locks.
+
+    The record is guarded by a seqlock: the writer makes the sequence number odd, writes the record and makes it even
+    again, and a reader retries until it has copied the record between two reads of the same even sequence number.
+    Readers therefore never see half of one verdict and half of the next, and never block the writer.
+    There must only be one writer (the Aggregator).
+
+    The segment is opened once per process; it is created (zeroed, so it holds no verdict yet) if it does not exist.
+    """
+
+    # The most times a reader retries before it gives up on a snapshot
+    MAX_RETRIES = 1000
+
+    def __init__(self, name=SEGMENT_NAME):
+        """
+        Parameters:
+        -----------
+        name : str
+            The name of the shared memory segment.
+        """
+        try:
+            self.shared_mem = shared_memory.SharedMemory(name, False)
+        except FileNotFoundError:
+            try:
+                self.shared_mem = shared_memory.SharedMemory(name, True, SIZE)
+            except FileExistsError:
+                # Another process created the segment in between, so it is opened instead
+                self.shared_mem = shared_memory.SharedMemory(name, False)
+        self.buffer = self.shared_mem.buf
+        if self.shared_mem.size < SIZE:
+            self.close()
+            raise ValueError(f"The shared memory segment '{name}' holds {self.shared_mem.size} bytes; a status block needs {SIZE}")
+        magic, version, _, _ = HEADER.unpack_from(self.buffer, 0)
+        if magic == bytes(4):
+            # A new segment; the sequence number is already 0, so only the identifying fields are written
+            struct.pack_into("<4sHH", self.buffer, 0, MAGIC, VERSION, len(SYSTEMS))
+        elif magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"The shared memory segment '{name}' is not a version {VERSION} status block")
+
+    @property
+    def sequence(self):
+        """The number of verdicts written so far."""
+        return SEQUENCE.unpack_from(self.buffer, SEQUENCE_OFFSET)[0] // 2
+
+    def write(self, attack_code, status, systems, confidence=math.nan, source_ns=None):
+        """
+        Publish a verdict.
+
+        Parameters:
+        -----------
+        attack_code : int
+            The attack code that the simulator acts on (see BattleshipConstant).
+        status : str
+            The overall status: "Normal" or "Attack".
+        systems : dict
+            A SystemStatus (or a (status, confidence, updated_ns) tuple) for each of SYSTEMS; missing systems are "Unknown".
+        confidence : float
+            The confidence of the verdict, NaN if the IDS did not report one.
+        source_ns : int, optional
+            When the IDS produced the message the verdict is based on (time.time_ns()). Defaults to now.
+        """
+        updated_ns = time.time_ns()
+        values = [attack_code, STATUS_CODES.get(status, 0), confidence, updated_ns, updated_ns if source_ns is None else source_ns]
+        for system in SYSTEMS:
+            system_status, system_confidence, system_updated_ns = systems.get(system, ("Unknown", math.nan, 0))
+            values += [STATUS_CODES.get(system_status, 0), system_confidence, system_updated_ns]
+        sequence = SEQUENCE.unpack_from(self.buffer, SEQUENCE_OFFSET)[0]
+        # An odd sequence number tells readers that the record is being written
+        SEQUENCE.pack_into(self.buffer, SEQUENCE_OFFSET, sequence + 1)
+        PAYLOAD.pack_into(self.buffer, HEADER.size, *values)
+        SEQUENCE.pack_into(self.buffer, SEQUENCE_OFFSET, sequence + 2)
+
+    def read(self):
+        """
+        Take a consistent snapshot of the latest verdict.
+
+        Returns:
+        --------
+        StatusSnapshot or None
+            The verdict, with sequence 0 if none has been written yet. None if the writer kept the record
+            busy for MAX_RETRIES attempts.
+        """
+        for _ in range(self.MAX_RETRIES):
+            before = SEQUENCE.unpack_from(self.buffer, SEQUENCE_OFFSET)[0]
+            if before & 1:
+                continue
+            values = PAYLOAD.unpack_from(self.buffer, HEADER.size)
+            if SEQUENCE.unpack_from(self.buffer, SEQUENCE_OFFSET)[0] == before:
+                break
+        else:
+            return None
+        attack_code, status, confidence, updated_ns, source_ns = values[:5]
+        systems = {
+            system: SystemStatus(STATUS_NAMES.get(values[5 + 3 * n], "Unknown"), values[6 + 3 * n], values[7 + 3 * n])
+            for n, system in enumerate(SYSTEMS)
+        }
+        return StatusSnapshot(before // 2, attack_code, STATUS_NAMES.get(status, "Unknown"), confidence, updated_ns, source_ns, systems)
+
+    def close(self):
+        self.buffer = None
+        self.shared_mem.close()
+
+    def unlink(self):
+        """Remove the segment once every process has closed it."""
+        self.shared_mem.unlink()
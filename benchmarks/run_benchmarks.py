@@ -0,0 +1,384 @@
+""" Benchmarks for the simulator's hot paths
+
+Runs offline: every simulator is created with the "null" transport, so no MQTT broker, ZMQ subscriber or
+shared-memory verdicts are needed. Run it from the repository root:
+
+    python benchmarks/run_benchmarks.py --output benchmark.json
+
+The JSON file holds one entry per benchmark, so results from different versions can be compared with
+`--compare old.json`.
+"""
+import sys
+import os
+
+# Run from anywhere: the simulator package lives in the repository root, and the security monitor's
+# modules are standalone scripts rather than a package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Security_Monitor"))
+sys.path.insert(0, ROOT)
+
+import BattleshipSimulator.BattleshipController as BattleCtrl
+import BattleshipSimulator.Models.Environment as Environment
+import BattleshipSimulator.Models.SimulatorUtilities as SimulatorUtilities
+from BattleshipSimulator.python_vehicle_simulator.vehicles import frigate
+from shapely.geometry import LineString, Point, Polygon
+import numpy as np
+import contextlib
+import subprocess
+import statistics
+import argparse
+import platform
+import tempfile
+import datetime
+import random
+import time
+import json
+import copy
+import yaml
+import io
+from RollingFeatures import RollingFeatures
+
+# The scenarios refer to their entity configs by relative paths, so they are loaded from the repository root
+SCENARIOS = ["scenarios/scenario-gen-1.yaml", "scenarios/scenario-gen-2.yaml"]
+TIMEDELTA = .5
+
+def measure(function, min_time=.2, repeat=5):
+    """ Time a function, calling it enough times per round to take at least `min_time` seconds
+
+    Parameters
+    ----------
+    function : callable
+        The code to time; it is called without arguments
+    min_time : float
+        The shortest duration of one round (in seconds)
+    repeat : int
+        The number of rounds
+
+    Returns
+    -------
+    dict
+        The number of calls per round and the best and median time per call (in microseconds)
+    """
+    def timed(number):
+        start_time = time.perf_counter()
+        for _ in range(number):
+            function()
+        return time.perf_counter() - start_time
+
+    # Calibrate on a tenth of a round, then scale up to a full round
+    number = 1
+    while (elapsed := timed(number)) < min_time / 10:
+        number *= 10
+    number = max(1, int(number * min_time / elapsed))
+    rounds = [timed(number) / number for _ in range(repeat)]
+    return {"calls": number, "best_us": 1e6 * min(rounds), "median_us": 1e6 * statistics.median(rounds)}
+
+def create_simulator(scenario, results_dir):
+    """ Create and start a headless simulator with every network channel switched off
+
+    Parameters
+    ----------
+    scenario : str
+        The path to the scenario YAML file
+    results_dir : str
+        The directory that receives the results file
+
+    Returns
+    -------
+    BattleshipController
+        The controller of the running simulator
+    """
+    simulator = Environment.Simulator(scenario, results_dir = results_dir, transport = "null")
+    controller = BattleCtrl.BattleshipController(simulator)
+    simulator.start()
+    return controller
+
+def run_ticks(scenario, ticks, results_dir):
+    """ Time a scenario for a fixed number of ticks
+
+    Parameters
+    ----------
+    scenario : str
+        The path to the scenario YAML file
+    ticks : int
+        The most ticks to run; the scenario may finish sooner
+    results_dir : str
+        The directory that receives the results file
+
+    Returns
+    -------
+    dict
+        The ticks run, the wall time and the ticks per second
+    """
+    setup_start = time.perf_counter()
+    controller = create_simulator(scenario, results_dir)
+    setup_time = time.perf_counter() - setup_start
+    ran = 0
+    start_time = time.perf_counter()
+    # The simulator prints engagement messages; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        while controller.simulation.simulation_running and ran < ticks:
+            controller.update(TIMEDELTA)
+            ran += 1
+    wall_time = time.perf_counter() - start_time
+    return {"ticks": ran, "setup_s": setup_time, "wall_s": wall_time, "ticks_per_sec": ran / wall_time if wall_time > 0 else 0}
+
+def synthetic_scenario(base_scenario, directory, obstacles=0, ships=1, seed=0):
+    """ Write a copy of a scenario with extra random obstacles and ships
+
+    The obstacles are kept clear of the primary ship's route and the extra ships start on free water and
+    follow the same waypoints. The success and failure conditions can never be met, so every run lasts
+    the requested number of ticks.
+
+    Parameters
+    ----------
+    base_scenario : str
+        The scenario to copy
+    directory : str
+        The directory to write the new scenario to
+    obstacles : int
+        The number of square obstacles to add
+    ships : int
+        The total number of ships
+    seed : int
+        The seed of the random placement
+
+    Returns
+    -------
+    str
+        The path of the new scenario
+    """
+    generator = random.Random(seed)
+    config = SimulatorUtilities.load_yaml(base_scenario)
+    primary = config["entities"][0]
+    route = LineString([(primary["x"], primary["y"])] + [tuple(waypoint) for waypoint in primary["_Navigation"]["waypoints"]]).buffer(400)
+    (min_x, min_y), (max_x, max_y) = config["world"]["guardrails"]
+    terrain = [Polygon(obstacle) for obstacle in config["world"]["obstacles"]]
+
+    def free_point(clearance):
+        while True:
+            point = Point(generator.uniform(min_x + clearance, max_x - clearance), generator.uniform(min_y + clearance, max_y - clearance))
+            if not route.contains(point) and all(polygon.distance(point) > clearance for polygon in terrain):
+                return point
+
+    for _ in range(obstacles):
+        point, size = free_point(60), generator.uniform(20, 60)
+        config["world"]["obstacles"].append([[point.x - size, point.y - size], [point.x + size, point.y - size], [point.x + size, point.y + size], [point.x - size, point.y + size]])
+    for i in range(1, ships):
+        entity = copy.deepcopy(primary)
+        point = free_point(150)
+        entity.update({"_id": f"Ship{i}", "x": point.x, "y": point.y})
+        config["entities"].append(entity)
+    config["success_conditions"] = {"World:PrimarySubmarine:current_speed": -1}
+    config["failure_conditions"] = {"World:PrimarySubmarine:current_speed": -2}
+    path = os.path.join(directory, f"synthetic_{obstacles}_obstacles_{ships}_ships.yaml")
+    with open(path, "w") as file:
+        yaml.safe_dump(config, file)
+    return path
+
+def scenario_benchmarks(ticks, results_dir):
+    """ Ticks per second of the canned scenarios """
+    return {f"scenario/{os.path.basename(scenario)}": run_ticks(scenario, ticks, results_dir) for scenario in SCENARIOS}
+
+def scaling_benchmarks(ticks, obstacle_counts, ship_counts, results_dir):
+    """ Ticks per second as the number of obstacles, and then of ships, grows """
+    results = {}
+    for obstacles in obstacle_counts:
+        scenario = synthetic_scenario(SCENARIOS[0], results_dir, obstacles = obstacles)
+        results[f"scaling/obstacles={obstacles}"] = {"obstacles": obstacles, **run_ticks(scenario, ticks, results_dir)}
+    for ships in ship_counts:
+        scenario = synthetic_scenario(SCENARIOS[0], results_dir, ships = ships)
+        results[f"scaling/ships={ships}"] = {"ships": ships, **run_ticks(scenario, ticks, results_dir)}
+    return results
+
+def micro_benchmarks(results_dir, min_time=.2):
+    """ Time the functions that run many times per tick """
+    controller = create_simulator(SCENARIOS[0], results_dir)
+    simulator = controller.simulation
+    model = simulator.world.models["PrimarySubmarine"]
+    # Move the ship a few ticks in, so that the radar has something in range
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(20):
+            controller.update(TIMEDELTA)
+
+    ship = SimulatorUtilities.transform_coordinates(model.geometry, model.x, model.y, model.heading)
+    obstacle = simulator.world.obstacles[0]
+    polygon = Polygon(obstacle)
+    point = Point(model.x, model.y)
+    radar = model.get_child("RadarSonar")
+
+    vehicle = frigate('headingAutopilot', 8, 45)
+    states = {"eta": np.array([model.x, model.y, 0, 0, 0, 0], float), "nu": vehicle.nu.copy(), "u_actual": vehicle.u_actual.copy()}
+    row = np.empty(14)
+    def next_position():
+        _, states["eta"], states["nu"], states["u_actual"] = SimulatorUtilities.getNextPosition(8, 45, states["eta"], vehicle, TIMEDELTA, states["nu"], states["u_actual"], simulator.hardware, row = row)
+
+    rudder_features = RollingFeatures(["heading", "rudder angle", "rudder power"], 10)
+    power_features = RollingFeatures(["Power"], 10)
+    generator = np.random.default_rng(0)
+    rudder_samples = generator.normal(20000, 1000, size = (1024, 3))
+    power_samples = generator.normal(500, 50, size = (1024, 1))
+    counter = {"i": 0}
+    def rudder_window():
+        counter["i"] = (counter["i"] + 1) % 1024
+        rudder_features.append(rudder_samples[counter["i"]])
+        return rudder_features.features()
+    def power_window():
+        counter["i"] = (counter["i"] + 1) % 1024
+        power_features.append(power_samples[counter["i"]])
+        return power_features.features()
+
+    benchmarks = {
+        "micro/polygons_intersect": lambda: SimulatorUtilities.polygons_intersect(ship, obstacle),
+        "micro/polygons_intersect_cached": lambda: SimulatorUtilities.polygons_intersect(ship, obstacle, simulator.world.geometry_cache),
+        "micro/transform_coordinates": lambda: SimulatorUtilities.transform_coordinates(model.geometry, model.x, model.y, model.heading),
+        "micro/get_distance_at_angle": lambda: SimulatorUtilities.get_distance_at_angle(point, polygon, 30),
+        "micro/range_profile_360": lambda: SimulatorUtilities.range_profile(point, [Polygon(o) for o in simulator.world.obstacles], np.arange(360)),
+        "micro/getNextPosition": next_position,
+        "micro/RadarSonar.update": lambda: radar.update(TIMEDELTA),
+        "micro/ids_rudder_features": rudder_window,
+        "micro/ids_power_features": power_window,
+    }
+    try:
+        # The weapons IDS parses each row with pandas; it needs joblib, which is only installed with the IDS dependencies
+        import IDS_Weapons
+        weapons_row = json.dumps({"S.No.": 1, "Current Status": "Armed", "Recommended Weapon": "Light Torpedo", "Command Sent": "Fire", "Armed Weapon": "Light Torpedo", "Expected Next Status": "Unarmed", "Fired?": "Yes"})
+        benchmarks["micro/ids_weapons_preprocess_row"] = lambda: IDS_Weapons.preprocess_row(weapons_row)
+    except ImportError as err:
+        print(f"Skipping the weapons IDS benchmark: {err}")
+
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, function in benchmarks.items():
+            results[name] = measure(function, min_time)
+    return results
+
+def startup_benchmarks(min_time=.2):
+    """ Time importing the headless simulator in a fresh interpreter, which every CLI run and batch worker pays for """
+    command = [sys.executable, "-c", "import BattleshipSimulator.BattleshipController, BattleshipSimulator.Models.Environment"]
+    return {"startup/import_simulator": measure(lambda: subprocess.run(command, cwd = ROOT, check = True), min_time, 3)}
+
+def git_revision():
+    """ The current commit, or None outside a git checkout """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output = True, text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline):
+    """ Print the change of every benchmark against an earlier results file
+
+    Parameters
+    ----------
+    results : dict
+        The results of this run
+    baseline : dict
+        The results loaded from the earlier file
+    """
+    print(f"Compared with {baseline.get('revision')} ({baseline.get('timestamp')}):")
+    for name, result in results["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            continue
+        old = baseline["benchmarks"][name]
+        if "ticks_per_sec" in result and old.get("ticks_per_sec"):
+            print(f"  {name:<45} {result['ticks_per_sec'] / old['ticks_per_sec']:>6.2f}x ticks/sec")
+        elif "best_us" in result and result["best_us"] > 0:
+            print(f"  {name:<45} {old['best_us'] / result['best_us']:>6.2f}x faster")
+
+def parse_arguments(argv=None):
+    """ Parse the arguments provided with the start command
+
+    Parameters
+    ----------
+    argv : list, optional
+        The arguments to parse. Defaults to the command line.
+
+    Returns
+    -------
+    argparse.Namespace
+        The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the simulator's hot paths")
+    parser.add_argument('--output', type=str, default=None,
+                        help='JSON file to write the results to. Default prints them only.')
+    parser.add_argument('--compare', type=str, default=None,
+                        help='An earlier results file to compare against.')
+    parser.add_argument('--suites', type=str, default="scenarios,micro,scaling,startup",
+                        help='Comma separated suites to run: scenarios, micro, scaling and startup. Default runs all of them.')
+    parser.add_argument('--ticks', type=int, default=400,
+                        help='Ticks per scenario run. Default is 400.')
+    parser.add_argument('--obstacles', type=str, default="0,50,200,800",
+                        help='Comma separated obstacle counts for the scaling suite.')
+    parser.add_argument('--ships', type=str, default="1,4,16",
+                        help='Comma separated ship counts for the scaling suite.')
+    parser.add_argument('--quick', action='store_true',
+                        help='Short runs, for checking that the suite works rather than for measuring.')
+    return parser.parse_args(argv)
+
+def run(suites, ticks=400, obstacle_counts=(0, 50, 200, 800), ship_counts=(1, 4, 16), min_time=.2):
+    """ Run benchmark suites
+
+    Parameters
+    ----------
+    suites : list
+        The suites to run: "scenarios", "micro", "scaling" and/or "startup"
+    ticks : int
+        Ticks per scenario run
+    obstacle_counts : list
+        Obstacle counts for the scaling suite
+    ship_counts : list
+        Ship counts for the scaling suite
+    min_time : float
+        The shortest duration of one round of a micro-benchmark (in seconds)
+
+    Returns
+    -------
+    dict
+        The environment the benchmarks ran in and one entry per benchmark
+    """
+    results = {
+        "revision": git_revision(),
+        "timestamp": datetime.datetime.now().isoformat(timespec = "seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "cpus": os.cpu_count(),
+        "ticks": ticks,
+        "benchmarks": {}
+    }
+    with tempfile.TemporaryDirectory() as results_dir:
+        if "scenarios" in suites:
+            results["benchmarks"].update(scenario_benchmarks(ticks, results_dir))
+        if "micro" in suites:
+            results["benchmarks"].update(micro_benchmarks(results_dir, min_time))
+        if "scaling" in suites:
+            results["benchmarks"].update(scaling_benchmarks(ticks, obstacle_counts, ship_counts, results_dir))
+        if "startup" in suites:
+            results["benchmarks"].update(startup_benchmarks(min_time))
+    return results
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    # The scenarios are found relative to the repository, but the files named on the command line relative to where it was run
+    args.output, args.compare = [None if path is None else os.path.abspath(path) for path in (args.output, args.compare)]
+    os.chdir(ROOT)
+    counts = lambda value: [int(count) for count in value.split(",") if count]
+    if args.quick:
+        results = run(args.suites.split(","), 20, counts(args.obstacles)[:2], counts(args.ships)[:2], .01)
+    else:
+        results = run(args.suites.split(","), args.ticks, counts(args.obstacles), counts(args.ships))
+    for name, result in results["benchmarks"].items():
+        if "ticks_per_sec" in result:
+            print(f"{name:<45} {result['ticks_per_sec']:>10.1f} ticks/sec ({result['ticks']} ticks)")
+        else:
+            print(f"{name:<45} {result['best_us']:>10.2f} us/call")
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent = 2)
+        print(f"Results written to {args.output}")
+    if args.compare is not None:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 # Import modules from the Battleship package instead of individual classes
-import BattleshipSimulator.BattleshipController as BattleCtrl
-import BattleshipSimulator.Models.Environment as Environment
-import BattleshipSimulator.Views.BattleshipView as BattleGUI
-import arcade
+# The simulator, the GUI (arcade) and the CLI view are imported by the mode that uses them, so
+# headless and batch runs never load the GUI's dependencies
+import BattleshipSimulator.BatchRunner as BatchRunner
+import BattleshipSimulator.Models.Profiler as Profiler
 import argparse
 import os
 import glob
@@ -26,10 +26,45 @@ def parse_arguments():
     # Adding the 'scenario' argument with a default value
     parser.add_argument('--scenario', type=str, default="scenarios/scenario-gen-12.yaml",
                         help='Scenario to run. Default is "scenarios/scenario-gen-0.yaml".')
+    # Adding the 'workers' argument, used when the scenario is a directory
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes used to run a directory of scenarios. Default is the number of CPUs.')
+    # Adding the 'zmq-port' argument; in batch mode, each worker publishes on its own port starting from this one
+    parser.add_argument('--zmq-port', type=int, default=5556,
+                        help='Port of the ZMQ telemetry publisher. Default is 5556.')
+    # Adding the 'transport' argument, which overrides the io backends set in the scenario
+    parser.add_argument('--transport', type=str, default=None, choices=['null', 'queue', 'mqtt', 'zmq'],
+                        help='Backend used to publish telemetry and log rows. "null" runs without any network setup. Default is the scenario\'s io settings.')
+    # Adding the 'rate' argument, which sets how fast the simulation runs compared to real time
+    parser.add_argument('--rate', type=parse_rate, default=None,
+                        help='Simulated seconds per second: 1 is real time, N is N times real time and "max" is as fast as possible. In GUI mode, this steps the simulation on its own thread. Default is as fast as possible in CLI mode, and one step per frame in GUI mode.')
+    # Adding the 'profile' argument, which times each part of the tick
+    parser.add_argument('--profile', action='store_true',
+                        help='Time each part of the simulation tick. The timings are printed at the end of a CLI run or batch and shown in the GUI\'s status pane.')
     # Parse the arguments
     args = parser.parse_args()
     return args
 
+def parse_rate(value):
+    """ Parse the --rate argument
+
+    Parameters
+    ----------
+    value : str
+        A positive number, or "max"
+
+    Returns
+    -------
+    float or str
+        The rate, or "max"
+    """
+    if value == "max":
+        return value
+    rate = float(value)
+    if rate <= 0:
+        raise argparse.ArgumentTypeError("The rate must be positive or \"max\"")
+    return rate
+
 def get_yaml_files(directory):
     """ List the YAML files in a directory
 
@@ -60,31 +95,37 @@ def main():
     """
     args = parse_arguments()
     # If the scenario is a directory, run all the scenarios contained within it
-    # This mode forces the program to operate in CLI
+    # This mode forces the program to operate headless, spreading the scenarios across a pool of worker processes
     if os.path.isdir(args.scenario):
-        for scenario_cfg in get_yaml_files(args.scenario):
-            simulator = Environment.Simulator(scenario_cfg)
-            controller = BattleCtrl.BattleshipController(simulator)
-            simulator.start()
-            view = BattleGUI.BattleshipViewCLI(controller)
-            view.start()
+        BatchRunner.run_batch(sorted(get_yaml_files(args.scenario)), workers = args.workers, base_zmq_port = args.zmq_port, transport = args.transport, profile = args.profile)
     # Else, run a single scenario
     else:
-        simulator = Environment.Simulator(args.scenario)
+        import BattleshipSimulator.BattleshipController as BattleCtrl
+        import BattleshipSimulator.Models.Environment as Environment
+        if args.profile:
+            Profiler.enable()
+        simulator = Environment.Simulator(args.scenario, zmq_port = args.zmq_port, transport = args.transport)
         controller = BattleCtrl.BattleshipController(simulator)
         simulator.start()
         # If the mode is "gui", run the application with the GUI
         if args.mode == "gui":
+            import BattleshipSimulator.Views.BattleshipView as BattleGUI
+            import arcade
             # Create the controller and view, set up the window, and start the GUI loop
             window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, "Battleship Simulator", fullscreen = True)
-            view = BattleGUI.BattleshipViewGUI(controller, SCREEN_WIDTH, SCREEN_HEIGHT)
+            # With a rate, the simulation runs on its own thread and the view draws its latest state
+            scheduler = None if args.rate is None else controller.scheduler(rate = None if args.rate == "max" else args.rate)
+            view = BattleGUI.BattleshipViewGUI(controller, SCREEN_WIDTH, SCREEN_HEIGHT, scheduler)
             window.show_view(view)
             arcade.enable_timings()
             arcade.run()
+            # Closing the window does not hide the view, so its threads and channels are released here
+            view.close()
         # Else, run the application with the CLI
         else:
-            view = BattleGUI.BattleshipViewCLI(controller)
-            view.start()
+            from BattleshipSimulator.Views.BattleshipCLIView import BattleshipViewCLI
+            view = BattleshipViewCLI(controller)
+            view.start(rate = None if args.rate in [None, "max"] else args.rate)
 
 if __name__ == "__main__":
     main()
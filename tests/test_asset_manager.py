@@ -0,0 +1,35 @@
+from BattleshipSimulator.Views.AssetManager import AssetManager, LRUCache, RateLimitedSender
+import json
+import time
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    loads = []
+    load = lambda key: cache.get(key, lambda: loads.append(key) or key.upper())
+    assert [load("a"), load("b"), load("a"), load("c")] == ["A", "B", "A", "C"]
+    assert "b" not in cache and "a" in cache                         # "b" was used longest ago
+    load("a")
+    assert loads == ["a", "b", "c"]
+
+def test_assets_are_loaded_once(tmp_path):
+    for name in ["1.png", "2.jpg", "notes.txt"]:
+        (tmp_path / name).write_bytes(name.encode())
+    loaded = []
+    assets = AssetManager(texture_loader = lambda path: loaded.append(path) or path)
+    for _ in range(3):
+        assets.texture("skeleton.png")
+        payloads = assets.image_payloads(str(tmp_path))
+    assert loaded == ["skeleton.png"]
+    assert sorted(json.loads(payload)["ImageName"] for payload in payloads) == ["1.png", "2.jpg"]
+
+def test_sender_coalesces_and_rate_limits():
+    published = []
+    sender = RateLimitedSender(lambda topic, payload: published.append((topic, payload)), interval = .2)
+    sender.send("sonar", ["a"])
+    time.sleep(.05)
+    for frame in range(10):
+        sender.send("sonar", [f"b{frame}"])                            # Only the latest frame is kept
+    time.sleep(.05)
+    assert published == [("sonar", "a")]
+    sender.close()
+    assert published == [("sonar", "a"), ("sonar", "b9")]
@@ -0,0 +1,59 @@
+import BattleshipSimulator.BatchRunner as BatchRunner
+import BattleshipSimulator.Models.SimulatorUtilities as SimulatorUtilities
+import socket
+import yaml
+import csv
+import os
+
+def short_scenario(directory, name, io=None, configuration=None):
+    """Write a copy of the first canned scenario whose only waypoint is a short way ahead, so it succeeds in a few ticks."""
+    config = SimulatorUtilities.load_yaml("scenarios/scenario-gen-1.yaml")
+    entity = config["entities"][0]
+    entity["_Navigation"]["waypoints"] = [[entity["x"] + 30, entity["y"]]]
+    if configuration is not None:
+        entity["_configuration"] = configuration
+    if io is not None:
+        config["io"] = io
+    path = directory / f"{name}.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def test_batch_writes_one_summary_row_per_scenario(tmp_path):
+    scenarios = [short_scenario(tmp_path, f"short-{n}") for n in range(2)] + [short_scenario(tmp_path, "broken", configuration = "entity_configs/missing.yaml")]
+    summaries = BatchRunner.run_batch(scenarios, workers = 2, results_dir = str(tmp_path / "results"), transport = "null")
+    [batch_dir] = [str(path) for path in (tmp_path / "results").iterdir()]
+    with open(os.path.join(batch_dir, "summary.csv"), newline = "") as file:
+        reader = csv.DictReader(file)
+        assert reader.fieldnames == BatchRunner.SUMMARY_FIELDS
+        rows = list(reader)
+    assert [row["scenario"] for row in rows] == scenarios
+    assert [row["status"] for row in rows] == ["Success", "Success", "Error"]
+    assert rows[2]["error"].startswith("FileNotFoundError")
+    for row, summary in zip(rows[:2], summaries):
+        # Each worker writes into its own directory
+        assert os.path.dirname(summary["results_file"]) == os.path.join(batch_dir, f"worker-{row['worker']}")
+        assert summary["results_file"].endswith("_Success.csv") and os.path.exists(summary["results_file"])
+        assert int(row["ticks"]) > 0
+
+def test_failed_scenario_releases_the_worker_ports(tmp_path):
+    # The logger publishes on a ZMQ socket, which is bound before the scenario's entities are loaded
+    io = {"telemetry": "null", "logger": "zmq", "verdicts": "null"}
+    broken = short_scenario(tmp_path, "broken", io, configuration = "entity_configs/missing.yaml")
+    good = short_scenario(tmp_path, "good", io)
+    port = free_port()
+    assert BatchRunner.run_scenario(broken, str(tmp_path), port)["status"] == "Error"
+    summary = BatchRunner.run_scenario(good, str(tmp_path), port)
+    assert (summary["status"], summary["error"]) == ("Success", "")
+
+def test_profiled_batch_merges_every_workers_spans(tmp_path, capsys):
+    scenarios = [short_scenario(tmp_path, f"short-{n}") for n in range(2)]
+    summaries = BatchRunner.run_batch(scenarios, workers = 2, results_dir = str(tmp_path / "results"), transport = "null", profile = True)
+    assert all("profile" not in summary for summary in summaries)
+    # The table lists the spans of both workers, and one update per tick of either scenario
+    [row] = [line.split() for line in capsys.readouterr().out.splitlines() if line.startswith("Simulator.update ")]
+    assert int(row[1]) == sum(summary["ticks"] for summary in summaries)
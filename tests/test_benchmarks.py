@@ -0,0 +1,28 @@
+import BattleshipSimulator.Models.SimulatorUtilities as SimulatorUtilities
+import os
+import sys
+import json
+
+# The benchmarks are a script rather than a package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import run_benchmarks
+
+def test_synthetic_scenario(tmp_path):
+    path = run_benchmarks.synthetic_scenario("scenarios/scenario-gen-1.yaml", str(tmp_path), obstacles = 25, ships = 3)
+    base = SimulatorUtilities.load_yaml("scenarios/scenario-gen-1.yaml")
+    config = SimulatorUtilities.load_yaml(path)
+    assert len(config["world"]["obstacles"]) == len(base["world"]["obstacles"]) + 25
+    assert [entity["_id"] for entity in config["entities"]] == ["PrimarySubmarine", "Ship1", "Ship2"]
+    assert run_benchmarks.run_ticks(path, 5, str(tmp_path))["ticks"] == 5
+
+def test_benchmarks_write_json():
+    results = run_benchmarks.run(["micro"], min_time = .001)
+    assert {"micro/polygons_intersect", "micro/getNextPosition", "micro/RadarSonar.update", "micro/ids_rudder_features"} <= set(results["benchmarks"])
+    assert all(result["best_us"] > 0 for result in results["benchmarks"].values())
+    assert json.loads(json.dumps(results)) == results
+
+def test_output_and_compare_paths_are_relative_to_the_caller(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "previous.json").write_text(json.dumps({"benchmarks": {}}))
+    run_benchmarks.main(["--quick", "--suites", "micro", "--output", "benchmark.json", "--compare", "previous.json"])
+    assert "micro/polygons_intersect" in json.loads((tmp_path / "benchmark.json").read_text())["benchmarks"]
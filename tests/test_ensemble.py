@@ -0,0 +1,24 @@
+from BattleshipSimulator.python_vehicle_simulator.lib.mainLoop import simulate, simulateEnsemble
+from BattleshipSimulator.python_vehicle_simulator.vehicles import frigate, remus100
+import numpy as np
+
+def test_frigate_ensemble_matches_single_runs():
+    headings = np.linspace(-90, 90, 5)
+    wn = np.linspace(0.2, 0.6, 5)
+    eta = np.array([[10 * m, 0, 0, 0, 0, 0.2] for m in range(5)], float)
+    simTime, simData = simulateEnsemble(200, 0.1, [frigate('headingAutopilot', 8, h) for h in headings], eta, parameters = {'wn': wn})
+    assert simData.shape == (5, 201, 14) and simTime.shape == (201, 1)
+    for m in range(5):
+        vehicle = frigate('headingAutopilot', 8, headings[m])
+        vehicle.wn = wn[m]
+        assert np.allclose(simData[m], simulate(200, 0.1, vehicle, eta[m])[1])
+
+def test_remus100_ensemble_runs_in_processes():
+    currents = [0, 0.5, 1.0]
+    vehicles = lambda: [remus100('depthHeadingAutopilot', 30, 50, 1525, V_c, -30) for V_c in currents]
+    _, pooled = simulateEnsemble(100, 0.02, vehicles(), processes = 2)
+    _, serial = simulateEnsemble(100, 0.02, vehicles(), processes = 1)
+    assert pooled.shape == (3, 101, 18)
+    assert np.array_equal(pooled, serial)
+    assert np.array_equal(serial[1], simulate(100, 0.02, vehicles()[1])[1])
+    assert not np.allclose(serial[0], serial[2])                          # The current changes the trajectory
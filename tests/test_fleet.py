@@ -0,0 +1,49 @@
+import BattleshipSimulator.Models.Environment as Environment
+import BattleshipSimulator.Models.SimulatorUtilities as SimulatorUtilities
+import numpy as np
+import contextlib
+import yaml
+import copy
+import io
+
+def fleet_scenario(directory):
+    # Two more ships on the primary ship's route, far enough apart that none of them sees another
+    config = SimulatorUtilities.load_yaml("scenarios/scenario-gen-1.yaml")
+    for n, (x, y) in enumerate([(1000, 3500), (6000, 600)], start = 1):
+        entity = copy.deepcopy(config["entities"][0])
+        entity.update({"_id": f"Ship{n}", "x": x, "y": y})
+        config["entities"].append(entity)
+    path = directory / "fleet.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
+
+def run_fleet(scenario, results_dir, batch_dynamics):
+    """Run the fleet with Ship2 joining after 20 ticks and Ship1 leaving after 40, and return every ship's state history."""
+    simulator = Environment.Simulator(scenario, results_dir = results_dir, transport = "null")
+    world = simulator.world
+    world.batch_dynamics = batch_dynamics
+    simulator.start()
+    ships = dict(world.models)
+    def ticks(count):
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(count):
+                simulator.update(.5)
+    del world.models["Ship2"]
+    ticks(20)
+    world.models["Ship2"] = ships["Ship2"]
+    ticks(20)
+    del world.models["Ship1"]
+    ticks(20)
+    simulator.close_io()
+    if batch_dynamics:
+        # The batch was rebuilt for the ships that are left
+        assert world.fleet_models == list(world.models.values()) and len(world.fleet.eta) == 2
+    return {ship_id: np.array(ship.state_history.view()) for ship_id, ship in ships.items()}
+
+def test_batch_dynamics_matches_sequential_updates(tmp_path):
+    scenario = fleet_scenario(tmp_path)
+    sequential = run_fleet(scenario, str(tmp_path), False)
+    batched = run_fleet(scenario, str(tmp_path), True)
+    assert {ship_id: len(history) for ship_id, history in batched.items()} == {"PrimarySubmarine": 60, "Ship1": 40, "Ship2": 40}
+    for ship_id, history in sequential.items():
+        assert np.allclose(batched[ship_id], history)
@@ -0,0 +1,33 @@
+from BattleshipSimulator.python_vehicle_simulator.vehicles import frigate, frigateBatch
+import numpy as np
+
+def fleet(n):
+    speeds = np.linspace(5, 12, n)
+    headings = np.linspace(-170, 170, n)
+    return [frigate('headingAutopilot', U, psi_d) for U, psi_d in zip(speeds, headings)]
+
+def test_batch_matches_single_ships():
+    vehicles = fleet(7)
+    etas = np.array([[100 * n, -50 * n, 0, 0, 0, 0.1 * n] for n in range(7)], float)
+    batch = frigateBatch(fleet(7), etas)
+    states = [(eta.copy(), vehicle.nu.copy(), vehicle.u_actual.copy()) for eta, vehicle in zip(etas, vehicles)]
+    rows = np.empty((7, 14))
+    row = np.empty(14)
+    for _ in range(300):
+        batch.step(0.5, rows = rows)
+        for n, (vehicle, (eta, nu, u_actual)) in enumerate(zip(vehicles, states)):
+            vehicle.step(eta, nu, u_actual, 0.5, row = row)
+            assert np.allclose(rows[n], row)
+    assert np.allclose(batch.eta, [eta for eta, _, _ in states])
+    assert np.allclose(batch.e_int, [vehicle.e_int for vehicle in vehicles])
+
+def test_batch_steps_only_the_indexed_ships():
+    batch = frigateBatch(fleet(4))
+    batch.ref[:] = 45
+    eta, nu = batch.eta.copy(), batch.nu.copy()
+    index = np.array([1, 3])
+    batch.step(0.5, substeps = 4, index = index, rows = np.empty((2, 14)))
+    assert np.array_equal(batch.eta[[0, 2]], eta[[0, 2]]) and np.array_equal(batch.nu[[0, 2]], nu[[0, 2]])
+    assert not np.array_equal(batch.eta[index], eta[index])
+    batch.store()
+    assert batch.vehicles[1].e_int == batch.e_int[1] and batch.vehicles[0].e_int == 0
@@ -0,0 +1,38 @@
+from BattleshipSimulator.python_vehicle_simulator.lib.gnc import attitudeEuler
+from BattleshipSimulator.python_vehicle_simulator.vehicles import frigate
+import numpy as np
+
+def reference_run(steps, sampleTime):
+    # The allocating path: headingAutopilot, dynamics and attitudeEuler on every step
+    vehicle = frigate('headingAutopilot', 8, 60)
+    eta = np.array([0, 0, 0, 0, 0, 0.3], float)
+    nu, u_actual = vehicle.nu.copy(), vehicle.u_actual.copy()
+    rows = []
+    for _ in range(steps):
+        u_control = vehicle.headingAutopilot(eta, nu, sampleTime)
+        rows.append(np.concatenate([eta, nu, u_control, u_actual]))
+        nu, u_actual = vehicle.dynamics(eta, nu, u_actual, u_control, sampleTime)
+        eta = attitudeEuler(eta, nu, sampleTime)
+    return eta, nu, u_actual, rows
+
+def test_step_matches_dynamics():
+    eta_ref, nu_ref, u_ref, rows_ref = reference_run(600, 0.1)
+    vehicle = frigate('headingAutopilot', 8, 60)
+    eta = np.array([0, 0, 0, 0, 0, 0.3], float)
+    nu, u_actual = vehicle.nu.copy(), vehicle.u_actual.copy()
+    row = np.empty(14)
+    for k in range(600):
+        vehicle.step(eta, nu, u_actual, 0.1, row = row)
+        assert np.allclose(row, rows_ref[k])
+    assert np.allclose(eta, eta_ref) and np.allclose(nu, nu_ref) and np.allclose(u_actual, u_ref)
+
+def test_substeps_match_single_steps():
+    eta_ref, nu_ref, u_ref, rows_ref = reference_run(600, 0.1)
+    vehicle = frigate('headingAutopilot', 8, 60)
+    eta = np.array([0, 0, 0, 0, 0, 0.3], float)
+    nu, u_actual = vehicle.nu.copy(), vehicle.u_actual.copy()
+    row = np.empty(14)
+    for k in range(60):
+        vehicle.step(eta, nu, u_actual, 0.1, substeps = 10, row = row)
+        assert np.allclose(row, rows_ref[10 * k + 9])                   # The row holds the last substep's inputs
+    assert np.allclose(eta, eta_ref) and np.allclose(nu, nu_ref) and np.allclose(u_actual, u_ref)
@@ -0,0 +1,30 @@
+from BattleshipSimulator.Models.GetterSetter import GetterSetter
+import pytest
+
+def build_tree():
+    root, world, ship = GetterSetter(), GetterSetter(), GetterSetter()
+    root.add_child("World", world)
+    world.add_child("Ship", ship)
+    ship.speed = 3
+    world.obstacles = []
+    return root, world, ship
+
+def test_paths_resolve_down_and_up_the_tree():
+    root, world, ship = build_tree()
+    assert root.get_attribute("World:Ship:speed") == 3
+    assert ship.get_attribute("World:obstacles") == []          # Bounces up to the root
+    ship.set_attribute("World:Ship:speed", 5)
+    assert root.get_attributes(["World:Ship:speed", "World:obstacles"]) == [5, []]
+    with pytest.raises(KeyError):
+        root.get_attribute("World:Sheep:speed")
+
+def test_compiled_paths_follow_tree_changes():
+    root, world, ship = build_tree()
+    with pytest.raises(KeyError):
+        ship.get_attribute("Radar:range")
+    radar = GetterSetter()
+    radar.range = 100
+    root.add_child("Radar", radar)
+    assert ship.get_attribute("Radar:range") == 100
+    radar.range = 200
+    assert ship.get_attribute("Radar:range") == 200             # The accessor reads the live value
@@ -0,0 +1,10 @@
+import BattleshipSimulator.Models.Environment as Environment
+import BattleshipSimulator.Models.Transport as Transport
+import pytest
+
+def test_feature_order_matches_the_trained_ics_monitor():
+    # Loading the model needs scikit-learn, which headless runs never import
+    pytest.importorskip("sklearn")
+    hardware = Environment.Hardware(verdicts = Transport.NullVerdictSource())
+    # The model checks its feature names against the feature order when it is loaded
+    assert list(hardware.model.feature_names_in_) == Environment.Hardware.FEATURE_ORDER
@@ -0,0 +1,74 @@
+from concurrent.futures import Future
+import pytest
+import base64
+import json
+import time
+import sys
+import os
+
+# The security monitor runs as standalone scripts, so its modules are not part of a package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Security_Monitor"))
+import IDS_Sonar
+
+class FakeClient:
+    """Records what would be published to the MQTT broker."""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, topic, payload):
+        self.published.append((topic, json.loads(payload)))
+
+class FakeMessage:
+
+    def __init__(self, image_name, image_data):
+        self.payload = json.dumps({"ImageName": image_name, "ImageData": image_data}).encode()
+
+def done(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Classify each "image" (a number) as its parity, recording the batches the model was given."""
+    batches = []
+    def classify_batch(tensors):
+        batches.append(list(tensors))
+        return ["Malicious" if tensor % 2 else "Non-Malicious" for tensor in tensors]
+    monkeypatch.setattr(IDS_Sonar, "classify_batch", classify_batch)
+    yield batches
+    while not IDS_Sonar.pending_images.empty():
+        IDS_Sonar.pending_images.get()
+
+def test_batch_stops_at_batch_size(batches):
+    for n in range(IDS_Sonar.BATCH_SIZE + 2):
+        IDS_Sonar.pending_images.put((f"{n}.png", done(n)))
+    assert [name for name, _ in IDS_Sonar.collect_batch()] == [f"{n}.png" for n in range(IDS_Sonar.BATCH_SIZE)]
+    assert IDS_Sonar.pending_images.qsize() == 2
+
+def test_timeout_flushes_a_partial_batch(batches):
+    for n in range(3):
+        IDS_Sonar.pending_images.put((f"{n}.png", done(n)))
+    start_time = time.monotonic()
+    assert len(IDS_Sonar.collect_batch()) == 3
+    # The batch did not wait much longer than the timeout for images that never came
+    assert time.monotonic() - start_time < IDS_Sonar.BATCH_TIMEOUT_MS / 1000 + .5
+
+def test_results_are_published_one_per_image_in_arrival_order(batches):
+    client = FakeClient()
+    for n in range(5):
+        IDS_Sonar.pending_images.put((f"{n}.png", done(n)))
+    IDS_Sonar.process_batch(client)
+    assert batches == [[0, 1, 2, 3, 4]]
+    assert client.published == [(IDS_Sonar.SONAR_OUTPUT_TOPIC, {"Image": f"{n}.png", "Prediction": "Malicious" if n % 2 else "Non-Malicious"}) for n in range(5)]
+
+def test_failed_decode_drops_only_that_image(batches, monkeypatch):
+    # Decode the image data (a number in base64) on the preprocessing pool, failing on invalid data
+    monkeypatch.setattr(IDS_Sonar, "preprocess_image", lambda image_data: int(base64.b64decode(image_data, validate = True)))
+    client = FakeClient()
+    for name, image_data in [("0.png", base64.b64encode(b"0").decode()), ("broken.png", "not base64!"), ("3.png", base64.b64encode(b"3").decode())]:
+        IDS_Sonar.on_message(client, None, FakeMessage(name, image_data))
+    IDS_Sonar.process_batch(client)
+    assert batches == [[0, 3]]
+    assert [result["Image"] for _, result in client.published] == ["0.png", "3.png"]
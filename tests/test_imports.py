@@ -0,0 +1,27 @@
+import subprocess
+import json
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules that only the GUI, the IDS scripts, plotting or remote navigators need
+HEAVY_MODULES = ["arcade", "playsound", "torch", "pandas", "matplotlib", "sklearn", "requests"]
+
+HEADLESS_RUN = """
+import json, sys, io, contextlib
+import BattleshipSimulator.BattleshipController as BattleCtrl
+import BattleshipSimulator.Models.Environment as Environment
+from BattleshipSimulator.Views.BattleshipCLIView import BattleshipViewCLI
+simulator = Environment.Simulator("scenarios/scenario-gen-1.yaml", results_dir = sys.argv[1], transport = "null")
+controller = BattleCtrl.BattleshipController(simulator)
+simulator.start()
+with contextlib.redirect_stdout(io.StringIO()):
+    for _ in range(5):
+        controller.update(.5)
+print(json.dumps({"modules": sorted({name.split(".")[0] for name in sys.modules})}))
+"""
+
+def test_headless_run_skips_heavy_modules(tmp_path):
+    result = subprocess.run([sys.executable, "-c", HEADLESS_RUN, str(tmp_path)], cwd = ROOT, capture_output = True, text = True, check = True)
+    report = json.loads(result.stdout.splitlines()[-1])
+    assert [name for name in HEAVY_MODULES if name in report["modules"]] == []
@@ -0,0 +1,115 @@
+from BattleshipSimulator.Models.Logger import ColumnarLog, CSVLogger, LoggingSchema, LogEncoder
+import BattleshipSimulator.Models.Transport as Transport
+from BattleshipSimulator.Models.GetterSetter import GetterSetter
+import BattleshipSimulator.Models.Environment as Environment
+import numpy as np
+import json
+import os
+
+def logged_rows():
+    return [{"x": i * .5, "ticks": i, "warning": i % 2 == 0, "objects": [(i, 2)], "override": None if i % 3 else 90} for i in range(10)]
+
+def test_columnar_log_round_trip(tmp_path):
+    log = ColumnarLog(str(tmp_path / "run.columns"), chunk_size = 4)
+    for row in logged_rows():
+        log.append(row)
+    # Tuples come back as lists, since objects are stored as JSON
+    expected = [{**row, "objects": [list(row["objects"][0])]} for row in logged_rows()]
+    assert len(log) == 10
+    assert [log.get(i) for i in range(10)] == expected                   # Two written chunks and two buffered rows
+    log.close()
+    log.rename(str(tmp_path / "renamed.columns"))
+    assert [log.get(i) for i in range(9, -1, -1)] == expected[::-1]      # Still readable after closing and renaming
+    reopened = ColumnarLog(str(tmp_path / "renamed.columns"), mode = "r")
+    assert reopened.get(5) == expected[5]
+    assert np.array_equal(reopened.column("ticks"), np.arange(10))
+    assert reopened.column("override") == [row["override"] for row in expected]
+
+def test_columnar_log_appends_one_index_line_per_chunk(tmp_path):
+    log = ColumnarLog(str(tmp_path / "run.columns"), chunk_size = 4)
+    index_sizes = []
+    for row in logged_rows():
+        log.append(row)
+        index_sizes.append(os.path.getsize(log.index_filename))
+    # Earlier chunks are never rewritten, so the index only grows when a chunk is written
+    assert [b - a for a, b in zip(index_sizes, index_sizes[1:])].count(0) == 7
+    with open(log.index_filename) as file:
+        assert [json.loads(line)["start"] for line in file] == [0, 4]
+    # The chunks written so far can be read by another process while the log is still being written
+    assert ColumnarLog(log.filename, mode = "r").get(7) == log.get(7)
+    log.close()
+    assert len(ColumnarLog(log.filename, mode = "r")) == 10
+
+def test_columnar_log_freezes_values(tmp_path):
+    log = ColumnarLog(str(tmp_path / "run.columns"))
+    waypoints = [[1, 2]]
+    log.append({"waypoints": waypoints})
+    waypoints.append([3, 4])
+    assert log.get(0) == {"waypoints": [[1, 2]]}
+
+class Owner:
+    def __init__(self):
+        self.x = 1.5
+        self.geometry = [(0, 0), (1, 1)]
+        self.status = "Unknown"
+
+def test_logging_schema_tracks_changes(tmp_path):
+    owner = Owner()
+    schema = LoggingSchema([("x", owner, "x"), ("Ship.geometry", owner, "geometry"), ("x", owner, "status")])
+    assert schema.keys == ["x", "Ship.geometry"]                         # A repeated column keeps its first position
+    logger = CSVLogger(str(tmp_path / "run.csv"), publisher = Transport.QueueTransport(), repeat_unchanged = False)
+    for x in [1.5, 2.5]:
+        owner.x = x
+        logger.log(schema.collect(), schema)
+    assert schema.changed == [True, False]
+    owner.geometry.append((2, 2))                                        # Changed in place
+    logger.log(schema.collect(), schema)
+    assert schema.changed == [True, True]
+    logger.close()
+    with open(tmp_path / "run.csv") as file:
+        assert file.read().splitlines()[1:] == ['1.5,"[(0, 0), (1, 1)]"', "2.5,", '2.5,"[(0, 0), (1, 1), (2, 2)]"']
+    assert [logger.get(i)["Ship.geometry"] for i in range(3)] == [[[0, 0], [1, 1]]] * 2 + [[[0, 0], [1, 1], [2, 2]]]
+    published = logger.publisher.drain()
+    assert [json.loads(payload) for _, payload in published][1] == {"x": 2.5, "Ship.geometry": [[0, 0], [1, 1]]}
+
+def test_log_encoder_sends_keyframes_and_deltas():
+    owner = Owner()
+    schema = LoggingSchema([("status", owner, "status"), ("Ship.x", owner, "x"), ("Ship.Radar.geometry", owner, "geometry")])
+    encoder = LogEncoder("delta", keyframe_interval = 3, topic_depth = 1)
+    frames = []
+    for x in [1.5, 1.5, 2.5, 2.5]:
+        owner.x = x
+        schema.collect()
+        frames.append([(topic, json.loads(payload)) for topic, payload in encoder.encode(schema)])
+    # A keyframe splits every field by topic
+    assert [topic for topic, _ in frames[0]] == [".", "Ship."]
+    assert frames[0][1][1] == {"Sequence": 0, "Previous": -1, "Keyframe": True, "Data": {"Ship.x": 1.5, "Ship.Radar.geometry": [[0, 0], [1, 1]]}}
+    assert frames[1] == []                                               # Nothing changed
+    assert frames[2] == [("Ship.", {"Sequence": 2, "Previous": 0, "Keyframe": False, "Data": {"Ship.x": 2.5}})]
+    assert [message["Keyframe"] for _, message in frames[3]] == [True, True]
+
+def test_csv_repeats_unchanged_values_by_default(tmp_path):
+    owner = Owner()
+    schema = LoggingSchema([("x", owner, "x"), ("Ship.geometry", owner, "geometry")])
+    logger = CSVLogger(str(tmp_path / "run.csv"), publisher = Transport.QueueTransport())
+    for x in [1.5, 2.5]:
+        owner.x = x
+        logger.log(schema.collect(), schema)
+    logger.close()
+    with open(tmp_path / "run.csv") as file:
+        assert file.read().splitlines()[1:] == ['1.5,"[(0, 0), (1, 1)]"', '2.5,"[(0, 0), (1, 1)]"']
+
+def test_schema_is_only_rebuilt_when_its_own_tree_changes(tmp_path):
+    simulator = Environment.Simulator("scenarios/scenario-gen-1.yaml", results_dir = str(tmp_path), transport = "null")
+    simulator.logging_record()
+    schema = simulator.logging_schema
+    # Objects created or attached outside the simulator's tree leave its schema alone
+    other = GetterSetter()
+    other.add_child("Child", GetterSetter())
+    simulator.logging_record()
+    assert simulator.logging_schema is schema
+    simulator.world.add_child("Extra", GetterSetter())
+    simulator.logging_record()
+    assert simulator.logging_schema is not schema
+    simulator.close_io()
+    simulator.logger.close()
@@ -0,0 +1,46 @@
+import BattleshipSimulator.Models.Environment as Environment
+import BattleshipSimulator.Models.OutputManager as OutputManager
+import csv
+import os
+
+def read_rows(path):
+    with open(path, newline = "") as file:
+        return list(csv.reader(file))
+
+def test_rows_are_buffered_until_flushed(tmp_path):
+    outputs = OutputManager.OutputManager(str(tmp_path / "run"), flush_rows = 3, flush_interval = 60)
+    outputs.set_header("output_rudder.csv", ["heading", "rudder angle", "rudder power"])
+    outputs.writerow("output_rudder.csv", [1, .5, 20000])
+    outputs.writerow("output_rudder.csv", [2, .25, 21000])
+    path = outputs.path("output_rudder.csv")
+    assert os.path.getsize(path) == 0
+    # The third row reaches the flush threshold
+    outputs.writerow("output_rudder.csv", [3, 0, 19000])
+    assert read_rows(path) == [["heading", "rudder angle", "rudder power"], ["1", "0.5", "20000"], ["2", "0.25", "21000"], ["3", "0", "19000"]]
+    outputs.writerow("output_rudder.csv", [4, 0, 19000])
+    outputs.close()
+    assert len(read_rows(path)) == 5
+
+def test_header_is_not_repeated_when_a_file_is_reopened(tmp_path):
+    outputs = OutputManager.OutputManager(str(tmp_path))
+    outputs.set_header("output_power.csv", ["Power"])
+    outputs.writerow("output_power.csv", [1])
+    outputs.close()
+    outputs.writerow("output_power.csv", [2])
+    outputs.close()
+    assert read_rows(outputs.path("output_power.csv")) == [["Power"], ["1"], ["2"]]
+
+def test_simulator_writes_side_outputs_to_its_run_directory(tmp_path):
+    simulator = Environment.Simulator("scenarios/scenario-gen-1.yaml", results_dir = str(tmp_path), transport = "null")
+    simulator.start()
+    for _ in range(20):
+        simulator.update(.5)
+    simulator.close_io()
+    directory = simulator.outputs.directory
+    assert os.path.dirname(directory) == str(tmp_path)
+    assert len(read_rows(os.path.join(directory, "output_power.csv"))) == 20
+    assert len(read_rows(os.path.join(directory, "output_rudder.csv"))) > 0
+    # The null transport reports no attack, so every hardware reading goes to the normal file, after its header
+    hardware_rows = read_rows(os.path.join(directory, "output_normal.csv"))
+    assert hardware_rows[0] == Environment.Hardware.FEATURE_ORDER
+    assert len(hardware_rows) == 21
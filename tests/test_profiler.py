@@ -0,0 +1,72 @@
+import BattleshipSimulator.BattleshipController as BattleCtrl
+import BattleshipSimulator.Models.Environment as Environment
+import BattleshipSimulator.Models.Profiler as Profiler
+from BattleshipSimulator.Models.Profiler import SpanStats
+import threading
+import sys
+import pytest
+
+def test_span_stats_histogram():
+    stats = SpanStats()
+    for duration in [1e-5] * 90 + [1e-3] * 9 + [0.1]:
+        stats.record(duration)
+    assert stats.count == 100 and stats.max == 0.1
+    assert stats.total == pytest.approx(90e-5 + 9e-3 + 0.1)
+    # Percentiles are the upper bound of a bucket, a quarter of a doubling wide
+    assert 1e-5 <= stats.percentile(50) < 1.2e-5
+    assert 1e-3 <= stats.percentile(95) < 1.2e-3
+    assert stats.percentile(100) == 0.1
+
+def test_merged_span_stats_match_recording_everything_in_one():
+    durations = [1e-5] * 50 + [1e-3] * 40 + [0.1] * 10
+    merged, first, second, everything = SpanStats(), SpanStats(), SpanStats(), SpanStats()
+    for n, duration in enumerate(durations):
+        (first if n % 3 else second).record(duration)
+        everything.record(duration)
+    merged.merge(first)
+    merged.merge(second)
+    assert (merged.count, merged.max, merged.buckets) == (everything.count, everything.max, everything.buckets)
+    assert merged.total == pytest.approx(everything.total)
+    assert merged.percentile(95) == everything.percentile(95)
+
+def test_profiler_times_each_part_of_the_tick(tmp_path):
+    assert Profiler.span("World.update") is Profiler.span("Logger.log")      # Nothing is recorded while profiling is off
+    profiler = Profiler.enable()
+    try:
+        simulator = Environment.Simulator("scenarios/scenario-gen-1.yaml", results_dir = str(tmp_path), transport = "null")
+        controller = BattleCtrl.BattleshipController(simulator)
+        simulator.start()
+        for _ in range(10):
+            controller.update(.5)
+        summary = profiler.summary()
+    finally:
+        Profiler.disable()
+    assert summary["Simulator.update"]["count"] == 10
+    assert {"World.update", "Hardware.update", "CSVLogger.log", "RadarSonar.update", "getNextPosition"} <= set(summary)
+    assert summary["World.update"]["total"] <= summary["Simulator.update"]["total"]
+    assert "RadarSonar.update" in profiler.report()
+    # Every subsystem's update is timed under the span name the model set up when the subsystem was attached
+    update_spans = simulator.world.models["PrimarySubmarine"].update_spans
+    assert "RadarSonar.update" in update_spans.values()
+    assert all(summary[name]["count"] == 10 for name in update_spans.values())
+
+def test_summary_can_be_read_while_another_thread_adds_spans():
+    profiler = Profiler.TickProfiler()
+    done = threading.Event()
+    def add_spans():
+        # As the simulation thread does when a ship's systems are first updated
+        for n in range(20000):
+            profiler.record(f"Span{n}.update", 1e-5)
+        done.set()
+    # Switch threads as often as possible, so that spans are added while the summary is being read
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        thread = threading.Thread(target = add_spans)
+        thread.start()
+        while not done.is_set():
+            profiler.summary()
+        thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert len(profiler.summary()) == 20000
@@ -0,0 +1,37 @@
+import BattleshipSimulator.Models.Environment as Environment
+import BattleshipSimulator.Models.SimulatorUtilities as SimulatorUtilities
+import BattleshipSimulator.Models.GeometryCache as GeometryCache
+from shapely.geometry import Polygon
+
+def test_radar_objects_match_the_radar_intersections(tmp_path):
+    simulator = Environment.Simulator("scenarios/scenario-gen-1.yaml", results_dir = str(tmp_path), transport = "null")
+    simulator.start()
+    radar = simulator.world.models["PrimarySubmarine"].get_child("RadarSonar")
+    for _ in range(5):
+        simulator.update(.5)
+    simulator.close_io()
+    # Intersect every obstacle with the radar, as RadarSonar did before obstacles in range skipped the intersection
+    expected = []
+    for obstacle in radar.chart + radar.objects:
+        in_range, shapes = SimulatorUtilities.polygons_intersect(radar.radar_geometry, obstacle)
+        if in_range:
+            expected += shapes
+    assert len(expected) > 0 and len(radar.radar_objects) == len(expected)
+    for shape, expected_shape in zip(radar.radar_objects, expected):
+        # The same closed ring of (x, y) float tuples, possibly starting at another vertex
+        assert type(shape) is list and all(type(point) is tuple and len(point) == 2 and all(type(c) is float for c in point) for point in shape)
+        assert shape[0] == shape[-1]
+        assert Polygon(shape).equals(Polygon(expected_shape))
+
+def test_ring_of_an_obstacle_in_range_matches_its_intersection():
+    radar = [(0, 0), (1000, 0), (1000, 1000), (0, 1000)]
+    obstacle = [(100, 100), (200, 100), (200, 200), (100, 200)]
+    cache = GeometryCache.GeometryCache([obstacle])
+    ring = cache.ring(obstacle)
+    _, (intersection,) = SimulatorUtilities.polygons_intersect(radar, obstacle)
+    assert ring == [(100., 100.), (200., 100.), (200., 200.), (100., 200.), (100., 100.)]
+    assert type(ring) is type(intersection) and type(ring[0]) is type(intersection[0]) and type(ring[0][0]) is type(intersection[0][0])
+    assert Polygon(ring).equals(Polygon(intersection))
+    # The ring is built once and looked up like the obstacle it came from
+    assert cache.ring(obstacle) is ring
+    assert cache.get(ring) is cache.get(obstacle)
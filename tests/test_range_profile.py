@@ -0,0 +1,26 @@
+import BattleshipSimulator.Models.SimulatorUtilities as Utilities
+from shapely.geometry import Point, Polygon
+import numpy as np
+
+def nearest_distance(point, polygons, angle):
+    # One shapely ray per polygon, keeping the nearest hit (as NewPointAvoidanceNavigator used to)
+    distances = [d for d in (Utilities.get_distance_at_angle(point, polygon, angle) for polygon in polygons) if d is not None]
+    return min(distances) if distances else 0
+
+def test_range_profile_matches_shapely():
+    polygons = [
+        Polygon([(100, 0), (200, 0), (200, 100), (100, 100)]),                          # Square to the east
+        Polygon([(-300, -50), (-250, -150), (-200, -50)]),                               # Triangle to the south west
+        Polygon([(0, 300), (100, 300), (100, 400), (50, 350), (0, 400)]),                # Concave shape to the north
+    ]
+    point = Point(10, 20)
+    angles = np.arange(0, 360, 0.5)
+    profile = Utilities.range_profile(point, polygons, angles)
+    assert np.allclose(profile, [nearest_distance(point, polygons, angle) for angle in angles])
+    assert profile[0] == 90                                                              # Due east hits the square's west edge
+
+def test_range_profile_edge_cases():
+    square = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)])
+    assert np.array_equal(Utilities.range_profile(Point(5, 5), [square], [0, 90, 180]), [0, 0, 0])  # Inside a polygon
+    assert np.array_equal(Utilities.range_profile(Point(5, 5), [], [0, 90]), [0, 0])               # Nothing to hit
+    assert np.array_equal(Utilities.range_profile(Point(20, 5), [square], [0], no_hit = -1), [-1])
@@ -0,0 +1,34 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# The security monitor runs as standalone scripts, so its modules are not part of a package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Security_Monitor"))
+from RollingFeatures import RollingFeatures
+
+def pandas_features(data, size):
+    # The statistics as IDS_Rudder used to compute them from each DataFrame slice
+    rolling = data.rolling(size)
+    stats = [rolling.mean(), rolling.std(), rolling.min(), rolling.max(), rolling.max() - rolling.min()]
+    return np.stack([stat.to_numpy() for stat in stats], axis = 2).reshape(len(data), -1)
+
+def test_rolling_features_match_pandas():
+    generator = np.random.default_rng(0)
+    data = pd.DataFrame(generator.normal(20000, 1000, size = (200, 3)), columns = ["heading", "rudder angle", "rudder power"])
+    data.iloc[50:70] = 5                                     # A constant stretch, where the variance must reach zero
+    expected = pandas_features(data, 10)
+    rolling = RollingFeatures(data.columns, 10)
+    for i, sample in enumerate(data.to_numpy()):
+        rolling.append(sample)
+        assert rolling.ready == (i >= 9)
+        if rolling.ready:
+            assert np.allclose(rolling.features(), expected[i], rtol = 1e-9, atol = 1e-6)
+            assert np.array_equal(rolling.window(), data.to_numpy()[i - 9:i + 1])
+
+def test_rolling_features_partial_window():
+    rolling = RollingFeatures(["Power"], 10)
+    rolling.extend([[3], [1], [2]])
+    assert not rolling.ready
+    assert np.allclose(rolling.features(), [2, 1, 1, 3, 2])
+    assert rolling.window()[:, 0].tolist() == [3, 1, 2]
@@ -0,0 +1,102 @@
+import pytest
+import json
+import sys
+import os
+import zmq
+
+# The OPC UA bridge runs as standalone scripts in its own containers, so its modules are not part of a package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Scada_Module"))
+import opcua_server_v3
+import opcua_client_dash_v2
+
+class FakeSession:
+    """Records the write requests that would go to the server's address space."""
+
+    def __init__(self):
+        self.requests = []
+
+    def write(self, params):
+        self.requests.append([(write_value.NodeId, write_value.Value.Value.Value) for write_value in params.NodesToWrite])
+
+class FakeServer:
+
+    def __init__(self):
+        self.iserver = type("InternalServer", (), {"isession": FakeSession()})()
+
+class FakeNodeId(str):
+
+    def to_string(self):
+        return str(self)
+
+class FakeNode:
+
+    def __init__(self, nodeid):
+        self.nodeid = nodeid
+
+@pytest.fixture
+def sockets():
+    context = zmq.Context()
+    sender, receiver = context.socket(zmq.PUSH), context.socket(zmq.PULL)
+    receiver.bind("inproc://logger")
+    sender.connect("inproc://logger")
+    yield sender, receiver
+    sender.close()
+    receiver.close()
+    context.term()
+
+def delta(sequence, previous, data, keyframe=False):
+    return json.dumps({"Sequence": sequence, "Previous": previous, "Keyframe": keyframe, "Data": data}).encode("utf-8")
+
+def test_queued_messages_are_merged_into_one_batch(sockets):
+    sender, receiver = sockets
+    for x in range(5):
+        sender.send(json.dumps({"World.PrimaryBattleship.x": x, "simulation_status": "Running"}).encode("utf-8"))
+    sender.send_multipart([b"World.", json.dumps({"World.PrimaryBattleship.y": 7}).encode("utf-8")])
+    # The socket is drained in one call, keeping the latest value of each key
+    assert opcua_server_v3.receive_batch(receiver, opcua_server_v3.LogState()) == {"World.PrimaryBattleship.x": 4, "simulation_status": "Running", "World.PrimaryBattleship.y": 7}
+    assert opcua_server_v3.receive_batch(receiver, opcua_server_v3.LogState()) == {}
+
+def test_deltas_after_a_missed_message_wait_for_the_next_keyframe(sockets):
+    sender, receiver = sockets
+    state = opcua_server_v3.LogState()
+    sender.send_multipart([b"World.", delta(1, None, {"World.PrimaryBattleship.x": 1, "World.PrimaryBattleship.y": 1}, keyframe = True)])
+    sender.send_multipart([b"World.", delta(2, 1, {"World.PrimaryBattleship.x": 2})])
+    assert opcua_server_v3.receive_batch(receiver, state) == {"World.PrimaryBattleship.x": 2, "World.PrimaryBattleship.y": 1}
+    # Message 3 was lost, so 4 is dropped, and so is every delta until the keyframe
+    sender.send_multipart([b"World.", delta(4, 3, {"World.PrimaryBattleship.x": 4})])
+    sender.send_multipart([b"World.", delta(5, 4, {"World.PrimaryBattleship.x": 5})])
+    assert opcua_server_v3.receive_batch(receiver, state) == {}
+    sender.send_multipart([b"World.", delta(6, 5, {"World.PrimaryBattleship.x": 6, "World.PrimaryBattleship.y": 6}, keyframe = True)])
+    sender.send_multipart([b"World.", delta(7, 6, {"World.PrimaryBattleship.y": 7})])
+    assert opcua_server_v3.receive_batch(receiver, state) == {"World.PrimaryBattleship.x": 6, "World.PrimaryBattleship.y": 7}
+
+def test_only_changed_values_are_written():
+    keys = ["simulation_status", "World.PrimaryBattleship.x", "World.PrimaryBattleship.y"]
+    written = {"simulation_status": "Running", "World.PrimaryBattleship.x": 1}
+    latest = {"simulation_status": "Running", "World.PrimaryBattleship.x": 2, "World.PrimaryBattleship.y": None, "World.Other.x": 3}
+    assert opcua_server_v3.changed_values(latest, written, keys) == {"World.PrimaryBattleship.x": 2}
+    assert opcua_server_v3.changed_values({}, written, keys) == {}
+
+def test_power_uses_the_last_desired_speed_when_a_delta_leaves_it_out():
+    key = opcua_server_v3.DESIRED_SPEED_KEY
+    written = {key: 8}
+    assert opcua_server_v3.desired_speed({"World.PrimaryBattleship.x": 2}, written) == 8
+    assert opcua_server_v3.desired_speed({key: 10}, written) == 10
+    assert opcua_server_v3.desired_speed({"World.PrimaryBattleship.x": 2}, {}) is None
+
+def test_changed_values_are_written_in_one_request():
+    ua = pytest.importorskip("opcua").ua
+    server = FakeServer()
+    nodes = [FakeNode(ua.NodeId(i, 2)) for i in [3, 4]]
+    opcua_server_v3.write_values(server, nodes, [1.5, 2.5])
+    assert server.iserver.isession.requests == [[(nodes[0].nodeid, 1.5), (nodes[1].nodeid, 2.5)]]
+
+def test_client_publishes_each_changed_value_once():
+    handler = opcua_client_dash_v2.DataChangeHandler({"ns=2;i=3": "World.PrimaryBattleship.x", "ns=2;i=10": "Power"})
+    x, power = FakeNode(FakeNodeId("ns=2;i=3")), FakeNode(FakeNodeId("ns=2;i=10"))
+    for value in [1, 2, 3]:
+        handler.datachange_notification(x, value, None)
+    handler.datachange_notification(power, 12.5, None)
+    # Notifications between two publishes collapse into the latest value of each node
+    assert handler.take() == {"World.PrimaryBattleship.x": 3, "Power": 12.5}
+    assert handler.take() == {}
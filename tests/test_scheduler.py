@@ -0,0 +1,45 @@
+import BattleshipSimulator.BattleshipController as BattleCtrl
+import BattleshipSimulator.Models.Environment as Environment
+import time
+
+def create_controller(tmp_path):
+    simulator = Environment.Simulator("scenarios/scenario-gen-1.yaml", results_dir = str(tmp_path), transport = "null")
+    controller = BattleCtrl.BattleshipController(simulator)
+    simulator.start()
+    return controller
+
+def test_scheduler_paces_steps(tmp_path):
+    controller = create_controller(tmp_path)
+    # 100 times real time with half-second steps is one step every 5 ms
+    scheduler = controller.scheduler(.5, rate = 100)
+    start_time = time.perf_counter()
+    scheduler.run(max_ticks = 21)
+    assert time.perf_counter() - start_time >= .09
+    assert scheduler.ticks == 21
+    assert controller.snapshot()["total_time"] == 10.5
+
+def test_scheduler_runs_on_a_background_thread(tmp_path):
+    controller = create_controller(tmp_path)
+    scheduler = controller.scheduler(.5)
+    scheduler.start()
+    while scheduler.ticks < 20:
+        time.sleep(.001)
+    scheduler.paused = True
+    snapshot = controller.snapshot()
+    assert set(snapshot["models"]) == set(controller.simulation.world.models)
+    scheduler.stop()
+    assert controller.simulation.total_time == scheduler.simulation_time
+
+def test_snapshot_is_a_copy_that_views_draw_from(tmp_path):
+    controller = create_controller(tmp_path)
+    scheduler = controller.scheduler(.5)
+    scheduler.run(max_ticks = 5)
+    snapshot = controller.snapshot()
+    ship_state = snapshot["models"]["PrimarySubmarine"]
+    assert set(BattleCtrl.BattleshipController.VIEW_ATTRIBUTES) <= set(ship_state)
+    path_length = len(ship_state["Navigation:actual_path"])
+    # The simulation keeps stepping without changing a snapshot that is being drawn
+    scheduler.run(max_ticks = 5)
+    assert len(ship_state["Navigation:actual_path"]) == path_length
+    assert len(controller.snapshot()["models"]["PrimarySubmarine"]["Navigation:actual_path"]) > path_length
+    assert controller.snapshot()["log_length"] == 10
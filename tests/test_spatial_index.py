@@ -0,0 +1,43 @@
+import BattleshipSimulator.Models.SpatialIndex as SpatialIndex
+from shapely.geometry import Polygon, box
+import numpy as np
+
+def random_polygon(rng, size):
+    """A triangle or quadrilateral somewhere in a 10 km square."""
+    x, y = rng.uniform(0, 10000, 2)
+    return [(float(x + dx), float(y + dy)) for dx, dy in rng.uniform(-size, size, (rng.integers(3, 5), 2))]
+
+def brute_force(shapes, regions):
+    """Every shape whose bounding box touches a region, found by testing each one."""
+    return [shape for shape in shapes if any(Polygon(shape).envelope.intersects(box(*region)) for region in regions)]
+
+def test_candidates_match_a_brute_force_scan():
+    rng = np.random.default_rng(0)
+    obstacles = [random_polygon(rng, 300) for _ in range(200)]
+    index = SpatialIndex.SpatialIndex(obstacles)
+    ships = {f"Ship{n}": random_polygon(rng, 50) for n in range(30)}
+    for _ in range(20):
+        # Every ship moves between two searches, and reports its new geometry
+        for ship, coords in ships.items():
+            dx, dy = rng.uniform(-500, 500, 2)
+            ships[ship] = [(x + dx, y + dy) for x, y in coords]
+            index.update_model(ship, ships[ship])
+        # A radar range and a minimum safe area around the same point, as RadarSonar searches
+        x, y = rng.uniform(0, 10000, 2)
+        regions = [(x - 1000, y - 1000, x + 1000, y + 1000), (x - 100, y - 150, x + 100, y + 150)]
+        candidates = index.query_obstacles(regions) + [ships[ship] for ship in index.query_models(list(ships), regions)]
+        assert candidates == brute_force(obstacles, regions) + brute_force(list(ships.values()), regions)
+        # Nothing that actually intersects a region is left out
+        assert all(shape in candidates for shape in obstacles + list(ships.values()) if any(Polygon(shape).intersects(box(*region)) for region in regions))
+
+def test_a_moved_ship_is_found_where_it_is_now():
+    index = SpatialIndex.SpatialIndex([])
+    hull = [(0., 0.), (40., 0.), (40., 10.), (0., 10.)]
+    region = (1000, 1000, 1200, 1200)
+    # A ship that has not reported a geometry yet is always a candidate
+    assert index.query_models(["Ship"], [region]) == ["Ship"]
+    index.update_model("Ship", hull)
+    assert index.query_models(["Ship"], [region]) == [] and index.query_obstacles([region]) == []
+    index.update_model("Ship", [(x + 1100, y + 1100) for x, y in hull])
+    assert index.query_models(["Ship"], [region]) == ["Ship"]
+    assert index.query_models(["Ship"], [(0, 0, 50, 50)]) == []
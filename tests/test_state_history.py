@@ -0,0 +1,13 @@
+from BattleshipSimulator.Models.StateHistory import StateHistory
+import numpy as np
+
+def test_state_history_growth():
+    history = StateHistory(3, capacity = 2)
+    rows = np.arange(30, dtype = float).reshape(10, 3)
+    for row in rows:
+        history.append(row)
+    assert len(history) == 10
+    assert np.array_equal(history.view(), rows)                          # Rows survive the buffer doubling
+    snapshot = history.view()
+    history.append([1, 2, 3])
+    assert snapshot.shape == (10, 3) and not snapshot.flags.writeable     # Views are read-only and fixed in length
@@ -0,0 +1,127 @@
+import BattleshipSimulator.Models.BattleshipConstant as BattleshipConstant
+import BattleshipSimulator.Models.Transport as Transport
+import BattleshipSimulator.Models.Profiler as Profiler
+import multiprocessing
+import os
+import sys
+import time
+
+# The security monitor runs as standalone scripts, so its modules are not part of a package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Security_Monitor"))
+from StatusBlock import StatusBlock
+import StatusBlock as StatusBlock_module
+
+def segment_name(test):
+    return f"test_status_{test}_{os.getpid()}"
+
+def write_verdicts(name, count):
+    block = StatusBlock(name)
+    for k in range(1, count + 1):
+        block.write(k, "Attack", {"Power": ("Attack", float(k), k)}, float(k), k)
+    block.close()
+
+def test_snapshot_round_trip():
+    block = StatusBlock(segment_name("round_trip"))
+    try:
+        assert block.read().sequence == 0
+        block.write(BattleshipConstant.POWER_ATTACK, "Attack", {"Power": ("Attack", .9, 123)}, .9)
+        snapshot = block.read()
+        assert snapshot.sequence == 1
+        assert snapshot.attack_code == BattleshipConstant.POWER_ATTACK
+        assert snapshot.status == "Attack"
+        assert snapshot.confidence == .9
+        assert snapshot.source_ns == snapshot.updated_ns
+        assert snapshot.systems["Power"] == ("Attack", .9, 123)
+        assert snapshot.systems["Sonar"].status == "Unknown"
+    finally:
+        block.close()
+        block.unlink()
+
+def test_reader_never_sees_a_torn_verdict():
+    name = segment_name("torn")
+    block = StatusBlock(name)
+    writer = multiprocessing.Process(target = write_verdicts, args = (name, 20000))
+    writer.start()
+    try:
+        while writer.is_alive():
+            snapshot = block.read()
+            if snapshot is not None and snapshot.sequence > 0:
+                # Every field of a verdict was written from the same counter
+                k = snapshot.attack_code
+                assert (snapshot.confidence, snapshot.source_ns, snapshot.systems["Power"].confidence) == (k, k, k)
+        writer.join()
+        assert block.read().sequence == 20000
+    finally:
+        block.close()
+        block.unlink()
+
+def test_reader_gives_up_while_a_write_is_in_progress():
+    block = StatusBlock(segment_name("busy"))
+    try:
+        block.write(BattleshipConstant.NORMAL, "Normal", {})
+        # Leave the sequence number odd, as a writer that stopped half way would
+        block.buffer[8] += 1
+        assert block.read() is None
+    finally:
+        block.close()
+        block.unlink()
+
+def test_verdict_source_reports_latency_and_staleness():
+    name = segment_name("source")
+    block = StatusBlock(name)
+    verdicts = Transport.SharedMemoryVerdictSource(name, stale_after = 60)
+    try:
+        assert verdicts.read() == BattleshipConstant.NORMAL
+        assert verdicts.stale and verdicts.latency is None
+        profiler = Profiler.enable()
+        block.write(BattleshipConstant.RUDDER_ATTACK, "Attack", {"Rudder": ("Attack", 1., time.time_ns())}, source_ns = time.time_ns() - 2 * 10 ** 9)
+        assert verdicts.read() == BattleshipConstant.RUDDER_ATTACK
+        assert 2 <= verdicts.latency < 3
+        assert profiler.summary()["Verdict.latency"]["count"] == 1
+        assert not verdicts.stale
+        verdicts.stale_after = 0
+        assert verdicts.stale
+        # A stale verdict is no longer acted on
+        assert verdicts.read() == BattleshipConstant.NORMAL
+    finally:
+        Profiler.disable()
+        verdicts.close()
+        block.close()
+        block.unlink()
+
+def test_verdict_left_over_from_an_earlier_run_is_ignored():
+    name = segment_name("leftover")
+    block = StatusBlock(name)
+    block.write(BattleshipConstant.RUDDER_ATTACK, "Attack", {"Rudder": ("Attack", 1., time.time_ns())})
+    verdicts = Transport.SharedMemoryVerdictSource(name)
+    try:
+        assert verdicts.stale
+        assert verdicts.read() == BattleshipConstant.NORMAL
+        block.write(BattleshipConstant.POWER_ATTACK, "Attack", {"Power": ("Attack", 1., time.time_ns())})
+        assert verdicts.read() == BattleshipConstant.POWER_ATTACK
+    finally:
+        verdicts.close()
+        block.close()
+        block.unlink()
+
+def test_segment_created_by_another_process_in_between_is_opened(monkeypatch):
+    name = segment_name("race")
+    created = []
+    real_shared_memory = StatusBlock_module.shared_memory.SharedMemory
+    def racing_shared_memory(name, create=False, size=0):
+        if not create and len(created) == 0:
+            # Another process creates the segment between this one's failed open and its create
+            created.append(real_shared_memory(name, True, StatusBlock_module.SIZE))
+            raise FileNotFoundError(name)
+        return real_shared_memory(name, create, size)
+    monkeypatch.setattr(StatusBlock_module.shared_memory, "SharedMemory", racing_shared_memory)
+    block = StatusBlock(name)
+    writer = StatusBlock(name)
+    try:
+        writer.write(BattleshipConstant.POWER_ATTACK, "Attack", {})
+        assert block.read().attack_code == BattleshipConstant.POWER_ATTACK
+    finally:
+        block.close()
+        writer.close()
+        created[0].close()
+        writer.unlink()
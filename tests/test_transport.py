@@ -0,0 +1,48 @@
+import BattleshipSimulator.Models.Transport as Transport
+import BattleshipSimulator.Models.Environment as Environment
+import json
+
+def test_telemetry_window():
+    transport = Transport.QueueTransport()
+    window = Transport.TelemetryWindow(transport, "submarine/power_input", ["Power"], size = 3)
+    published = [window.append([power]) for power in range(7)]
+    assert published == [False, False, True, False, False, True, False]   # One message per full window
+    messages = transport.drain()
+    assert [topic for topic, _ in messages] == ["submarine/power_input"] * 2
+    payloads = [json.loads(payload) for _, payload in messages]
+    assert [payload["ChunkID"] for payload in payloads] == [0, 1]
+    assert json.loads(payloads[1]["Data"]) == [{"Power": 3}, {"Power": 4}, {"Power": 5}]
+
+def test_telemetry_window_stride():
+    transport = Transport.QueueTransport()
+    window = Transport.TelemetryWindow(transport, "submarine/rudder_input", ["heading"], size = 3, stride = 1)
+    for heading in range(5):
+        window.append([heading])
+    # Overlapping windows slide by one row
+    assert [json.loads(json.loads(payload)["Data"])[0]["heading"] for _, payload in transport.drain()] == [0, 1, 2]
+
+def test_background_publisher():
+    transport = Transport.QueueTransport()
+    publisher = Transport.BackgroundPublisher(transport, maxsize = 2)
+    for i in range(50):
+        publisher.publish("topic", str(i))
+    publisher.close()
+    # Every message is delivered, in order, even though the queue is smaller than the burst
+    assert transport.drain() == [("topic", str(i)) for i in range(50)]
+
+def test_queue_transport_drops_messages_once_full():
+    transport = Transport.QueueTransport(maxsize = 3)
+    for i in range(5):
+        transport.publish("topic", str(i))
+    assert transport.dropped == 2
+    assert transport.drain() == [("topic", str(i)) for i in range(3)]
+    # The default is bounded too
+    assert Transport.QueueTransport().messages.maxsize > 0
+
+def test_queue_size_comes_from_the_scenario(tmp_path):
+    scenario = tmp_path / "scenario.yaml"
+    scenario.write_text(open("scenarios/scenario-gen-1.yaml").read() + "\nio:\n  publish_queue_size: 8\n")
+    simulator = Environment.Simulator(str(scenario), results_dir = str(tmp_path), transport = "queue")
+    assert simulator.transport.messages.maxsize == 8
+    assert simulator.logger.publisher.messages.maxsize == 8
+    simulator.close_io()
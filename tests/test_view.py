@@ -0,0 +1,45 @@
+import inspect
+import pytest
+
+# The GUI is optional; these checks only run where arcade is installed
+arcade = pytest.importorskip("arcade")
+from arcade.earclip import earclip
+import BattleshipSimulator.Views.BattleshipView as BattleshipView
+import BattleshipSimulator.Views.AssetManager as AssetManager
+import BattleshipSimulator.BattleshipController as BattleCtrl
+import BattleshipSimulator.Models.Environment as Environment
+
+def test_arcade_provides_the_calls_the_view_bakes_shapes_with():
+    # A concave polygon is split into plain triangles
+    triangles = earclip([(0, 0), (20, 0), (20, 20), (10, 5), (0, 20)])
+    assert len(triangles) == 3 and all(len(triangle) == 3 for triangle in triangles)
+    assert "shape_mode" in inspect.signature(arcade.create_line_generic).parameters
+    assert isinstance(arcade.gl.TRIANGLES, int)
+
+def test_category_shape_is_only_rebuilt_when_its_objects_change():
+    view = BattleshipView.BattleshipViewGUI.__new__(BattleshipView.BattleshipViewGUI)
+    view.category_shapes = {}
+    built = []
+    view.create_polygons_filled = lambda polygons, color: built.append(polygons) or object()
+    square = [(0., 0.), (10., 0.), (10., 10.), (0., 0.)]
+    shape = view.category_shape("radar_objects", [square], arcade.color.RED)
+    # An equal copy (as the next snapshot holds) reuses the uploaded shape
+    assert view.category_shape("radar_objects", [list(square)], arcade.color.RED) is shape
+    assert view.category_shape("radar_objects", [square[::-1]], arcade.color.RED) is not shape
+    assert len(built) == 2
+
+def test_closing_the_view_flushes_sonar_images_before_the_transport(tmp_path):
+    simulator = Environment.Simulator("scenarios/scenario-gen-1.yaml", results_dir = str(tmp_path), transport = "queue")
+    controller = BattleCtrl.BattleshipController(simulator)
+    simulator.start()
+    view = BattleshipView.BattleshipViewGUI.__new__(BattleshipView.BattleshipViewGUI)
+    view.controller, view.scheduler = controller, None
+    view.sonar_sender = AssetManager.RateLimitedSender(simulator.transport.publish, 60)
+    view.sonar_sender.send("submarine/sonar_input", ["first"])
+    view.sonar_sender.send("submarine/sonar_input", ["second"])
+    view.on_hide_view()
+    assert not view.sonar_sender.thread.is_alive()
+    assert ("submarine/sonar_input", "second") in simulator.transport.drain()
+    assert not simulator.simulation_running
+    # Closing the window afterwards does not close the channels again
+    view.close()